@@ -63,6 +63,29 @@ class ConversationCache:
             # Update queue size
             self._queue_sizes[conversation_id] = self._queue_sizes.get(conversation_id, 0) + 1
     
+    def seed_messages(self, conversation_id: str, messages: List[Message]) -> None:
+        """
+        Fill a conversation with older messages loaded from storage.
+        They are placed before any cached messages; messages already cached are skipped.
+        Thread-safe operation.
+        
+        Args:
+            conversation_id: The conversation ID
+            messages: Older messages, oldest first
+        """
+        with self._lock:
+            if conversation_id not in self._conversations:
+                self._ensure_capacity()
+                self._queue_sizes[conversation_id] = 0
+                cached = []
+            else:
+                cached = list(self._conversations[conversation_id])
+            
+            cached_ids = {m.message_id for m in cached}
+            older = [m for m in messages if m.message_id not in cached_ids]
+            self._conversations[conversation_id] = deque(older + cached, maxlen=self.max_messages_per_conversation)
+            self._conversations.move_to_end(conversation_id)
+    
     def get_messages(self, conversation_id: str, limit: Optional[int] = None) -> Optional[List[Message]]:
         """
         Get messages for a conversation.
@@ -22,6 +22,8 @@ from core.schemas import (
 )
 from chat.participants import BaseParticipant
 from chat.storage import SimpleChatStorageInterface
+from chat.cache import ConversationCache
+from chat.scheduler import ChatTaskScheduler, TaskPriority
 from chat.metrics import ChatMetrics
 
 logger = logging.getLogger(__name__)
@@ -60,6 +62,8 @@ class ConversationState:
     mode: ConversationMode = ConversationMode.SINGLE
     failures: List[ParticipantFailure] = field(default_factory=list)
     active_nlweb_jobs: Set[str] = field(default_factory=set)
+    context_loaded: bool = False  # Context window holds the stored history too
+    context_load_task: Optional[asyncio.Task] = None
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
 
@@ -89,6 +93,7 @@ class ConversationManager:
         self.multi_mode_timeout = config.get("multi_mode_timeout", 2000)  # ms
         self.queue_size_limit = config.get("queue_size_limit", 1000)
         self.max_participants = config.get("max_participants", 100)
+        self.context_window = config.get("context_window", 20)  # Messages passed to participants
         
         # Conversation states
         self._conversations: Dict[str, ConversationState] = {}
@@ -97,6 +102,12 @@ class ConversationManager:
         self.storage: Optional[SimpleChatStorageInterface] = None
         self.metrics = ChatMetrics()
         
+        # Write-through window of recent messages per conversation, used as delivery context
+        self.context_cache = ConversationCache(
+            max_conversations=config.get("context_cache_conversations", 1000),
+            max_messages_per_conversation=self.context_window
+        )
+        
         # Broadcast callback for mode changes
         self.broadcast_callback: Optional[Callable] = None
         
@@ -109,8 +120,12 @@ class ConversationManager:
         # Running state
         self._running = True
         
-        # Track persistence tasks
-        self._persistence_tasks: Set[asyncio.Task] = set()
+        # Delivery, AI, broadcast and persistence work runs through the scheduler
+        self.scheduler = ChatTaskScheduler(
+            max_concurrent=config.get("max_concurrent_jobs", 32),
+            max_per_conversation=config.get("max_jobs_per_conversation", 2),
+            max_pending_per_conversation=self.queue_size_limit
+        )
         
         # Track which conversations are being processed (to prevent deadlock)
         self._processing_messages: Set[str] = set()
@@ -228,15 +243,13 @@ class ConversationManager:
         conv_state = self._conversations[message.conversation_id]
         logger.debug(f"Processing message for conversation {message.conversation_id} with {conv_state.message_count} existing messages")
         
-        # Check queue limit
-        if conv_state.message_count >= self.queue_size_limit:
-            # Try to drop oldest NLWeb jobs first
-            if not self._try_drop_nlweb_jobs(conv_state):
-                raise QueueFullError(
-                    conversation_id=message.conversation_id,
-                    queue_size=conv_state.message_count,
-                    limit=self.queue_size_limit
-                )
+        # Check queue limit (the scheduler drops the oldest queued AI job if it can)
+        if not self.scheduler.has_capacity(message.conversation_id):
+            raise QueueFullError(
+                conversation_id=message.conversation_id,
+                queue_size=self.scheduler.pending_count(message.conversation_id),
+                limit=self.queue_size_limit
+            )
         
         # Update message count (no longer using sequence_id)
         conv_state.message_count += 1
@@ -244,19 +257,30 @@ class ConversationManager:
         # Message is already in unified format
         sequenced_message = message
         
-        # Queue message for storage IMMEDIATELY (async, non-blocking)
-        # This ensures user message gets stored with its original timestamp
+        # Write through to the context window before delivery starts, so messages stay in order
+        if not self.context_cache.has_conversation(message.conversation_id):
+            # New or evicted: the stored history must be loaded again
+            conv_state.context_loaded = False
+        self.context_cache.add_message(message.conversation_id, sequenced_message)
+        context = None
+        if conv_state.context_loaded or not self.storage:
+            # Snapshot the window as of this message
+            context = self.context_cache.get_messages(message.conversation_id, limit=self.context_window)
+        
+        # Store the message (async, non-blocking, outside the AI job caps)
         if self.storage:
-            persist_task = asyncio.create_task(self._persist_message(sequenced_message))
-            self._persistence_tasks.add(persist_task)
-            persist_task.add_done_callback(lambda t: self._persistence_tasks.discard(t))
+            self.scheduler.submit(
+                message.conversation_id,
+                lambda: self._persist_message(sequenced_message),
+                TaskPriority.PERSISTENCE
+            )
         
         # Deliver to participants asynchronously (non-blocking)
-        delivery_task = asyncio.create_task(self._deliver_to_participants(
-            sequenced_message,
-            conv_state,
-            require_ack
-        ))
+        self.scheduler.submit(
+            message.conversation_id,
+            lambda: self._deliver_to_participants(sequenced_message, conv_state, require_ack, context),
+            TaskPriority.BROADCAST
+        )
         
         # Note: We're not awaiting delivery - it happens asynchronously
         
@@ -265,18 +289,20 @@ class ConversationManager:
         conv_state.updated_at = datetime.utcnow()
         
         # Track metrics
-        self.metrics.update_queue_depth(message.conversation_id, conv_state.message_count)
+        self.metrics.update_queue_depth(message.conversation_id, self.scheduler.pending_count(message.conversation_id))
         
         # Broadcast to WebSocket connections asynchronously (non-blocking)
         # IMPORTANT: Don't echo user messages back to the sender
         if self.websocket_manager:
             sender_id = message.sender_info.get('id') if message.sender_info else None
-            broadcast_task = asyncio.create_task(
-                self.websocket_manager.broadcast_message(
+            self.scheduler.submit(
+                message.conversation_id,
+                lambda: self.websocket_manager.broadcast_message(
                     message.conversation_id,
                     sequenced_message.to_dict(),  # Send message directly, no wrapping
                     exclude_user_id=sender_id  # Exclude the sender
-                )
+                ),
+                TaskPriority.BROADCAST
             )
         
         return sequenced_message
@@ -285,7 +311,8 @@ class ConversationManager:
         self,
         message: Message,
         conv_state: ConversationState,
-        require_ack: bool = False
+        require_ack: bool = False,
+        context: Optional[List[Message]] = None
     ) -> Dict[str, bool]:
         """
         Deliver message to all participants except sender.
@@ -294,6 +321,7 @@ class ConversationManager:
             message: The message to deliver
             conv_state: Conversation state
             require_ack: Whether to track acknowledgments
+            context: Recent messages, or None to read them from the context window
             
         Returns:
             Dictionary of participant_id -> delivery success
@@ -301,30 +329,22 @@ class ConversationManager:
         delivery_acks = {}
         delivery_tasks = []
         
-        # Get conversation history for context
-        context = []
-        if self.storage:
-            try:
-                # Get recent messages for context
-                context = await self.storage.get_conversation_messages(
-                    message.conversation_id,
-                    limit=20
-                )
-                logger.info(f"ConversationManager retrieved {len(context)} messages from storage for context")
-            except Exception as e:
-                logger.error(f"Failed to get context: {e}")
+        # Get conversation history for context, as of this message
+        if context is None:
+            context = await self.get_context(message.conversation_id, until_message_id=message.message_id)
         
         # Deliver to all participants except sender
-        for participant_id, participant in conv_state.participants.items():
+        for participant_id, participant in list(conv_state.participants.items()):
             if participant_id != message.sender_info.get('id'):
-                # Create delivery task for all non-sender participants
-                task = self._deliver_to_participant(
-                    message,
-                    participant,
-                    participant_id,
-                    context,
-                    conv_state
-                )
+                deliver = (lambda p=participant, pid=participant_id:
+                           self._deliver_to_participant(message, p, pid, context, conv_state))
+                if participant.get_participant_info().participant_type == ParticipantType.AI:
+                    # AI jobs are capped; a newer message supersedes this participant's queued job
+                    task = self.scheduler.submit(
+                        message.conversation_id, deliver, TaskPriority.AI, supersede_key=participant_id
+                    )
+                else:
+                    task = deliver()
                 delivery_tasks.append((participant_id, task))
             elif require_ack:
                 # For sender, assume successful delivery
@@ -339,7 +359,10 @@ class ConversationManager:
             
             # Track acknowledgments
             for i, (participant_id, _) in enumerate(delivery_tasks):
-                if isinstance(results[i], Exception):
+                if isinstance(results[i], asyncio.CancelledError):
+                    # Superseded or dropped before it started
+                    delivery_acks[participant_id] = False
+                elif isinstance(results[i], Exception):
                     delivery_acks[participant_id] = False
                     # Record failure
                     conv_state.failures.append(ParticipantFailure(
@@ -353,6 +376,46 @@ class ConversationManager:
         
         return delivery_acks if require_ack else {}
     
+    async def get_context(self, conversation_id: str, until_message_id: Optional[str] = None) -> List[Message]:
+        """
+        Get the recent messages of a conversation from the context window.
+        Storage is only read on a cold miss, once per conversation.
+        
+        Args:
+            conversation_id: The conversation ID
+            until_message_id: Leave out messages added after this one while storage was read
+            
+        Returns:
+            Recent messages, oldest first
+        """
+        conv_state = self._conversations.get(conversation_id)
+        if conv_state is not None and not conv_state.context_loaded and self.storage:
+            if conv_state.context_load_task is None or conv_state.context_load_task.done():
+                conv_state.context_load_task = asyncio.create_task(self._load_context(conv_state))
+            await asyncio.shield(conv_state.context_load_task)
+        
+        messages = self.context_cache.get_messages(conversation_id) or []
+        if until_message_id is not None:
+            for i in range(len(messages) - 1, -1, -1):
+                if messages[i].message_id == until_message_id:
+                    messages = messages[:i + 1]
+                    break
+        return messages[-self.context_window:]
+    
+    async def _load_context(self, conv_state: ConversationState) -> None:
+        """Seed the context window with stored history"""
+        try:
+            stored = await self.storage.get_conversation_messages(
+                conv_state.conversation_id,
+                limit=self.context_window
+            )
+            self.context_cache.seed_messages(conv_state.conversation_id, stored)
+            logger.info(f"ConversationManager loaded {len(stored)} messages from storage for context")
+        except Exception as e:
+            logger.error(f"Failed to get context: {e}")
+        # Don't retry on every message if storage is failing
+        conv_state.context_loaded = True
+    
     async def _deliver_to_participant(
         self,
         message: Message,
@@ -466,26 +529,6 @@ class ConversationManager:
             
             self.broadcast_callback(conversation_id, mode_change_msg)
     
-    def _try_drop_nlweb_jobs(self, conv_state: ConversationState) -> bool:
-        """
-        Try to drop oldest NLWeb processing jobs to make room.
-        
-        Args:
-            conv_state: Conversation state
-            
-        Returns:
-            True if space was made, False otherwise
-        """
-        if conv_state.active_nlweb_jobs:
-            # Drop oldest job
-            oldest_job = min(conv_state.active_nlweb_jobs)
-            conv_state.active_nlweb_jobs.remove(oldest_job)
-            conv_state.message_count -= 1
-            logger.info(f"Dropped NLWeb job {oldest_job} to make room")
-            return True
-        
-        return False
-    
     def get_participant_failures(self, conversation_id: str) -> List[ParticipantFailure]:
         """Get failures for a conversation"""
         if conversation_id in self._conversations:
@@ -502,12 +545,15 @@ class ConversationManager:
         """Shutdown the conversation manager"""
         self._running = False
         
-        # Wait for all persistence tasks to complete
-        if self._persistence_tasks:
-            try:
-                await asyncio.gather(*self._persistence_tasks, return_exceptions=True)
-            except Exception as e:
-                logger.error(f"Error waiting for persistence tasks: {e}")
+        # Drop queued AI jobs and wait for everything else, including persistence
+        try:
+            await self.scheduler.shutdown()
+        except Exception as e:
+            logger.error(f"Error waiting for scheduled tasks: {e}")
+    
+    def get_scheduler_metrics(self) -> Dict[str, Any]:
+        """Get job scheduler metrics (queue depth, wait times, superseded and dropped jobs)"""
+        return self.scheduler.get_metrics()
     
     @staticmethod
     def create_message(
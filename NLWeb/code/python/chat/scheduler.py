@@ -0,0 +1,258 @@
+"""
+Scheduler for background chat work with concurrency caps and backpressure.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import defaultdict, deque
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TaskPriority(IntEnum):
+    """Job priorities; lower values are started first"""
+    BROADCAST = 0  # Human-visible, started immediately
+    AI = 1  # AI participant jobs, capped per conversation and globally
+    PERSISTENCE = 2  # Message writes, started immediately outside the AI caps
+
+
+class ScheduledJob:
+    """A unit of work waiting for or holding a scheduler slot"""
+
+    def __init__(
+        self,
+        conversation_id: str,
+        factory: Callable[[], Awaitable[Any]],
+        priority: TaskPriority,
+        supersede_key: Optional[str] = None
+    ):
+        self.conversation_id = conversation_id
+        self.factory = factory
+        self.priority = priority
+        self.supersede_key = supersede_key
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.enqueued_at = time.monotonic()
+        self.task: Optional[asyncio.Task] = None
+        self.cancelled = False
+
+
+class ChatTaskScheduler:
+    """
+    Runs chat jobs under a global and a per-conversation concurrency cap.
+
+    Broadcast and persistence jobs start immediately and are only tracked, so
+    a message is stored and shown without waiting for AI work. AI jobs wait in
+    a queue, so a burst in one conversation cannot take every slot. Submitting a job with a
+    supersede key cancels queued jobs with the same key in that conversation,
+    for example an AI participant's answer to an older message.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 32,
+        max_per_conversation: int = 2,
+        max_pending_per_conversation: int = 1000
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrent: Running AI jobs across all conversations
+            max_per_conversation: Running AI jobs per conversation
+            max_pending_per_conversation: Queued AI jobs per conversation before submit fails
+        """
+        self.max_concurrent = max_concurrent
+        self.max_per_conversation = max_per_conversation
+        self.max_pending_per_conversation = max_pending_per_conversation
+
+        self._queue: List[Tuple[int, int, ScheduledJob]] = []  # (priority, seq, job) heap
+        self._seq = itertools.count()
+        self._pending: Dict[str, int] = defaultdict(int)  # conversation_id -> queued jobs
+        self._running_per_conversation: Dict[str, int] = defaultdict(int)  # AI jobs
+        self._running = 0  # AI jobs
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Metrics
+        self._submitted = defaultdict(int)
+        self._completed = defaultdict(int)
+        self._failed = defaultdict(int)
+        self._superseded = 0
+        self._dropped = 0
+        self._wait_times: Dict[TaskPriority, deque] = defaultdict(lambda: deque(maxlen=1000))
+
+    def submit(
+        self,
+        conversation_id: str,
+        factory: Callable[[], Awaitable[Any]],
+        priority: TaskPriority = TaskPriority.AI,
+        supersede_key: Optional[str] = None
+    ) -> asyncio.Future:
+        """
+        Schedule a job.
+
+        Args:
+            conversation_id: Conversation the job belongs to
+            factory: Callable returning the coroutine to run (not called if the job is cancelled first)
+            priority: Job priority
+            supersede_key: Queued jobs of this conversation with the same key are cancelled
+
+        Returns:
+            Future with the job's result; cancelled if the job is superseded or dropped
+        """
+        job = ScheduledJob(conversation_id, factory, priority, supersede_key)
+        self._submitted[priority.name] += 1
+
+        if priority != TaskPriority.AI:
+            self._start(job)
+            return job.future
+
+        if supersede_key is not None:
+            self._superseded += self._cancel_queued(
+                lambda queued: queued.conversation_id == conversation_id and queued.supersede_key == supersede_key
+            )
+
+        heapq.heappush(self._queue, (int(priority), next(self._seq), job))
+        self._pending[conversation_id] += 1
+        self._dispatch()
+        return job.future
+
+    def pending_count(self, conversation_id: str) -> int:
+        """Number of queued jobs for a conversation"""
+        return self._pending.get(conversation_id, 0)
+
+    def has_capacity(self, conversation_id: str) -> bool:
+        """Whether a conversation can queue another job, dropping its oldest AI job if needed"""
+        if self.pending_count(conversation_id) < self.max_pending_per_conversation:
+            return True
+        oldest = min(
+            (job for _, _, job in self._queue
+             if job.conversation_id == conversation_id and job.priority == TaskPriority.AI and not job.cancelled),
+            key=lambda job: job.enqueued_at,
+            default=None
+        )
+        if oldest is None:
+            return False
+        self._cancel_queued(lambda queued: queued is oldest)
+        self._dropped += 1
+        logger.info(f"Dropped oldest queued AI job in conversation {conversation_id} to make room")
+        return True
+
+    def cancel_conversation(self, conversation_id: str) -> int:
+        """Cancel queued and running jobs of a conversation"""
+        count = self._cancel_queued(lambda queued: queued.conversation_id == conversation_id)
+        for task in list(self._tasks):
+            if getattr(task, "conversation_id", None) == conversation_id:
+                task.cancel()
+                count += 1
+        return count
+
+    async def shutdown(self) -> None:
+        """Cancel queued AI jobs and wait for running jobs, including persistence writes"""
+        self._cancel_queued(lambda queued: queued.priority == TaskPriority.AI)
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def _cancel_queued(self, predicate: Callable[[ScheduledJob], bool]) -> int:
+        """Cancel matching queued jobs; they are skipped when popped. Returns the count."""
+        count = 0
+        for _, _, job in self._queue:
+            if not job.cancelled and predicate(job):
+                job.cancelled = True
+                job.future.cancel()
+                self._release_pending(job.conversation_id)
+                count += 1
+        return count
+
+    def _release_pending(self, conversation_id: str) -> None:
+        """Count a queued job as gone, forgetting conversations with none left"""
+        self._pending[conversation_id] -= 1
+        if not self._pending[conversation_id]:
+            del self._pending[conversation_id]
+
+    def _dispatch(self) -> None:
+        """Start queued jobs while there are free slots"""
+        deferred = []
+        while self._queue and self._running < self.max_concurrent:
+            entry = heapq.heappop(self._queue)
+            job = entry[2]
+            if job.cancelled:
+                continue
+            if (job.priority == TaskPriority.AI and
+                    self._running_per_conversation.get(job.conversation_id, 0) >= self.max_per_conversation):
+                # This conversation is at its cap; let other conversations go first
+                deferred.append(entry)
+                continue
+            self._release_pending(job.conversation_id)
+            self._start(job)
+        for entry in deferred:
+            heapq.heappush(self._queue, entry)
+
+    def _start(self, job: ScheduledJob) -> None:
+        self._wait_times[job.priority].append(time.monotonic() - job.enqueued_at)
+        if job.priority == TaskPriority.AI:
+            self._running += 1
+            self._running_per_conversation[job.conversation_id] += 1
+
+        job.task = asyncio.create_task(self._run(job))
+        job.task.conversation_id = job.conversation_id
+        job.task.priority = job.priority
+        self._tasks.add(job.task)
+        job.task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job: ScheduledJob) -> None:
+        try:
+            result = await job.factory()
+            self._completed[job.priority.name] += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        except asyncio.CancelledError:
+            job.future.cancel()
+        except Exception as e:
+            self._failed[job.priority.name] += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+                # Mark retrieved so a fire-and-forget failure is not reported twice
+                job.future.exception()
+        finally:
+            if job.priority == TaskPriority.AI:
+                self._running -= 1
+                self._running_per_conversation[job.conversation_id] -= 1
+                if not self._running_per_conversation[job.conversation_id]:
+                    del self._running_per_conversation[job.conversation_id]
+                self._dispatch()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get scheduler metrics.
+
+        Returns:
+            Dictionary of counters and queue wait times (ms) per priority
+        """
+        wait_ms = {}
+        for priority, samples in self._wait_times.items():
+            if samples:
+                ordered = sorted(samples)
+                wait_ms[priority.name] = {
+                    "avg": 1000 * sum(ordered) / len(ordered),
+                    "p95": 1000 * ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+                    "max": 1000 * ordered[-1]
+                }
+
+        return {
+            "running": self._running,
+            "running_broadcasts": sum(1 for task in self._tasks if task.priority == TaskPriority.BROADCAST),
+            "running_persistence": sum(1 for task in self._tasks if task.priority == TaskPriority.PERSISTENCE),
+            "queued": sum(self._pending.values()),
+            "queued_per_conversation": {cid: n for cid, n in self._pending.items() if n},
+            "submitted": dict(self._submitted),
+            "completed": dict(self._completed),
+            "failed": dict(self._failed),
+            "superseded": self._superseded,
+            "dropped": self._dropped,
+            "queue_wait_ms": wait_ms
+        }
@@ -20,6 +20,13 @@ from chat.metrics import ChatMetrics
 logger = logging.getLogger(__name__)
 
 
+class SlowConsumerPolicy(Enum):
+    """What to do when a connection's outbound queue is full"""
+    DROP_OLDEST = "drop_oldest"  # Discard the oldest queued message
+    DROP_NEWEST = "drop_newest"  # Discard the message being broadcast
+    DISCONNECT = "disconnect"  # Close the connection
+
+
 class ConnectionState(Enum):
     """WebSocket connection states"""
     CONNECTING = "connecting"
@@ -53,6 +60,9 @@ class ConnectionConfig:
     ping_interval: int = 30  # seconds
     pong_timeout: int = 600  # 10 minutes
     max_retries: int = 10
+    send_queue_size: int = 256  # Outbound messages buffered per connection
+    send_timeout: float = 10.0  # seconds; a single send slower than this fails the connection
+    slow_consumer_policy: SlowConsumerPolicy = SlowConsumerPolicy.DROP_OLDEST
 
 
 class WebSocketConnection:
@@ -77,6 +87,14 @@ class WebSocketConnection:
         self.state = ConnectionState.CONNECTED
         self.last_pong_time = datetime.utcnow()
         self.heartbeat_task = None
+        # Called with this connection when a send fails; set by the manager
+        self.on_failure = None
+        
+        # Outbound queue of pre-serialized broadcast payloads, drained by a writer task
+        self._outbound: Optional[asyncio.Queue] = None
+        self._writer_task = None
+        self.sent_count = 0
+        self.dropped_count = 0
         
     async def send_message(self, message: Dict[str, Any]) -> None:
         """Send a message to this connection"""
@@ -85,7 +103,63 @@ class WebSocketConnection:
                 await self.ws.send_json(message)
             except Exception as e:
                 logger.error(f"Error sending message to {self.user_id}: {e}")
+                self._fail()
+    
+    def enqueue(self, payload: str) -> bool:
+        """
+        Queue an already serialized message for sending, without waiting for the client.
+        
+        Args:
+            payload: JSON text of the message
+            
+        Returns:
+            False if the connection is closed or was failed under the disconnect policy
+        """
+        if self.state != ConnectionState.CONNECTED or self.ws.closed:
+            return False
+        
+        if self._outbound is None:
+            self._outbound = asyncio.Queue(maxsize=self.config.send_queue_size)
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._drain_outbound())
+        
+        if self._outbound.full():
+            policy = self.config.slow_consumer_policy
+            if policy == SlowConsumerPolicy.DISCONNECT:
+                logger.warning(f"Outbound queue full for {self.user_id}, disconnecting slow consumer")
                 self.state = ConnectionState.FAILED
+                return False
+            self.dropped_count += 1
+            if policy == SlowConsumerPolicy.DROP_NEWEST:
+                return True
+            self._outbound.get_nowait()
+        
+        self._outbound.put_nowait(payload)
+        return True
+    
+    @property
+    def queue_depth(self) -> int:
+        """Number of messages waiting to be sent"""
+        return self._outbound.qsize() if self._outbound is not None else 0
+    
+    async def _drain_outbound(self) -> None:
+        """Send queued payloads in order until the connection fails or closes"""
+        while self.state == ConnectionState.CONNECTED:
+            payload = await self._outbound.get()
+            try:
+                await asyncio.wait_for(self.ws.send_str(payload), self.config.send_timeout)
+                self.sent_count += 1
+            except Exception as e:
+                logger.error(f"Error sending message to {self.user_id}: {e}")
+                self._fail()
+    
+    def _fail(self) -> None:
+        """Mark the connection failed and let the manager remove it"""
+        if self.state != ConnectionState.CONNECTED:
+            return
+        self.state = ConnectionState.FAILED
+        if self.on_failure is not None:
+            self.on_failure(self)
     
     async def heartbeat(self) -> None:
         """Send periodic pings to keep connection alive"""
@@ -118,6 +192,8 @@ class WebSocketConnection:
         self.state = ConnectionState.DISCONNECTED
         if self.heartbeat_task:
             self.heartbeat_task.cancel()
+        if self._writer_task:
+            self._writer_task.cancel()
         if not self.ws.closed:
             await self.ws.close()
 
@@ -138,7 +214,10 @@ class WebSocketManager:
         self.connection_config = ConnectionConfig(
             ping_interval=self.config.get("ping_interval", 30),
             pong_timeout=self.config.get("pong_timeout", 600),
-            max_retries=self.config.get("max_retries", 10)
+            max_retries=self.config.get("max_retries", 10),
+            send_queue_size=self.config.get("send_queue_size", 256),
+            send_timeout=self.config.get("send_timeout", 10.0),
+            slow_consumer_policy=SlowConsumerPolicy(self.config.get("slow_consumer_policy", "drop_oldest"))
         )
         
         # Storage: conversation_id -> user_id -> connection
@@ -156,6 +235,10 @@ class WebSocketManager:
         # Metrics
         self.metrics = ChatMetrics()
         
+        # Slow consumers disconnected by policy
+        self._slow_consumer_disconnects = 0
+        self._removal_tasks: Set[asyncio.Task] = set()
+        
         # Cleanup task
         self._cleanup_task = None
         self._running = True
@@ -203,6 +286,7 @@ class WebSocketManager:
             conversation_id=conversation_id,
             config=self.connection_config
         )
+        connection.on_failure = self._remove_failed
         
         # Store connection
         self._connections[conversation_id][user_id] = connection
@@ -243,7 +327,8 @@ class WebSocketManager:
     ) -> None:
         """
         Broadcast a message to all participants in a conversation.
-        O(N) complexity where N is number of participants.
+        The message is serialized once and queued on each connection, so a
+        slow client only delays itself.
         
         Args:
             conversation_id: The conversation ID
@@ -257,32 +342,25 @@ class WebSocketManager:
         # Get all connections for conversation
         connections = self._connections[conversation_id]
         
-        # Debug: log what we're doing (commented out for performance)
-        # print(f"[WebSocket] Broadcasting to conversation {conversation_id}")
-        # print(f"[WebSocket] Exclude user: {exclude_user_id}")
-        # print(f"[WebSocket] Active connections: {list(connections.keys())}")
-        
-        # Send to all participants except excluded
-        tasks = []
-        msg_type = message.get('message_type', message.get('type', 'unknown'))
-        # Handle content as either string or object
-        content = message.get('content', '')
-        if isinstance(content, dict):
-            msg_content = content.get('query', 'NO_CONTENT')[:50] if content.get('query') else 'NO_CONTENT'
-        elif isinstance(content, str):
-            msg_content = content[:50] if content else 'NO_CONTENT'
-        else:
-            msg_content = str(content)[:50] if content else 'NO_CONTENT'
-        sender = message.get('sender_info', {}).get('id', 'unknown') if message.get('sender_info') else 'unknown'
-        
-        
-        for user_id, connection in connections.items():
-            if user_id != exclude_user_id:
-                tasks.append(connection.send_message(message))
-        
-        # Send all messages concurrently
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        payload = json.dumps(message)
+        
+        for user_id, connection in list(connections.items()):
+            if user_id == exclude_user_id or connection.state != ConnectionState.CONNECTED:
+                continue
+            if not connection.enqueue(payload) and connection.state == ConnectionState.FAILED:
+                # Disconnected as a slow consumer
+                self._slow_consumer_disconnects += 1
+                self._remove_failed(connection)
+    
+    def _remove_failed(self, connection: WebSocketConnection) -> None:
+        """Remove a failed connection from every conversation it is in, broadcasting its leave"""
+        # One socket can be in several conversations; skip entries already replaced by a reconnect
+        for conversation_id, connections in list(self._connections.items()):
+            if connections.get(connection.participant_id) is not connection:
+                continue
+            task = asyncio.create_task(self.remove_connection(conversation_id, connection.participant_id))
+            self._removal_tasks.add(task)
+            task.add_done_callback(self._removal_tasks.discard)
     
     def get_connection_count(self, conversation_id: str) -> int:
         """Get number of active connections for a conversation"""
@@ -359,13 +437,27 @@ class WebSocketManager:
             if self._queue_sizes else 0
         )
         
+        outbound_depths = [
+            connection.queue_depth
+            for connections in self._connections.values()
+            for connection in connections.values()
+        ]
+        
         return {
             "active_connections": total_connections,
             "active_conversations": len(self._connections),
             "connections_per_conversation": connections_per_conv,
             "messages_per_second": 0,  # TODO: Implement message rate tracking
             "average_queue_depth": avg_queue_depth,
-            "max_queue_depth": max(self._queue_sizes.values()) if self._queue_sizes else 0
+            "max_queue_depth": max(self._queue_sizes.values()) if self._queue_sizes else 0,
+            "outbound_queue_depth": sum(outbound_depths),
+            "max_outbound_queue_depth": max(outbound_depths) if outbound_depths else 0,
+            "dropped_messages": sum(
+                connection.dropped_count
+                for connections in self._connections.values()
+                for connection in connections.values()
+            ),
+            "slow_consumer_disconnects": self._slow_consumer_disconnects
         }
     
     async def broadcast_to_conversation(
@@ -408,6 +500,9 @@ class WebSocketManager:
         if conversation_id not in self._connections:
             self._connections[conversation_id] = {}
         
+        # Connections created by the route handler use default settings; apply the manager's
+        connection.config = self.connection_config
+        connection.on_failure = self._remove_failed
         self._connections[conversation_id][connection.participant_id] = connection
         
         # Start heartbeat
@@ -1,21 +1,40 @@
 """
 In-memory storage implementation for chat system.
 Used for development and testing.
+
+Messages are indexed per conversation in bounded ring buffers. Persistence is
+an append-only JSONL log written by a background task in batches; the log is
+periodically compacted into a snapshot grouped by conversation, with an index
+of byte ranges so conversations are only parsed when first accessed. The ring
+buffers only bound memory: compaction regroups every line of the log, so the
+full history stays on disk.
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+from collections import deque
+from itertools import islice
 import asyncio
 import json
+import os
+import time
 from pathlib import Path
 
 from core.schemas import Message
 from chat.storage import SimpleChatStorageInterface
+from misc.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("memory_storage")
+
+# fsync policies for the message log
+FSYNC_ALWAYS = "always"      # after every batch
+FSYNC_INTERVAL = "interval"  # at most every fsync_interval_seconds
+FSYNC_NEVER = "never"        # leave it to the OS
 
 
 class MemoryStorage(SimpleChatStorageInterface):
     """
     Simple in-memory implementation of chat storage.
-    Stores messages in a list and persists to JSONL file.
+    Keeps the most recent messages of each conversation and persists to a JSONL file.
     """
     
     def __init__(self, config: Dict):
@@ -26,26 +45,53 @@ class MemoryStorage(SimpleChatStorageInterface):
             config: Storage configuration
         """
         self.config = config
-        # Note: queue_size_limit not used in simple storage
         
         # Storage configuration
         self.enable_storage = config.get('enable_storage', True)  # Default to True - storage enabled for upload endpoint
         self.persist_to_disk = config.get('persist_to_disk', True)
         self.storage_path = Path(config.get('storage_path', 'data/chat_storage'))
+        self.max_messages_per_conversation = config.get(
+            'max_messages_per_conversation', config.get('queue_size_limit', 1000)
+        )
+        
+        # Writer configuration
+        self.flush_batch_size = config.get('flush_batch_size', 256)
+        self.fsync_policy = config.get('fsync', FSYNC_INTERVAL)
+        self.fsync_interval_seconds = config.get('fsync_interval_seconds', 1.0)
+        self.compact_interval_seconds = config.get('compact_interval_seconds', 300)
+        self.compact_min_appends = config.get('compact_min_appends', 1000)
+        
+        self._msg_file = self.storage_path / 'messages.jsonl'
+        self._index_file = self.storage_path / 'messages.index.json'
         
         # Storage structures
-        self._messages: List[Message] = []
+        self._conversations: Dict[str, deque] = {}  # conversation_id -> recent messages
+        self._snapshot_ranges: Dict[str, Tuple[int, int]] = {}  # not yet loaded: byte range in the log
+        self._tail_spans: Dict[str, List[Tuple[int, int]]] = {}  # not yet loaded: byte ranges of lines after the snapshot
+        
+        # Background writer state
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._file_lock: Optional[asyncio.Lock] = None
+        self._load_task: Optional[asyncio.Task] = None
+        self._loaded = not self.persist_to_disk
+        self._appends_since_compaction = 0
+        self._last_compaction = time.monotonic()
+        self._last_fsync = time.monotonic()
         
         # Load existing data from disk if available
         if self.persist_to_disk:
             # Create storage directory if it doesn't exist
             self.storage_path.mkdir(parents=True, exist_ok=True)
-            # Load data synchronously during init
-            asyncio.create_task(self._load_from_disk())
+            # Start loading the index now if there is a running loop, otherwise on first use
+            try:
+                self._load_task = asyncio.get_running_loop().create_task(self._load_from_disk())
+            except RuntimeError:
+                pass
     
     async def store_message(self, message: Message) -> None:
         """
-        Store a message - simply append to list and file.
+        Store a message - append to its conversation and queue it for the log.
         
         Args:
             message: The message to store
@@ -53,86 +99,308 @@ class MemoryStorage(SimpleChatStorageInterface):
         if not self.enable_storage:
             return  # Skip storage if disabled
         
-        # Append message
-        self._messages.append(message)
+        buffer = await self._get_buffer(message.conversation_id)
+        buffer.append(message)
         
-        # Append to disk immediately
         if self.persist_to_disk:
-            await self._append_message_to_disk(message)
+            self._ensure_writer()
+            self._write_queue.put_nowait(message)
     
     async def get_conversation_messages(
-        self, 
-        conversation_id: str, 
+        self,
+        conversation_id: str,
         limit: int = 100,
         after_sequence_id: Optional[int] = None
     ) -> List[Message]:
         """
-        Get messages for a conversation - filter from the list.
+        Get messages for a conversation from its index.
         
         Args:
             conversation_id: The conversation ID
             limit: Maximum number of messages to return
             after_sequence_id: Ignored in simple implementation
-            
+        
         Returns:
             List of messages in order they were added
         """
-        # Filter messages for this conversation
-        conv_messages = [m for m in self._messages if m.conversation_id == conversation_id]
+        buffer = await self._get_buffer(conversation_id, create=False)
+        if not buffer or limit <= 0:
+            return []
         
-        # Apply limit (return most recent messages)
-        if len(conv_messages) > limit:
-            conv_messages = conv_messages[-limit:]
-        
-        return conv_messages
+        # Return the most recent messages without copying the whole buffer
+        if len(buffer) <= limit:
+            return list(buffer)
+        recent = list(islice(reversed(buffer), limit))
+        recent.reverse()
+        return recent
     
     async def clear_all(self) -> None:
         """
         Clear all data from memory storage.
         Used for test cleanup.
         """
-        self._messages.clear()
+        await self._ensure_loaded()
         
-        # Clear persisted data
         if self.persist_to_disk:
-            msg_file = self.storage_path / 'messages.jsonl'
-            if msg_file.exists():
-                # Clear the file by opening in write mode
-                with open(msg_file, 'w') as f:
-                    pass  # Empty file
-    
-    async def _append_message_to_disk(self, message: Message) -> None:
-        """Append message to messages.jsonl file"""
-        try:
-            msg_file = self.storage_path / 'messages.jsonl'
-            
-            # Write the message as-is using to_dict()
-            with open(msg_file, 'a') as f:
-                f.write(json.dumps(message.to_dict()) + '\n')
-                
-        except Exception as e:
-            # Log error silently
+            async with self._get_file_lock():
+                # Drop writes that have not reached the log yet
+                if self._write_queue is not None:
+                    while not self._write_queue.empty():
+                        self._write_queue.get_nowait()
+                        self._write_queue.task_done()
+                self._clear_memory()
+                await asyncio.to_thread(self._truncate_files)
+        else:
+            self._clear_memory()
+    
+    async def flush(self) -> None:
+        """Wait until every stored message has been written to the log."""
+        if self._write_queue is not None:
+            await self._write_queue.join()
+    
+    async def close(self) -> None:
+        """Flush pending writes and stop the background writer."""
+        await self.flush()
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+    
+    def _clear_memory(self) -> None:
+        self._conversations.clear()
+        self._snapshot_ranges.clear()
+        self._tail_spans.clear()
+        self._appends_since_compaction = 0
+    
+    def _truncate_files(self) -> None:
+        # Clear the file by opening in write mode
+        with open(self._msg_file, 'w'):
             pass
+        if self._index_file.exists():
+            self._index_file.unlink()
     
-    async def _load_from_disk(self) -> None:
-        """Load persisted state from disk"""
-        if not self.persist_to_disk:
+    def _get_file_lock(self) -> asyncio.Lock:
+        if self._file_lock is None:
+            self._file_lock = asyncio.Lock()
+        return self._file_lock
+    
+    async def _get_buffer(self, conversation_id: str, create: bool = True) -> Optional[deque]:
+        """
+        Get the ring buffer of a conversation, loading it from the log on first access.
+        
+        Args:
+            conversation_id: The conversation ID
+            create: Whether to create an empty buffer for an unknown conversation
+        
+        Returns:
+            The conversation's buffer, or None if unknown and not created
+        """
+        buffer = self._conversations.get(conversation_id)
+        if buffer is not None:
+            return buffer
+        
+        await self._ensure_loaded()
+        
+        if conversation_id in self._snapshot_ranges or conversation_id in self._tail_spans:
+            async with self._get_file_lock():
+                # Another task may have loaded it while we waited
+                buffer = self._conversations.get(conversation_id)
+                if buffer is None:
+                    buffer = await self._load_conversation(conversation_id)
+            return buffer
+        
+        buffer = self._conversations.get(conversation_id)
+        if buffer is None and create:
+            buffer = deque(maxlen=self.max_messages_per_conversation)
+            self._conversations[conversation_id] = buffer
+        return buffer
+    
+    async def _load_conversation(self, conversation_id: str) -> deque:
+        """Parse a conversation's snapshot range and tail lines into a buffer. Caller holds the file lock."""
+        byte_range = self._snapshot_ranges.pop(conversation_id, None)
+        spans = self._tail_spans.pop(conversation_id, [])
+        lines = await asyncio.to_thread(self._read_conversation, byte_range, spans)
+        
+        buffer = deque(maxlen=self.max_messages_per_conversation)
+        for line in lines[-self.max_messages_per_conversation:]:
+            try:
+                buffer.append(Message.from_dict(json.loads(line)))
+            except Exception as e:
+                logger.warning(f"Skipping unreadable message in {conversation_id}: {e}")
+        self._conversations[conversation_id] = buffer
+        return buffer
+    
+    def _read_conversation(self, byte_range: Optional[Tuple[int, int]],
+                           spans: List[Tuple[int, int]]) -> List[str]:
+        """Read the most recent lines of a conversation from its snapshot range and tail spans."""
+        limit = self.max_messages_per_conversation
+        with open(self._msg_file, 'rb') as f:
+            lines = [self._read_range(f, span)[0] for span in spans[-limit:]]
+            if byte_range and len(lines) < limit:
+                lines = self._read_range(f, byte_range) + lines
+        return lines
+    
+    @staticmethod
+    def _read_range(f, byte_range: Tuple[int, int]) -> List[str]:
+        start, end = byte_range
+        f.seek(start)
+        data = f.read(end - start)
+        return [line for line in data.decode('utf-8').split('\n') if line.strip()]
+    
+    async def _ensure_loaded(self) -> None:
+        if self._loaded:
             return
-            
+        if self._load_task is None:
+            self._load_task = asyncio.get_running_loop().create_task(self._load_from_disk())
+        await asyncio.shield(self._load_task)
+    
+    async def _load_from_disk(self) -> None:
+        """Load the snapshot index and scan log lines appended after it"""
         try:
-            # Load messages from JSONL file
-            msg_file = self.storage_path / 'messages.jsonl'
-            if msg_file.exists():
-                self._messages = []
-                with open(msg_file, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line:  # Skip empty lines
-                            msg_data = json.loads(line)
-                            message = Message.from_dict(msg_data)
-                            self._messages.append(message)
-            
+            ranges, tail_spans = await asyncio.to_thread(self._scan_log)
+            # Conversations written before loading finished are already in memory
+            for conversation_id in self._conversations:
+                ranges.pop(conversation_id, None)
+                tail_spans.pop(conversation_id, None)
+            self._snapshot_ranges = ranges
+            self._tail_spans = tail_spans
+            logger.info(f"Indexed {len(set(ranges) | set(tail_spans))} stored conversations")
         except Exception as e:
             # Don't fail if loading fails, just start fresh
-            pass
-            # Don't fail if loading fails, just start fresh
\ No newline at end of file
+            logger.warning(f"Failed to load chat messages from {self._msg_file}: {e}")
+        finally:
+            self._loaded = True
+    
+    def _scan_log(self) -> Tuple[Dict[str, Tuple[int, int]], Dict[str, List[Tuple[int, int]]]]:
+        """
+        Read the snapshot index, then parse only the lines after the snapshot.
+        Without a valid index the whole log is treated as tail.
+        
+        Returns:
+            Tuple of (conversation_id -> snapshot byte range, conversation_id -> byte ranges of tail lines)
+        """
+        if not self._msg_file.exists():
+            return {}, {}
+        
+        ranges = {}
+        snapshot_size = 0
+        file_size = self._msg_file.stat().st_size
+        if self._index_file.exists():
+            try:
+                with open(self._index_file, 'r') as f:
+                    index = json.load(f)
+                if index.get('snapshot_size', 0) <= file_size:
+                    snapshot_size = index['snapshot_size']
+                    ranges = {cid: tuple(r) for cid, r in index['conversations'].items()}
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Ignoring unreadable message index {self._index_file}: {e}")
+        
+        tail_spans: Dict[str, List[Tuple[int, int]]] = {}
+        with open(self._msg_file, 'rb') as f:
+            f.seek(snapshot_size)
+            offset = snapshot_size
+            for raw in f:
+                start, offset = offset, offset + len(raw)
+                line = raw.decode('utf-8').strip()
+                if not line:
+                    continue
+                try:
+                    conversation_id = json.loads(line).get('conversation_id')
+                except ValueError:
+                    continue  # Torn write at the end of the log
+                tail_spans.setdefault(conversation_id, []).append((start, offset))
+        return ranges, tail_spans
+    
+    def _ensure_writer(self) -> None:
+        if self._writer_task is None or self._writer_task.done():
+            if self._write_queue is None:
+                self._write_queue = asyncio.Queue()
+            self._writer_task = asyncio.get_running_loop().create_task(self._writer_loop())
+    
+    async def _writer_loop(self) -> None:
+        """Append queued messages to the log in batches, compacting it when due."""
+        while True:
+            message = await self._write_queue.get()
+            batch = [message]
+            while len(batch) < self.flush_batch_size and not self._write_queue.empty():
+                batch.append(self._write_queue.get_nowait())
+        
+            try:
+                async with self._get_file_lock():
+                    lines = [json.dumps(m.to_dict()) + '\n' for m in batch]
+                    await asyncio.to_thread(self._append_lines, lines)
+                    self._appends_since_compaction += len(batch)
+        
+                    if self._write_queue.empty() and self._compaction_due():
+                        await self._compact()
+            except Exception as e:
+                logger.error(f"Failed to persist {len(batch)} chat messages: {e}")
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+    
+    def _append_lines(self, lines: List[str]) -> None:
+        with open(self._msg_file, 'a') as f:
+            f.writelines(lines)
+            f.flush()
+            now = time.monotonic()
+            if self.fsync_policy == FSYNC_ALWAYS or (
+                self.fsync_policy == FSYNC_INTERVAL and now - self._last_fsync >= self.fsync_interval_seconds
+            ):
+                os.fsync(f.fileno())
+                self._last_fsync = now
+    
+    def _compaction_due(self) -> bool:
+        return (self._appends_since_compaction >= self.compact_min_appends
+                and time.monotonic() - self._last_compaction >= self.compact_interval_seconds)
+    
+    async def _compact(self) -> None:
+        """
+        Rewrite the log as a snapshot of all its lines, grouped by conversation, and
+        write the index of byte ranges. Caller holds the file lock and the write queue
+        is empty, so every stored message is in the log.
+        """
+        ranges = await asyncio.to_thread(self._write_snapshot)
+        
+        # Unloaded conversations now live entirely in the snapshot
+        for cid in set(self._snapshot_ranges) | set(self._tail_spans):
+            self._snapshot_ranges[cid] = ranges[cid]
+        self._tail_spans.clear()
+        self._appends_since_compaction = 0
+        self._last_compaction = time.monotonic()
+        logger.info(f"Compacted chat message log to {len(ranges)} conversations")
+    
+    def _write_snapshot(self) -> Dict[str, Tuple[int, int]]:
+        old_ranges, tail_spans = self._scan_log()
+        tmp_file = self._msg_file.with_suffix('.jsonl.tmp')
+        ranges = {}
+        with open(self._msg_file, 'rb') as src, open(tmp_file, 'wb') as out:
+            for cid in list(old_ranges) + [c for c in tail_spans if c not in old_ranges]:
+                start = out.tell()
+                byte_range = old_ranges.get(cid)
+                if byte_range:
+                    src.seek(byte_range[0])
+                    out.write(src.read(byte_range[1] - byte_range[0]))
+                for span in tail_spans.get(cid, []):
+                    for line in self._read_range(src, span):
+                        out.write((line + '\n').encode('utf-8'))
+                ranges[cid] = (start, out.tell())
+            snapshot_size = out.tell()
+            out.flush()
+            os.fsync(out.fileno())
+        
+        # Replace the log first; a stale index is rejected or only narrows what is snapshotted
+        if self._index_file.exists():
+            self._index_file.unlink()
+        os.replace(tmp_file, self._msg_file)
+        
+        tmp_index = self._index_file.with_suffix('.json.tmp')
+        with open(tmp_index, 'w') as f:
+            json.dump({'snapshot_size': snapshot_size, 'conversations': ranges}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_index, self._index_file)
+        return ranges
@@ -25,6 +25,7 @@ import traceback
 import core.query_analysis.relevance_detection as relevance_detection
 import core.fastTrack as fastTrack
 from core.fastTrack import site_supports_standard_retrieval
+from core.prepare_cache import PrepareResult, get_prepare_cache, request_key
 import core.post_ranking as post_ranking
 import core.router as router
 import methods.accompaniment as accompaniment
@@ -283,14 +284,25 @@ class NLWebHandler:
             raise
     
     async def prepare(self):
+        # Check if a specific tool is requested via the 'tool' parameter
+        requested_tool = get_param(self.query_params, "tool", str, None)
+
+        # Reuse the results of an identical earlier request if nothing changed since
+        prepare_cache = get_prepare_cache()
+        if prepare_cache is not None:
+            cache_key = request_key(self, requested_tool)
+            cached = prepare_cache.get(cache_key, self.site)
+            if cached is not None:
+                await self._apply_cached_preparation(cached)
+                return
+            generation = prepare_cache.generation(self.site)
+
         tasks = []
 
         tasks.append(asyncio.create_task(self.decontextualizeQuery().do()))
         tasks.append(asyncio.create_task(fastTrack.FastTrack(self).do()))
         tasks.append(asyncio.create_task(query_rewrite.QueryRewrite(self).do()))
         
-        # Check if a specific tool is requested via the 'tool' parameter
-        requested_tool = get_param(self.query_params, "tool", str, None)
         if requested_tool:
             # Skip tool selection and use the requested tool directly
             # Set tool_routing_results to use the specified tool
@@ -310,13 +322,14 @@ class NLWebHandler:
      #   tasks.append(asyncio.create_task(memory.Memory(self).do()))
      #   tasks.append(asyncio.create_task(required_info.RequiredInfo(self).do()))
         
+        results = None
         try:
             if CONFIG.should_raise_exceptions():
                 # In testing/development mode, raise exceptions to fail tests properly
-                await asyncio.gather(*tasks)
+                results = await asyncio.gather(*tasks)
             else:
                 # In production mode, catch exceptions to avoid crashing
-                await asyncio.gather(*tasks, return_exceptions=True)
+                results = await asyncio.gather(*tasks, return_exceptions=True)
         except Exception as e:
             if CONFIG.should_raise_exceptions():
                 raise  # Re-raise in testing/development mode
@@ -340,8 +353,56 @@ class NLWebHandler:
                 self.final_retrieved_items = items
                 self.retrieval_done_event.set()
         
+        # Only complete preparations are cached: no failed step, and not ended early
+        if (prepare_cache is not None and results is not None
+                and not any(isinstance(r, BaseException) for r in results)
+                and not self.query_done and self.connection_alive_event.is_set()):
+            prepare_cache.put(cache_key, self.site, generation, PrepareResult(
+                decontextualized_query=self.decontextualized_query,
+                requires_decontextualization=self.requires_decontextualization,
+                context_description=self.context_description,
+                rewritten_queries=getattr(self, 'rewritten_queries', None),
+                tool_routing_results=self.tool_routing_results,
+                retrieved_items=self.final_retrieved_items
+            ))
+        
         logger.info("Preparation phase completed")
 
+    async def _apply_cached_preparation(self, cached):
+        """Restore cached prepare-phase results instead of running the pre-checks and retrieval."""
+        logger.info(f"Using cached preparation for query: {self.query}")
+        self.decontextualized_query = cached.decontextualized_query
+        self.requires_decontextualization = cached.requires_decontextualization
+        if cached.context_description:
+            self.context_description = cached.context_description
+        if cached.rewritten_queries is not None:
+            self.rewritten_queries = cached.rewritten_queries
+        self.tool_routing_results = cached.tool_routing_results
+        self.final_retrieved_items = cached.retrieved_items
+
+        # Release anything waiting on the skipped steps
+        for step_name in ("Decon", "ToolSelector"):
+            self.state.start_precheck_step(step_name)
+            await self.state.precheck_step_done(step_name)
+        self.pre_checks_done_event.set()
+        self.state.set_pre_checks_done()
+        self.retrieval_done_event.set()
+        self.state.abort_fast_track_if_needed()
+
+        # Send the messages the skipped steps would have sent
+        if self.decontextualized_query != self.query:
+            await self.send_message({
+                "message_type": "decontextualized_query",
+                "decontextualized_query": self.decontextualized_query,
+                "original_query": self.query
+            })
+        if cached.rewritten_queries and len(cached.rewritten_queries) > 1:
+            await self.send_message({
+                "message_type": "query_rewrite",
+                "original_query": self.decontextualized_query,
+                "rewritten_queries": cached.rewritten_queries,
+            })
+
     def decontextualizeQuery(self):
         if (len(self.prev_queries) < 1):
             self.decontextualized_query = self.query
@@ -56,6 +56,7 @@ class RetrievalProviderConfig:
     use_knn: Optional[bool] = None
     enabled: bool = False
     vector_type: Optional[Dict[str, Any]] = None
+    max_concurrency: Optional[int] = None  # In-flight requests allowed to this endpoint
 @dataclass
 class SSLConfig:
     enabled: bool = False
@@ -98,6 +99,21 @@ class NLWebConfig:
     required_info_enabled: bool = True  # Enable or disable required info checking
     api_keys: Dict[str, str] = field(default_factory=dict)  # API keys for external services
     who_endpoint: str = "http://localhost:8000/who"  # Endpoint for /who requests
+    ranking_batch_size: int = 1  # Items scored per ranking LLM call; 1 ranks items one by one
+    ranking_max_concurrency: int = 32  # In-flight ranking LLM calls per process
+    ranking_max_concurrency_per_handler: int = 8  # In-flight ranking LLM calls per query
+    ranking_cache_enabled: bool = False  # Reuse LLM ranking scores across queries
+    ranking_cache_max_entries: int = 50000
+    ranking_cache_ttl_seconds: float = 86400
+    ranking_cache_path: Optional[str] = None  # SQLite file for the on-disk tier; None keeps it in memory
+    ranking_cache_max_disk_rows: int = 500000  # Rows kept in the on-disk tier; oldest are deleted first
+    tool_prerouter_enabled: bool = False  # Short-list tools by embedding similarity before LLM evaluation
+    tool_prerouter_top_k: int = 3  # Tools sent to the LLM (search is always included)
+    tool_prerouter_min_similarity: float = 0.5  # Similarity needed to select a tool without the LLM
+    tool_prerouter_skip_margin: float = 0.1  # Lead over the second tool needed to skip the LLM
+    prepare_cache_enabled: bool = False  # Reuse prepare-phase results of identical requests
+    prepare_cache_max_entries: int = 1000
+    prepare_cache_ttl_seconds: float = 600
 
 @dataclass
 class ConversationStorageConfig:
@@ -323,6 +339,11 @@ class AppConfig:
         
         # Get the write endpoint for database modifications
         self.write_endpoint: str = data.get("write_endpoint", None)
+        
+        # Concurrent retrieval: reads take no process-wide lock, writes lock per site
+        self.concurrent_retrieval: bool = data.get("concurrent_retrieval", True)
+        # Default admission limit for endpoints without their own max_concurrency
+        self.retrieval_max_concurrency: int = data.get("max_concurrency_per_endpoint", 8)
 
         # Changed from providers to endpoints
         for name, cfg in data.get("endpoints", {}).items():
@@ -337,7 +358,8 @@ class AppConfig:
                 db_type=self._get_config_value(cfg.get("db_type")),  # Add db_type
                 enabled=cfg.get("enabled", False),  # Add enabled field
                 use_knn=cfg.get("use_knn"),
-                vector_type=cfg.get("vector_type")
+                vector_type=cfg.get("vector_type"),
+                max_concurrency=cfg.get("max_concurrency")
             )
     
     def load_webserver_config(self, path: str = "config_webserver.yaml"):
@@ -473,6 +495,34 @@ class AppConfig:
         # Load headers from config
         headers = data.get("headers", {})
         
+        # Load ranking batching and concurrency limits
+        ranking_batch_size = int(self._get_config_value(data.get("ranking_batch_size"), 1))
+        ranking_max_concurrency = int(self._get_config_value(data.get("ranking_max_concurrency"), 32))
+        ranking_max_concurrency_per_handler = int(
+            self._get_config_value(data.get("ranking_max_concurrency_per_handler"), 8)
+        )
+        
+        # Load ranking score cache settings
+        ranking_cache = data.get("ranking_cache", {}) or {}
+        ranking_cache_enabled = self._get_config_value(ranking_cache.get("enabled"), False)
+        ranking_cache_max_entries = int(self._get_config_value(ranking_cache.get("max_entries"), 50000))
+        ranking_cache_ttl_seconds = float(self._get_config_value(ranking_cache.get("ttl_seconds"), 86400))
+        ranking_cache_path = self._get_config_value(ranking_cache.get("path"), None)
+        ranking_cache_max_disk_rows = int(self._get_config_value(ranking_cache.get("max_disk_rows"), 500000))
+
+        # Tool pre-router settings
+        tool_prerouter = data.get("tool_prerouter", {}) or {}
+        tool_prerouter_enabled = self._get_config_value(tool_prerouter.get("enabled"), False)
+        tool_prerouter_top_k = int(self._get_config_value(tool_prerouter.get("top_k"), 3))
+        tool_prerouter_min_similarity = float(self._get_config_value(tool_prerouter.get("min_similarity"), 0.5))
+        tool_prerouter_skip_margin = float(self._get_config_value(tool_prerouter.get("skip_margin"), 0.1))
+
+        # Prepare-phase cache settings
+        prepare_cache = data.get("prepare_cache", {}) or {}
+        prepare_cache_enabled = self._get_config_value(prepare_cache.get("enabled"), False)
+        prepare_cache_max_entries = int(self._get_config_value(prepare_cache.get("max_entries"), 1000))
+        prepare_cache_ttl_seconds = float(self._get_config_value(prepare_cache.get("ttl_seconds"), 600))
+        
         # Load API keys from config
         api_keys = {}
         if "api_keys" in data:
@@ -505,7 +555,22 @@ class AppConfig:
             decontextualize_enabled=decontextualize_enabled,
             required_info_enabled=required_info_enabled,
             api_keys=api_keys,
-            who_endpoint=who_endpoint
+            who_endpoint=who_endpoint,
+            ranking_batch_size=ranking_batch_size,
+            ranking_max_concurrency=ranking_max_concurrency,
+            ranking_max_concurrency_per_handler=ranking_max_concurrency_per_handler,
+            ranking_cache_enabled=ranking_cache_enabled,
+            ranking_cache_max_entries=ranking_cache_max_entries,
+            ranking_cache_ttl_seconds=ranking_cache_ttl_seconds,
+            ranking_cache_path=ranking_cache_path,
+            ranking_cache_max_disk_rows=ranking_cache_max_disk_rows,
+            tool_prerouter_enabled=tool_prerouter_enabled,
+            tool_prerouter_top_k=tool_prerouter_top_k,
+            tool_prerouter_min_similarity=tool_prerouter_min_similarity,
+            tool_prerouter_skip_margin=tool_prerouter_skip_margin,
+            prepare_cache_enabled=prepare_cache_enabled,
+            prepare_cache_max_entries=prepare_cache_max_entries,
+            prepare_cache_ttl_seconds=prepare_cache_ttl_seconds
         )
     
     def get_chatbot_instructions(self, instruction_type: str = "search_results") -> str:
@@ -0,0 +1,241 @@
+# Copyright (c) 2025 Microsoft Corporation.
+# Licensed under the MIT License
+
+"""
+Cache of NLWebHandler prepare-phase results: decontextualized query, query
+rewrites, tool routing and retrieved items.
+
+WARNING: This code is under development and may undergo changes in future releases.
+Backwards compatibility is not guaranteed at this time.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.config import CONFIG
+from misc.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("prepare_cache")
+
+# Config files whose prompts drive the prepare phase
+PROMPT_FILES = ["prompts.xml", "tools.xml"]
+
+# Generation key of requests over all sites
+ALL_SITES = "all"
+
+
+@dataclass
+class PrepareResult:
+    """Prepare-phase artifacts of one request."""
+    decontextualized_query: str
+    requires_decontextualization: bool = False
+    context_description: str = ""
+    rewritten_queries: Optional[List[str]] = None
+    tool_routing_results: List[Dict[str, Any]] = field(default_factory=list)
+    retrieved_items: List[Any] = field(default_factory=list)
+
+    def copy(self) -> "PrepareResult":
+        """
+        Copy that callers may modify. Tool objects are shared; routing results,
+        their parameters and the retrieved items are copied.
+        """
+        return PrepareResult(
+            decontextualized_query=self.decontextualized_query,
+            requires_decontextualization=self.requires_decontextualization,
+            context_description=self.context_description,
+            rewritten_queries=list(self.rewritten_queries) if self.rewritten_queries is not None else None,
+            tool_routing_results=[
+                {**result, "result": copy.deepcopy(result.get("result"))}
+                for result in self.tool_routing_results
+            ],
+            retrieved_items=copy.deepcopy(self.retrieved_items),
+        )
+
+
+_prompt_version: Tuple[Any, str] = (None, "")
+
+
+def prompt_version() -> str:
+    """Hash of the prompt and tool definitions, recomputed when the files change."""
+    global _prompt_version
+    paths = [os.path.join(CONFIG.config_directory, name) for name in PROMPT_FILES]
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime, stat.st_size))
+        except OSError:
+            signature.append((path, None, None))
+    signature = tuple(signature)
+
+    if _prompt_version[0] != signature:
+        digest = hashlib.sha256()
+        for path in paths:
+            try:
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+            except OSError:
+                digest.update(path.encode("utf-8"))
+        _prompt_version = (signature, digest.hexdigest())
+    return _prompt_version[1]
+
+
+def site_list(site: Any) -> List[str]:
+    """Sites of a request as a sorted list."""
+    if isinstance(site, (list, tuple)):
+        return sorted(str(s) for s in site) or [ALL_SITES]
+    return [str(site) if site else ALL_SITES]
+
+
+def request_key(handler, requested_tool: Optional[str] = None) -> str:
+    """
+    Cache key of a handler's prepare phase: the query, sites, a hash of the
+    conversation context and the prompt version, plus the request parameters
+    that change how the query is prepared.
+    """
+    query_params = handler.query_params or {}
+    context = json.dumps([
+        handler.prev_queries,
+        handler.last_answers,
+        handler.context_url,
+        handler.context_description,
+    ], sort_keys=True, default=str)
+    payload = json.dumps([
+        handler.query,
+        site_list(handler.site),
+        hashlib.sha256(context.encode("utf-8")).hexdigest(),
+        prompt_version(),
+        handler.decontextualized_query,
+        handler.generate_mode,
+        str(handler.item_type),
+        handler.required_item_type,
+        requested_tool,
+        query_params.get("db") or query_params.get("retrieval_backend"),
+    ], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PrepareCache:
+    """
+    LRU cache of prepare-phase results with a TTL.
+
+    Entries are invalidated by site: every write to a site bumps that site's
+    generation (and the generation of requests over all sites), and an entry
+    is only used while the generations it was computed under are current.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 600):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of requests held
+            ttl_seconds: Age after which an entry is no longer used
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (created_at, generation, result)
+        self._site_generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def generation(self, site: Any) -> Tuple[int, ...]:
+        """Current generation of a request's sites; snapshot it before computing an entry."""
+        with self._lock:
+            return tuple(self._site_generations.get(s, 0) for s in site_list(site))
+
+    def get(self, key: str, site: Any) -> Optional[PrepareResult]:
+        """
+        Look up a request.
+
+        Args:
+            key: Request key from request_key()
+            site: Sites of the request
+
+        Returns:
+            Copy of the cached result, or None
+        """
+        now = time.time()
+        generation = self.generation(site)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (now - entry[0] >= self.ttl_seconds or entry[1] != generation):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2].copy()
+
+    def put(self, key: str, site: Any, generation: Tuple[int, ...], result: PrepareResult) -> None:
+        """
+        Store a request's result.
+
+        Args:
+            key: Request key from request_key()
+            site: Sites of the request
+            generation: generation(site) taken before the result was computed;
+                the result is dropped if a site was written since
+            result: Prepare-phase artifacts
+        """
+        if generation != self.generation(site):
+            logger.debug("Not caching prepare result computed across a site write")
+            return
+        result = result.copy()
+        with self._lock:
+            self._entries[key] = (time.time(), generation, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_site(self, site: str) -> None:
+        """Drop results depending on a site, after documents of the site were written."""
+        with self._lock:
+            for name in {str(site) if site else ALL_SITES, ALL_SITES}:
+                self._site_generations[name] = self._site_generations.get(name, 0) + 1
+            self.invalidations += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and entry count."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+        }
+
+
+_prepare_cache = None
+
+
+def get_prepare_cache() -> Optional[PrepareCache]:
+    """Get the process-wide prepare cache, or None if disabled in config."""
+    global _prepare_cache
+    if not CONFIG.nlweb.prepare_cache_enabled:
+        return None
+    if _prepare_cache is None:
+        _prepare_cache = PrepareCache(
+            max_entries=CONFIG.nlweb.prepare_cache_max_entries,
+            ttl_seconds=CONFIG.nlweb.prepare_cache_ttl_seconds,
+        )
+    return _prepare_cache
+
+
+def invalidate_sites(sites: List[str]) -> None:
+    """Invalidate cached prepare results of written sites; a no-op when the cache is disabled."""
+    if _prepare_cache is None:
+        return
+    for site in set(sites):
+        _prepare_cache.invalidate_site(site)
@@ -10,6 +10,8 @@ Backwards compatibility is not guaranteed at this time.
 
 from core.utils.utils import log
 from core.llm import ask_llm
+from core.config import CONFIG
+from core.ranking_cache import get_ranking_cache, context_key, item_key
 import asyncio
 import json
 from core.utils.json_utils import trim_json
@@ -19,6 +21,16 @@ from core.schemas import create_assistant_result, create_status_message, Message
 
 logger = get_configured_logger("ranking_engine")
 
+# Process-wide cap on in-flight ranking LLM calls, created on first use
+_process_llm_semaphore = None
+
+
+def _get_process_llm_semaphore():
+    global _process_llm_semaphore
+    if _process_llm_semaphore is None:
+        _process_llm_semaphore = asyncio.Semaphore(CONFIG.nlweb.ranking_max_concurrency)
+    return _process_llm_semaphore
+
 
 class Ranking:
      
@@ -100,6 +112,15 @@ The user's question is: {request.query}. The item's description is {item.descrip
                           {"score": "integer between 0 and 100",
                            "description": "product-focused description with brand, price, and key features"}]
  
+    # Wraps the ranking prompt when several items are scored in one call
+    BATCH_PROMPT_PREFIX = """You are given {count} numbered items. Apply the following instructions to each
+item independently, as if it were the only item, and return one entry per item with its item number as "index".
+
+"""
+
+    # Pause before retrying a batch whose call failed as a whole (often a rate limit)
+    BATCH_RETRY_DELAY_SECONDS = 1.0
+
     RANKING_PROMPT_NAME = "RankingPrompt"
      
     def get_ranking_prompt(self):
@@ -157,6 +178,101 @@ The user's question is: {request.query}. The item's description is {item.descrip
         self.rankedAnswers = []
         self.ranking_type = ranking_type
 #        self._results_lock = asyncio.Lock()  # Add lock for thread-safe operations
+        self.batch_size = max(1, CONFIG.nlweb.ranking_batch_size)
+        # Rankings of past conversations describe private messages; keep them out of the shared cache
+        self.cache = None if ranking_type == Ranking.CONVERSATION_SEARCH else get_ranking_cache()
+        self.cache_context = None  # Set by do() from the query this ranking runs for
+        # Shared by every ranker (fast track and regular) working for this handler
+        if getattr(handler, "ranking_llm_semaphore", None) is None:
+            handler.ranking_llm_semaphore = asyncio.Semaphore(CONFIG.nlweb.ranking_max_concurrency_per_handler)
+
+    async def ask_ranking_llm(self, prompt, ans_struc, **kwargs):
+        """Call the LLM once admitted by both the per-handler and per-process limits."""
+        async with self.handler.ranking_llm_semaphore:
+            async with _get_process_llm_semaphore():
+                ranking = await ask_llm(prompt, ans_struc, level=self.level,
+                                        query_params=self.handler.query_params, **kwargs)
+        if not ranking:
+            logger.warning("Ranking LLM call returned no result (timeout or provider error)")
+        return ranking
+
+    def getCacheContext(self):
+        """Cache context for this ranking: filled prompt (query, item type), answer structure, model."""
+        prompt_str, ans_struc = self.get_ranking_prompt()
+        prompt_context = fill_prompt(prompt_str, self.handler, {"item.description": "{item.description}"})
+        provider = CONFIG.preferred_llm_endpoint
+        level = self.level
+        if CONFIG.is_development_mode() and self.handler.query_params:
+            provider = self.handler.query_params.get("llm_provider", provider)
+            level = self.handler.query_params.get("llm_level", level)
+        return context_key(prompt_context, ans_struc, level, provider)
+
+    def cacheRanking(self, url, json_str, ranking):
+        """Remember a successful ranking for this item."""
+        if self.cache is None or self.cache_context is None:
+            return
+        if isinstance(ranking, dict) and "score" in ranking:
+            self.cache.put(item_key(self.cache_context, url, json_str), ranking)
+
+    async def takeCachedRankings(self, items):
+        """
+        Split items into answers built from cached rankings and items still to be ranked.
+        """
+        if self.cache is None or self.cache_context is None or not items:
+            return [], list(items)
+        keys = [item_key(self.cache_context, url, json_str) for url, json_str, _, _ in items]
+        cached = await self.cache.get_many(keys)
+        answers = []
+        remaining = []
+        for item, key in zip(items, keys):
+            if key not in cached:
+                remaining.append(item)
+                continue
+            try:
+                answers.append(self.buildAnswer(*item, cached[key]))
+            except Exception as e:
+                logger.error(f"Error building cached answer for {item[2]}: {str(e)}")
+                remaining.append(item)
+        if answers:
+            logger.info(f"Ranking cache: {len(answers)}/{len(items)} items served from cache {self.ranking_type_str}")
+        return answers, remaining
+
+    async def sendCachedAnswers(self, answers):
+        """Send cached high score answers right away, like early sends from LLM ranking."""
+        early = [a for a in answers if a["ranking"]["score"] > self.EARLY_SEND_THRESHOLD]
+        if early:
+            try:
+                await self.sendAnswers(early)
+            except (BrokenPipeError, ConnectionResetError):
+                logger.warning("Client disconnected while sending cached answers")
+                self.handler.connection_alive_event.clear()
+        self.rankedAnswers.extend(answers)
+
+    def buildAnswer(self, url, json_str, name, site, ranking):
+        """Build a ranked answer record, applying the required item type filter."""
+        # Handle both string and dictionary inputs for json_str
+        schema_object = json_str if isinstance(json_str, dict) else json.loads(json_str)
+        
+        # If schema_object is an array, set it to the first item
+        if isinstance(schema_object, list) and len(schema_object) > 0:
+            schema_object = schema_object[0]
+        
+        ansr = {
+            'url': url,
+            'site': site,
+            'name': name,
+            'ranking': ranking,
+            'schema_object': schema_object,
+            'sent': False,
+        }
+        
+        # Check if required_item_type is specified and filter based on @type
+        if self.handler.required_item_type is not None:
+            item_type = schema_object.get('@type', None)
+            if item_type != self.handler.required_item_type:
+                logger.debug(f"Item type mismatch: expected {self.handler.required_item_type}, got {item_type} - setting score to 0")
+                ranking["score"] = 0
+        return ansr
 
     async def rankItem(self, url, json_str, name, site):
        
@@ -168,30 +284,9 @@ The user's question is: {request.query}. The item's description is {item.descrip
             prompt_str, ans_struc = self.get_ranking_prompt()
             description = trim_json(json_str)
             prompt = fill_prompt(prompt_str, self.handler, {"item.description": description})
-            ranking = await ask_llm(prompt, ans_struc, level=self.level, query_params=self.handler.query_params)
-            
-            # Handle both string and dictionary inputs for json_str
-            schema_object = json_str if isinstance(json_str, dict) else json.loads(json_str)
-            
-            # If schema_object is an array, set it to the first item
-            if isinstance(schema_object, list) and len(schema_object) > 0:
-                schema_object = schema_object[0]
-            
-            ansr = {
-                'url': url,
-                'site': site,
-                'name': name,
-                'ranking': ranking,
-                'schema_object': schema_object,
-                'sent': False,
-            }
-            
-            # Check if required_item_type is specified and filter based on @type
-            if self.handler.required_item_type is not None:
-                item_type = schema_object.get('@type', None)
-                if item_type != self.handler.required_item_type:
-                    logger.debug(f"Item type mismatch: expected {self.handler.required_item_type}, got {item_type} - setting score to 0")
-                    ranking["score"] = 0
+            ranking = await self.ask_ranking_llm(prompt, ans_struc)
+            self.cacheRanking(url, json_str, ranking)
+            ansr = self.buildAnswer(url, json_str, name, site, ranking)
             
             if (ranking["score"] > self.EARLY_SEND_THRESHOLD):
                 logger.info(f"High score item: {name} (score: {ranking['score']}) - sending early {self.ranking_type_str}")
@@ -209,11 +304,97 @@ The user's question is: {request.query}. The item's description is {item.descrip
         except Exception as e:
             logger.error(f"Error in rankItem for {name}: {str(e)}")
             logger.debug(f"Full error trace: ", exc_info=True)
-            # Import here to avoid circular import
-            from config.config import CONFIG
             if CONFIG.should_raise_exceptions():
                 raise  # Re-raise in testing/development mode
 
+    async def askBatchRankings(self, batch):
+        """Ask the LLM to score a batch of items; returns rankings by item index (empty on failure)."""
+        prompt_str, ans_struc = self.get_ranking_prompt()
+        descriptions = "\n\n".join(
+            f"Item {i}: {trim_json(json_str)}" for i, (_, json_str, _, _) in enumerate(batch)
+        )
+        prompt = self.BATCH_PROMPT_PREFIX.format(count=len(batch)) + fill_prompt(
+            prompt_str, self.handler, {"item.description": descriptions}
+        )
+        batch_struc = {"items": [{"index": "integer item number", **ans_struc}]}
+        response = await self.ask_ranking_llm(
+            prompt, batch_struc,
+            timeout=8 + len(batch),
+            max_length=512 + 160 * len(batch),
+        )
+        
+        rankings = {}
+        entries = response.get("items", []) if isinstance(response, dict) else []
+        for entry in entries:
+            try:
+                index = int(entry.pop("index"))
+                entry["score"] = int(entry["score"])
+                if 0 <= index < len(batch):
+                    rankings[index] = entry
+            except (AttributeError, KeyError, TypeError, ValueError):
+                continue
+        return rankings
+
+    async def rankBatch(self, batch):
+        """Score several items with one LLM call.
+        
+        Early sending applies per batch: every item above EARLY_SEND_THRESHOLD is
+        sent together once the batch returns. If the call fails as a whole (timeout,
+        rate limit, unusable response) the batch is retried once as a batch and then
+        given up, so a throttled provider never gets more calls than batches. Only
+        items missing from a partial response are ranked individually.
+        """
+        if (self.ranking_type == Ranking.FAST_TRACK and self.handler.state.should_abort_fast_track()):
+            logger.info("Fast track aborted, skipping batch ranking")
+            return
+        
+        unscored = []
+        try:
+            rankings = await self.askBatchRankings(batch)
+            if not rankings and self.handler.connection_alive_event.is_set():
+                logger.info(f"Batch ranking of {len(batch)} items failed, retrying once {self.ranking_type_str}")
+                await asyncio.sleep(self.BATCH_RETRY_DELAY_SECONDS)
+                rankings = await self.askBatchRankings(batch)
+            if not rankings:
+                logger.warning(f"Batch ranking of {len(batch)} items failed twice, leaving them unranked")
+                return
+            
+            answers = []
+            for i, (url, json_str, name, site) in enumerate(batch):
+                ranking = rankings.get(i)
+                if ranking is None:
+                    unscored.append(batch[i])
+                    continue
+                self.cacheRanking(url, json_str, ranking)
+                try:
+                    answers.append(self.buildAnswer(url, json_str, name, site, ranking))
+                except Exception as e:
+                    logger.error(f"Error in rankBatch for {name}: {str(e)}")
+            
+            early = [a for a in answers if a["ranking"]["score"] > self.EARLY_SEND_THRESHOLD]
+            if early:
+                logger.info(f"Sending {len(early)} high score items early from batch of {len(batch)} {self.ranking_type_str}")
+                try:
+                    await self.sendAnswers(early)
+                except (BrokenPipeError, ConnectionResetError):
+                    logger.warning("Client disconnected while sending early answers")
+                    self.handler.connection_alive_event.clear()
+                    return
+            
+            self.rankedAnswers.extend(answers)
+            logger.debug(f"Batch of {len(batch)} ranked, {len(answers)} scored")
+        
+        except Exception as e:
+            logger.error(f"Error in rankBatch: {str(e)}")
+            logger.debug(f"Full error trace: ", exc_info=True)
+            if CONFIG.should_raise_exceptions():
+                raise
+        
+        if unscored and self.handler.connection_alive_event.is_set():
+            # rankItem goes through the same per-handler and per-process LLM limits
+            logger.info(f"Ranking {len(unscored)} items individually after partial batch response")
+            await asyncio.gather(*(self.rankItem(*item) for item in unscored), return_exceptions=True)
+
     def shouldSend(self, result):
         # Don't send if we've already reached the limit
         if self.num_results_sent >= self.NUM_RESULTS_TO_SEND:
@@ -347,15 +528,41 @@ The user's question is: {request.query}. The item's description is {item.descrip
     
     async def do(self):
         logger.info(f"Starting ranking process with {len(self.items)} items")
+        cached_answers, to_rank = [], self.items
+        if self.cache is not None:
+            try:
+                self.cache_context = self.getCacheContext()
+                cached_answers, to_rank = await self.takeCachedRankings(self.items)
+            except Exception as e:
+                logger.warning(f"Ranking cache lookup failed, ranking all items: {str(e)}")
+                self.cache_context = None
+        
+        batch_size = self.batch_size
+        if batch_size > 1 and not isinstance(self.get_ranking_prompt()[1], dict):
+            # Batched answers extend the prompt's answer structure, so it must be a dict
+            logger.warning(f"Ranking prompt has no usable answer structure, ranking items one by one {self.ranking_type_str}")
+            batch_size = 1
+
         tasks = []
-        for url, json_str, name, site in self.items:
-            if self.handler.connection_alive_event.is_set():  # Only add new tasks if connection is still alive
-                tasks.append(asyncio.create_task(self.rankItem(url, json_str, name, site)))
-            else:
-                logger.warning("Connection lost, not creating new ranking tasks")
+        if batch_size > 1:
+            for i in range(0, len(to_rank), batch_size):
+                if self.handler.connection_alive_event.is_set():  # Only add new tasks if connection is still alive
+                    tasks.append(asyncio.create_task(self.rankBatch(to_rank[i:i + batch_size])))
+                else:
+                    logger.warning("Connection lost, not creating new ranking tasks")
+        else:
+            for url, json_str, name, site in to_rank:
+                if self.handler.connection_alive_event.is_set():  # Only add new tasks if connection is still alive
+                    tasks.append(asyncio.create_task(self.rankItem(url, json_str, name, site)))
+                else:
+                    logger.warning("Connection lost, not creating new ranking tasks")
        
         await self.sendMessageOnSitesBeingAsked(self.items)
 
+        # Cached rankings go out while the LLM ranks the rest
+        if cached_answers:
+            await self.sendCachedAnswers(cached_answers)
+
         try:
             logger.debug(f"Running {len(tasks)} ranking tasks concurrently")
             await asyncio.gather(*tasks, return_exceptions=True)
@@ -363,6 +570,9 @@ The user's question is: {request.query}. The item's description is {item.descrip
             logger.error(f"Error during ranking tasks: {str(e)}")
             log(f"Error during ranking tasks: {str(e)}")
 
+        if self.cache is not None:
+            await self.cache.flush()
+
         if not self.handler.connection_alive_event.is_set():
             logger.warning("Connection lost during ranking, skipping sending results")
             log("Connection lost during ranking, skipping sending results")
@@ -0,0 +1,239 @@
+# Copyright (c) 2025 Microsoft Corporation.
+# Licensed under the MIT License
+
+"""
+Cache of LLM ranking results, keyed by query, item content and ranking prompt.
+
+WARNING: This code is under development and may undergo changes in future releases.
+Backwards compatibility is not guaranteed at this time.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from core.config import CONFIG
+from misc.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("ranking_cache")
+
+
+def content_hash(schema_object: Any) -> str:
+    """Stable hash of an item's schema_object (dict, list or JSON string)."""
+    if isinstance(schema_object, str):
+        try:
+            schema_object = json.loads(schema_object)
+        except (TypeError, ValueError):
+            return hashlib.sha256(schema_object.encode("utf-8")).hexdigest()
+    payload = json.dumps(schema_object, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def context_key(prompt_context: str, ans_struc: Any, level: str, provider: Optional[str]) -> str:
+    """
+    Hash of everything about a ranking call except the item itself: the prompt
+    with the query filled in, the answer structure, the model level and the provider.
+    """
+    payload = json.dumps([prompt_context, ans_struc, level, provider], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def item_key(ctx_key: str, url: str, schema_object: Any) -> str:
+    """Cache key for one item ranked under a given context."""
+    return hashlib.sha256(f"{ctx_key}|{url}|{content_hash(schema_object)}".encode("utf-8")).hexdigest()
+
+
+class RankingCache:
+    """
+    LRU cache of ranking results with a TTL and an optional SQLite tier.
+
+    Rankings are stored and returned as copies, because callers adjust them
+    (for example zeroing the score of items of the wrong type). Writes reach
+    the disk tier in batches, when flush() is awaited at the end of a ranking pass.
+    Disk reads and writes run in a worker thread so they never block the event loop.
+    """
+
+    def __init__(self, max_entries: int = 50000, ttl_seconds: float = 86400, db_path: Optional[str] = None,
+                 max_disk_rows: int = 500000):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of rankings held in memory
+            ttl_seconds: Age after which a ranking is no longer used
+            db_path: SQLite file for the on-disk tier, or None for memory only
+            max_disk_rows: Maximum number of rankings kept in the on-disk tier
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_rows = max_disk_rows
+        self._entries = OrderedDict()  # key -> (created_at, ranking)
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_lock = threading.Lock()  # serializes use of the connection; never held with _lock
+        self._disk_rows = 0  # upper estimate of the rows on disk
+        self._pending_writes = OrderedDict()  # key -> (created_at, ranking) not yet on disk
+
+        self.hits = 0
+        self.misses = 0
+
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS rankings ("
+                    "key TEXT PRIMARY KEY, ranking TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS rankings_created_at ON rankings (created_at)")
+                self._db.execute("DELETE FROM rankings WHERE created_at < ?", (time.time() - ttl_seconds,))
+                self._db.commit()
+                self._disk_rows = self._db.execute("SELECT COUNT(*) FROM rankings").fetchone()[0]
+            except sqlite3.Error as e:
+                logger.warning(f"Ranking cache disk tier disabled, could not open {db_path}: {e}")
+                self._db = None
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up several keys at once, consulting the disk tier for memory misses.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Mapping of found keys to (copied) rankings
+        """
+        found = {}
+        now = time.time()
+        missing = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[0] < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    found[key] = copy.deepcopy(entry[1])
+                else:
+                    if entry is not None:
+                        del self._entries[key]
+                    missing.append(key)
+
+        rows = []
+        if missing and self._db is not None:
+            rows = await asyncio.to_thread(self._read_disk, missing)
+
+        with self._lock:
+            for key, ranking_json, created_at in rows:
+                if now - created_at >= self.ttl_seconds:
+                    continue
+                ranking = json.loads(ranking_json)
+                self._put_memory(key, ranking, created_at)
+                found[key] = copy.deepcopy(ranking)
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def _read_disk(self, keys: List[str]) -> List[tuple]:
+        try:
+            placeholders = ",".join("?" * len(keys))
+            with self._db_lock:
+                return self._db.execute(
+                    f"SELECT key, ranking, created_at FROM rankings WHERE key IN ({placeholders})",
+                    keys,
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Ranking cache disk lookup failed: {e}")
+            return []
+
+    def put(self, key: str, ranking: Dict[str, Any]) -> None:
+        """
+        Store a ranking in memory and queue it for the disk tier.
+
+        Args:
+            key: Cache key
+            ranking: LLM ranking result (must contain a score)
+        """
+        now = time.time()
+        ranking = copy.deepcopy(ranking)
+        with self._lock:
+            self._put_memory(key, ranking, now)
+            if self._db is not None:
+                self._pending_writes[key] = (now, ranking)
+                self._pending_writes.move_to_end(key)
+                # Bounded like memory if nobody flushes
+                while len(self._pending_writes) > self.max_entries:
+                    self._pending_writes.popitem(last=False)
+
+    async def flush(self) -> None:
+        """Write queued rankings to the disk tier in one transaction, off the event loop."""
+        with self._lock:
+            if not self._pending_writes:
+                return
+            pending, self._pending_writes = self._pending_writes, OrderedDict()
+        rows = [(key, json.dumps(ranking, default=str), created_at)
+                for key, (created_at, ranking) in pending.items()]
+        await asyncio.to_thread(self._write_disk, rows)
+
+    def _write_disk(self, rows: List[tuple]) -> None:
+        try:
+            with self._db_lock:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO rankings (key, ranking, created_at) VALUES (?, ?, ?)",
+                    rows,
+                )
+                self._disk_rows += len(rows)
+                if self._disk_rows > self.max_disk_rows:
+                    self._prune_disk()
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Ranking cache disk write of {len(rows)} rankings failed: {e}")
+
+    def _prune_disk(self) -> None:
+        """Delete expired rankings, then the oldest, leaving headroom below max_disk_rows. Caller holds _db_lock."""
+        self._db.execute("DELETE FROM rankings WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        count = self._db.execute("SELECT COUNT(*) FROM rankings").fetchone()[0]
+        target = int(self.max_disk_rows * 0.9)
+        if count > target:
+            self._db.execute(
+                "DELETE FROM rankings WHERE key IN "
+                "(SELECT key FROM rankings ORDER BY created_at LIMIT ?)",
+                (count - target,),
+            )
+            count = target
+        self._disk_rows = count
+
+    def _put_memory(self, key: str, ranking: Dict[str, Any], created_at: float) -> None:
+        self._entries[key] = (created_at, ranking)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and entry count."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+_ranking_cache = None
+
+
+def get_ranking_cache() -> Optional[RankingCache]:
+    """Get the process-wide ranking cache, or None if disabled in config."""
+    global _ranking_cache
+    if not CONFIG.nlweb.ranking_cache_enabled:
+        return None
+    if _ranking_cache is None:
+        db_path = CONFIG.nlweb.ranking_cache_path
+        _ranking_cache = RankingCache(
+            max_entries=CONFIG.nlweb.ranking_cache_max_entries,
+            ttl_seconds=CONFIG.nlweb.ranking_cache_ttl_seconds,
+            db_path=CONFIG._resolve_path(db_path) if db_path else None,
+            max_disk_rows=CONFIG.nlweb.ranking_cache_max_disk_rows,
+        )
+    return _ranking_cache
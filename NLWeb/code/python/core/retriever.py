@@ -9,6 +9,7 @@ This module provides abstract base classes and concrete implementations for data
 import os
 import time
 import asyncio
+import contextlib
 import subprocess
 import sys
 from abc import ABC, abstractmethod
@@ -16,6 +17,7 @@ from typing import List, Dict, Any, Optional, Union, Tuple, Type
 import json
 
 from core.config import CONFIG
+from core.prepare_cache import invalidate_sites
 from core.utils.utils import get_param
 from misc.logger.logging_config_helper import get_configured_logger
 from misc.logger.logger import LogLevel
@@ -30,6 +32,32 @@ _client_cache_lock = asyncio.Lock()
 # Preloaded client modules
 _preloaded_modules = {}
 
+# Admission control: one semaphore per endpoint, shared by every VectorDBClient
+_endpoint_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+# Writers to the same site are serialized; reads never wait on these
+_site_write_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _get_endpoint_semaphore(endpoint_name: str) -> asyncio.Semaphore:
+    """Get the admission-control semaphore bounding in-flight calls to an endpoint."""
+    semaphore = _endpoint_semaphores.get(endpoint_name)
+    if semaphore is None:
+        endpoint_config = CONFIG.retrieval_endpoints.get(endpoint_name)
+        limit = getattr(endpoint_config, "max_concurrency", None) or CONFIG.retrieval_max_concurrency
+        semaphore = asyncio.Semaphore(limit)
+        _endpoint_semaphores[endpoint_name] = semaphore
+    return semaphore
+
+
+def _get_site_write_lock(site: str) -> asyncio.Lock:
+    """Get the lock serializing writes to one site."""
+    lock = _site_write_locks.get(site)
+    if lock is None:
+        lock = asyncio.Lock()
+        _site_write_locks[site] = lock
+    return lock
+
 def init():
     """Initialize retrieval clients based on configuration."""
     # Preload modules for enabled endpoints
@@ -247,6 +275,15 @@ class VectorDBClientInterface(ABC):
         """
        
         return None
+    
+    async def flush(self) -> None:
+        """
+        Write any buffered uploads and deletes.
+        
+        Note:
+            Backends that write through need nothing; the default implementation does nothing.
+        """
+        return None
 
 
 class RetrievalClientBase(VectorDBClientInterface):
@@ -457,7 +494,37 @@ class VectorDBClient:
         elif not endpoint_name:
             logger.warning("No write endpoint configured - write operations will fail")
         
+        # Only used when concurrent_retrieval is disabled in config_retrieval.yaml
         self._retrieval_lock = asyncio.Lock()
+    
+    def _read_guard(self):
+        """
+        Context guarding a read. Reads take no lock in concurrent mode; otherwise
+        every operation in this client is serialized behind one lock.
+        """
+        if CONFIG.concurrent_retrieval:
+            return contextlib.nullcontext()
+        return self._retrieval_lock
+    
+    @contextlib.asynccontextmanager
+    async def _write_guard(self, sites: List[str]):
+        """
+        Context guarding a write to the given sites. Site locks are taken in sorted
+        order so writers touching overlapping sites cannot deadlock.
+        """
+        async with contextlib.AsyncExitStack() as stack:
+            if not CONFIG.concurrent_retrieval:
+                await stack.enter_async_context(self._retrieval_lock)
+            for site in sorted(set(sites)):
+                await stack.enter_async_context(_get_site_write_lock(site))
+            yield
+    
+    async def _admitted(self, endpoint_name: str, coro):
+        """
+        Await a call to an endpoint once its admission-control semaphore admits it.
+        """
+        async with _get_endpoint_semaphore(endpoint_name):
+            return await coro
         
         
     
@@ -530,7 +597,12 @@ class VectorDBClient:
         # Use cache key combining db_type and endpoint
         cache_key = f"{db_type}_{endpoint_name}"
         
-        # Check if client already exists in cache
+        # Fast path: cached clients are returned without touching the lock
+        client = _client_cache.get(cache_key)
+        if client is not None:
+            return client
+        
+        # Check again under the lock before creating a client
         async with _client_cache_lock:
             if cache_key in _client_cache:
                 return _client_cache[cache_key]
@@ -735,12 +807,14 @@ class VectorDBClient:
         if not self.write_endpoint:
             raise ValueError("No write endpoint configured for delete operations")
             
-        async with self._retrieval_lock:
+        async with self._write_guard([site]):
             logger.info(f"Deleting documents for site: {site} using write endpoint: {self.write_endpoint}")
             
             try:
                 client = await self.get_client(self.write_endpoint)
-                count = await client.delete_documents_by_site(site, **kwargs)
+                count = await self._admitted(
+                    self.write_endpoint, client.delete_documents_by_site(site, **kwargs)
+                )
                 logger.info(f"Successfully deleted {count} documents for site: {site}")
                 return count
             except Exception as e:
@@ -756,6 +830,9 @@ class VectorDBClient:
                     }
                 )
                 raise
+            finally:
+                # Even a failed delete may have removed some documents
+                invalidate_sites([site])
     
     async def upload_documents(self, documents: List[Dict[str, Any]], **kwargs) -> int:
         """
@@ -771,12 +848,15 @@ class VectorDBClient:
         if not self.write_endpoint:
             raise ValueError("No write endpoint configured for upload operations")
             
-        async with self._retrieval_lock:
+        sites = [str(doc.get("site", "")) for doc in documents]
+        async with self._write_guard(sites):
             logger.info(f"Uploading {len(documents)} documents to write endpoint: {self.write_endpoint}")
             
             try:
                 client = await self.get_client(self.write_endpoint)
-                count = await client.upload_documents(documents, **kwargs)
+                count = await self._admitted(
+                    self.write_endpoint, client.upload_documents(documents, **kwargs)
+                )
                 logger.info(f"Successfully uploaded {count} documents")
                 return count
             except Exception as e:
@@ -792,6 +872,17 @@ class VectorDBClient:
                     }
                 )
                 raise
+            finally:
+                invalidate_sites(sites)
+    
+    async def flush(self) -> None:
+        """
+        Write uploads and deletes buffered by the write endpoint, e.g. at the end of a load.
+        """
+        if not self.write_endpoint:
+            return
+        client = await self.get_client(self.write_endpoint)
+        await client.flush()
     
     async def search(self, query: str, site: Union[str, List[str]], 
                     num_results: int = 50, endpoint_name: Optional[str] = None, **kwargs) -> List[List[str]]:
@@ -829,7 +920,7 @@ class VectorDBClient:
         elif isinstance(site, str):
             site = site.replace(" ", "_")
 
-        async with self._retrieval_lock:
+        async with self._read_guard():
             logger.info(f"Searching for '{query[:50]}...' in site: {site}, num_results: {num_results}")
             logger.info(f"Querying {len(self.enabled_endpoints)} enabled endpoints in parallel")
             start_time = time.time()
@@ -855,11 +946,12 @@ class VectorDBClient:
                     
                     # Use search_all_sites if site is "all"
                     if site == "all":
-                        task = asyncio.create_task(client.search_all_sites(query, num_results, **kwargs))
+                        coro = client.search_all_sites(query, num_results, **kwargs)
                     else:
                         # Pass all arguments including handler to all clients
                         # Individual clients can choose to use or ignore the handler
-                        task = asyncio.create_task(client.search(query, site, num_results, **kwargs))
+                        coro = client.search(query, site, num_results, **kwargs)
+                    task = asyncio.create_task(self._admitted(endpoint_name, coro))
                     tasks.append(task)
                     endpoint_names.append(endpoint_name)
                 except Exception as e:
@@ -932,7 +1024,7 @@ class VectorDBClient:
             temp_client = VectorDBClient(endpoint_name=endpoint_name)
             return await temp_client.search_by_url(url, **kwargs)
         
-        async with self._retrieval_lock:
+        async with self._read_guard():
             logger.info(f"Retrieving item with URL: {url}")
             
             try:
@@ -944,14 +1036,18 @@ class VectorDBClient:
                     for endpoint_name in self.enabled_endpoints:
                         try:
                             client = await self.get_client(endpoint_name)
-                            result = await client.search_by_url(url, **kwargs)
+                            result = await self._admitted(
+                                endpoint_name, client.search_by_url(url, **kwargs)
+                            )
                             if result:
                                 return result
                         except Exception as e:
                             logger.warning(f"Failed to search by URL in endpoint {endpoint_name}: {e}")
                     return None
                 
-                result = await client.search_by_url(url, **kwargs)
+                result = await self._admitted(
+                    self.endpoint_name, client.search_by_url(url, **kwargs)
+                )
                 
                 if result:
                     logger.debug(f"Successfully retrieved item for URL: {url}")
@@ -1012,21 +1108,21 @@ class VectorDBClient:
             temp_client = VectorDBClient(endpoint_name=endpoint_name)
             return await temp_client.get_sites(**kwargs)
         
-        async with self._retrieval_lock:
+        async with self._read_guard():
             logger.info("Retrieving list of sites from database")
             
             try:
                 # For single endpoint mode, use the first (and only) endpoint
                 if self.endpoint_name:
                     client = await self.get_client(self.endpoint_name)
-                    sites = await client.get_sites(**kwargs)
+                    sites = await self._admitted(self.endpoint_name, client.get_sites(**kwargs))
                 else:
                     # Multiple endpoints - aggregate sites from all
                     all_sites = set()
                     for endpoint_name in self.enabled_endpoints:
                         try:
                             client = await self.get_client(endpoint_name)
-                            endpoint_sites = await client.get_sites(**kwargs)
+                            endpoint_sites = await self._admitted(endpoint_name, client.get_sites(**kwargs))
                             if endpoint_sites:  # Not None and not empty
                                 all_sites.update(endpoint_sites)
                         except Exception as e:
@@ -1239,6 +1335,19 @@ async def upload_documents(documents: List[Dict[str, Any]],
     return await client.upload_documents(documents, **kwargs)
 
 
+async def flush_writes(endpoint_name: Optional[str] = None,
+                       query_params: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Write uploads and deletes that the write endpoint buffers.
+    
+    Args:
+        endpoint_name: Optional name of the endpoint to use (overrides write_endpoint)
+        query_params: Optional query parameters for overriding endpoint
+    """
+    client = get_vector_db_client(endpoint_name=endpoint_name, query_params=query_params)
+    await client.flush()
+
+
 async def delete_documents_by_site(site: str,
                                   endpoint_name: Optional[str] = None,
                                   query_params: Optional[Dict[str, Any]] = None,
@@ -19,6 +19,7 @@ from misc.logger.logging_config_helper import get_configured_logger
 from core.llm import ask_llm
 from core.config import CONFIG
 from core.prompts import fill_prompt
+from core.tool_prerouter import get_tool_prerouter
 logger = get_configured_logger("tool_selector")
 
 @dataclass
@@ -158,6 +159,9 @@ class ToolSelector:
     
     STEP_NAME = "ToolSelector"
     MIN_TOOL_SCORE_THRESHOLD = 70  # Minimum score required to select a tool
+
+    # Tools that can run with just the query as search_query when the LLM is skipped
+    DEFAULT_PARAMETER_TOOLS = ["conversation_search", "search", "cricket_stats"]
     
     # Type hierarchy for schema.org types
     # TODO: This is a placeholder for now. We need to have a proper type hierarchy from schema.org
@@ -427,42 +431,12 @@ class ToolSelector:
             # If there's only one tool, skip LLM evaluation and use it directly
             elif len(tools) == 1:
                 logger.info(f"Only one tool available ({tools[0].name}), skipping LLM evaluation - saving API call")
-                # Build result with default parameters based on tool requirements
-                result = {
-                    "score": 100,
-                    "justification": "Only available tool for this query type"
-                }
-                
-                # Add required parameters based on tool name
-                # These are the common parameters that tools expect when skipping LLM
-                if tools[0].name in ["conversation_search", "search", "cricket_stats"]:
-                    result["search_query"] = query
-                elif tools[0].name in ["who_and_search", "statistics_query"]:
-                    # Add any default params these tools might need
-                    pass
-                
-                tool_results = [{
-                    "tool": tools[0],
-                    "score": 100,
-                    "result": result
-                }]
-                
-                # Send debug message if in debug mode
-                if getattr(self.handler, 'debug_mode', False):
-                    elapsed_time = time.time() - self.handler.init_time
-                    await self.handler.send_message({
-                        "message_type": "tool_selection",
-                        "selected_tool": tools[0].name,
-                        "score": 100,
-                        "parameters": {"score": 100, "justification": "Single tool available - skipped LLM evaluation"},
-                        "query": query,
-                        "time_elapsed": f"{elapsed_time:.3f}s",
-                        "llm_skipped": True
-                    })
+                tool_results = [self._default_tool_result(tools[0], query, 100, "Only available tool for this query type")]
+                await self._send_llm_skipped_message(tools[0], query, 100, "Single tool available - skipped LLM evaluation")
             else:
-                # Evaluate tools with early termination strategy
-                # Evaluating tools for query
-                tool_results = await self._evaluate_tools_with_early_termination(query, tools, threshold=90)
+                # Short-list tools by embedding similarity, then evaluate them
+                # with early termination strategy
+                tool_results = await self._route_tools(query, tools)
             
             # Sort by score
             tool_results.sort(key=lambda x: x["score"], reverse=True)
@@ -512,6 +486,76 @@ class ToolSelector:
             
             await self.handler.state.precheck_step_done(self.STEP_NAME)
     
+    async def _route_tools(self, query: str, tools: List[Tool]) -> List[dict]:
+        """Evaluate the tools most similar to the query with the LLM, or pick a decisive match without it."""
+        nlweb_config = CONFIG.nlweb
+        if not nlweb_config.tool_prerouter_enabled:
+            return await self._evaluate_tools_with_early_termination(query, tools, threshold=90)
+
+        tools_xml_path = os.path.join(CONFIG.config_directory, "tools.xml")
+        tools_cache_key = (tools_xml_path, self.site_id)
+        prerouter = get_tool_prerouter(tools_cache_key, _tools_cache.get(tools_cache_key, []))
+        try:
+            ranked = await prerouter.rank(query, tools)
+        except Exception as e:
+            logger.warning(f"Tool pre-routing failed, evaluating all tools: {e}")
+            ranked = None
+        if not ranked:
+            return await self._evaluate_tools_with_early_termination(query, tools, threshold=90)
+
+        logger.info("Tool similarities: " + ", ".join(f"{tool.name}={similarity:.3f}" for tool, similarity in ranked))
+
+        # A clear winner that can run with default parameters needs no LLM call
+        top_tool, top_similarity = ranked[0]
+        margin = top_similarity - ranked[1][1] if len(ranked) > 1 else top_similarity
+        if (top_tool.name in self.DEFAULT_PARAMETER_TOOLS
+                and top_similarity >= nlweb_config.tool_prerouter_min_similarity
+                and margin >= nlweb_config.tool_prerouter_skip_margin):
+            logger.info(f"Pre-router selected {top_tool.name} (similarity {top_similarity:.3f}, margin {margin:.3f}), skipping LLM evaluation")
+            justification = f"Closest tool by embedding similarity ({top_similarity:.3f}, margin {margin:.3f})"
+            await self._send_llm_skipped_message(top_tool, query, 100, justification)
+            return [self._default_tool_result(top_tool, query, 100, justification)]
+
+        # Short-list for the LLM; search stays in as the fallback route
+        shortlist = [tool for tool, _ in ranked[:nlweb_config.tool_prerouter_top_k]]
+        search_tool = next((tool for tool, _ in ranked if tool.name == 'search'), None)
+        if search_tool is not None and search_tool not in shortlist:
+            shortlist.append(search_tool)
+        logger.info(f"Pre-router short-listed {[tool.name for tool in shortlist]} of {len(tools)} tools")
+        return await self._evaluate_tools_with_early_termination(query, shortlist, threshold=90)
+
+    def _default_tool_result(self, tool: Tool, query: str, score: int, justification: str) -> dict:
+        """Build a tool result with default parameters, for tools selected without the LLM."""
+        result = {
+            "score": score,
+            "justification": justification
+        }
+
+        # Add required parameters based on tool name
+        # These are the common parameters that tools expect when skipping LLM
+        if tool.name in self.DEFAULT_PARAMETER_TOOLS:
+            result["search_query"] = query
+
+        return {
+            "tool": tool,
+            "score": score,
+            "result": result
+        }
+
+    async def _send_llm_skipped_message(self, tool: Tool, query: str, score: int, justification: str):
+        """Send debug message for a tool selected without LLM evaluation."""
+        if getattr(self.handler, 'debug_mode', False):
+            elapsed_time = time.time() - self.handler.init_time
+            await self.handler.send_message({
+                "message_type": "tool_selection",
+                "selected_tool": tool.name,
+                "score": score,
+                "parameters": {"score": score, "justification": justification},
+                "query": query,
+                "time_elapsed": f"{elapsed_time:.3f}s",
+                "llm_skipped": True
+            })
+
     async def _evaluate_tool(self, query: str, tool: Tool) -> dict:
         """Evaluate a single tool for the query."""
         if not tool.prompt:
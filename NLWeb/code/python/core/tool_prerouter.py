@@ -0,0 +1,128 @@
+# Copyright (c) 2025 Microsoft Corporation.
+# Licensed under the MIT License
+
+"""
+Embedding-based short-listing of tools before LLM tool selection.
+
+WARNING: This code is under development and may undergo changes in future releases.
+Backwards compatibility is not guaranteed at this time.
+"""
+
+import asyncio
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.embedding import batch_get_embeddings, get_embedding
+from misc.logger.logging_config_helper import get_configured_logger
+
+logger = get_configured_logger("tool_prerouter")
+
+
+def _tool_texts(tool) -> List[str]:
+    """Texts embedded for a tool: its description (the prompt without template fields) and each example."""
+    description = re.sub(r"\{[^}]*\}", "", tool.prompt or "")
+    description = " ".join(description.split())
+    texts = [f"{tool.name}: {description}" if description else tool.name]
+    texts.extend(tool.examples)
+    return texts
+
+
+class ToolPreRouter:
+    """
+    In-memory matrix of normalized embeddings of each tool's description and
+    examples. A query is scored against every row and each tool gets the best
+    similarity of its rows, so tools can be ranked with one embedding call.
+    If embedding the tools fails, pre-routing is skipped and retried after RETRY_SECONDS.
+    """
+
+    # Minimum delay between embedding attempts after a failure
+    RETRY_SECONDS = 60
+
+    def __init__(self, tools: List):
+        """
+        Args:
+            tools: All tools of a site (from tools.xml)
+        """
+        self.tools = tools
+        self._matrix: Optional[np.ndarray] = None  # (rows, dim), unit length
+        self._row_tools: Optional[np.ndarray] = None  # index into tools of each row
+        self._load_task: Optional[asyncio.Task] = None
+        self._failed_at: Optional[float] = None
+
+    async def ensure_ready(self) -> bool:
+        """Embed the tool texts once; concurrent callers share the work."""
+        if self._matrix is not None:
+            return True
+        if self._failed_at is not None and time.time() - self._failed_at < self.RETRY_SECONDS:
+            return False
+        if self._load_task is None or self._load_task.done():
+            # First use, or a retry after a failed attempt
+            self._load_task = asyncio.create_task(self._embed_tools())
+        await asyncio.shield(self._load_task)
+        return self._matrix is not None
+
+    async def _embed_tools(self) -> None:
+        texts, row_tools = [], []
+        for i, tool in enumerate(self.tools):
+            for text in _tool_texts(tool):
+                texts.append(text)
+                row_tools.append(i)
+        try:
+            embeddings = await batch_get_embeddings(texts)
+            matrix = np.asarray(embeddings, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            self._matrix = matrix / np.where(norms == 0, 1.0, norms)
+            self._row_tools = np.asarray(row_tools)
+            self._failed_at = None
+            logger.info(f"Embedded {len(texts)} descriptions and examples of {len(self.tools)} tools")
+        except Exception as e:
+            # Without embeddings every tool goes to the LLM, as before
+            self._failed_at = time.time()
+            logger.error(f"Tool pre-router disabled for {self.RETRY_SECONDS}s, could not embed tools: {e}")
+
+    async def rank(self, query: str, tools: List) -> Optional[List[Tuple[object, float]]]:
+        """
+        Rank tools by cosine similarity to the query.
+
+        Args:
+            query: User query
+            tools: Candidate tools (a subset of the router's tools)
+
+        Returns:
+            (tool, similarity) pairs, most similar first, or None if embeddings are unavailable
+        """
+        if not await self.ensure_ready():
+            return None
+
+        embedding = np.asarray(await get_embedding(query), dtype=np.float32)
+        if embedding.shape[0] != self._matrix.shape[1]:
+            logger.warning("Query embedding dimension does not match tool embeddings, skipping pre-routing")
+            return None
+        norm = np.linalg.norm(embedding)
+        similarities = self._matrix @ (embedding / (norm or 1.0))
+
+        # Best similarity of each tool's rows; tools of different types may share a name
+        best = np.full(len(self.tools), -1.0, dtype=np.float32)
+        np.maximum.at(best, self._row_tools, similarities)
+        positions = {id(tool): i for i, tool in enumerate(self.tools)}
+
+        ranked = [(tool, float(best[positions[id(tool)]]) if id(tool) in positions else -1.0)
+                  for tool in tools]
+        ranked.sort(key=lambda pair: pair[1], reverse=True)
+        return ranked
+
+
+# Pre-routers by (tools_xml_path, site_id), like the router's tools cache
+_prerouters: Dict[tuple, ToolPreRouter] = {}
+
+
+def get_tool_prerouter(cache_key: tuple, tools: List) -> ToolPreRouter:
+    """Get the pre-router for a site's tools, creating it on first use."""
+    prerouter = _prerouters.get(cache_key)
+    if prerouter is None or prerouter.tools is not tools:
+        prerouter = ToolPreRouter(tools)
+        _prerouters[cache_key] = prerouter
+    return prerouter
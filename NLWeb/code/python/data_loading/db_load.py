@@ -27,7 +27,7 @@ from data_loading.db_load_utils import (
 )
 
 # Import vector database client directly
-from core.retriever import get_vector_db_client, upload_documents, delete_documents_by_site
+from core.retriever import get_vector_db_client, upload_documents, delete_documents_by_site, flush_writes
 
 # Import RSS to Schema converter
 import data_loading.rss2schema as rss2schema
@@ -1156,45 +1156,49 @@ async def main():
     if args.database and args.database not in CONFIG.retrieval_endpoints:
         parser.error(f"Database endpoint '{args.database}' not found in configuration. Available options: {', '.join(CONFIG.retrieval_endpoints.keys())}")
     
-    # Handle delete-only mode
-    if args.only_delete:
-        await delete_site(args.site, args.database)
-        return
+    try:
+        # Handle delete-only mode
+        if args.only_delete:
+            await delete_site(args.site, args.database)
+            return
     
-    # Validate file path if we're not just deleting
-    if args.file_path is None and not args.only_delete:
-        parser.error("file_path is required unless --only-delete is specified")
+        # Validate file path if we're not just deleting
+        if args.file_path is None and not args.only_delete:
+            parser.error("file_path is required unless --only-delete is specified")
     
-    # Handle URL list mode
-    if args.url_list:
-        is_url_path = await is_url(args.file_path)
-        if is_url_path:
-            print(f"Processing remote URL list from: {args.file_path}")
-        else:
-            print(f"Processing local URL list file: {args.file_path}")
+        # Handle URL list mode
+        if args.url_list:
+            is_url_path = await is_url(args.file_path)
+            if is_url_path:
+                print(f"Processing remote URL list from: {args.file_path}")
+            else:
+                print(f"Processing local URL list file: {args.file_path}")
             
-        await loadUrlListToDB(args.file_path, args.site, args.batch_size, args.delete_site, args.force_recompute, args.database)
-        return
+            await loadUrlListToDB(args.file_path, args.site, args.batch_size, args.delete_site, args.force_recompute, args.database)
+            return
     
-    if args.directory:
-        # Handle directory mode
-        if not os.path.isdir(args.file_path):
-            print(f"Error: '{args.file_path}' is not a valid directory.")
-            sys.exit(1)
+        if args.directory:
+            # Handle directory mode
+            if not os.path.isdir(args.file_path):
+                print(f"Error: '{args.file_path}' is not a valid directory.")
+                sys.exit(1)
         
-        print(f"Processing all files in directory: {args.file_path}")
+            print(f"Processing all files in directory: {args.file_path}")
         
-        # List all files in the directory
-        for filename in os.listdir(args.file_path):
-            file_path = os.path.join(args.file_path, filename)
-            if os.path.isfile(file_path):
-                # The downside of this approach is that we aren't taking advantage of the batch functionality
-                print(f"Processing file: {file_path}")
-                await process_normal_path(file_path, args.site, args.batch_size, args.delete_site, args.force_recompute, args.database)
-        return
+            # List all files in the directory
+            for filename in os.listdir(args.file_path):
+                file_path = os.path.join(args.file_path, filename)
+                if os.path.isfile(file_path):
+                    # The downside of this approach is that we aren't taking advantage of the batch functionality
+                    print(f"Processing file: {file_path}")
+                    await process_normal_path(file_path, args.site, args.batch_size, args.delete_site, args.force_recompute, args.database)
+            return
     
-    # Normal processing mode
-    await process_normal_path(args.file_path, args.site, args.batch_size, args.delete_site, args.force_recompute, args.database)
+        # Normal processing mode
+        await process_normal_path(args.file_path, args.site, args.batch_size, args.delete_site, args.force_recompute, args.database)
+    finally:
+        # Write whatever the database buffered before the process exits
+        await flush_writes(query_params={"db": args.database} if args.database else None)
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
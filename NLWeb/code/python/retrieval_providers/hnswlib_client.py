@@ -3,36 +3,82 @@
 
 """
 HNSW (Hierarchical Navigable Small World) client for fast approximate nearest neighbor search.
-This client provides read-only access to pre-built HNSW indices.
+This client searches indices built by build_hnswlib_index.py and applies incremental
+updates (upload, delete by site) through HnswIndexWriter.
+
+Document metadata is read on demand from a SQLite file (label primary key, URL
+index) rather than parsed into memory, and site-restricted queries filter on
+labels inside the HNSW search so results are filled from the requested sites.
+Concurrent queries are coalesced into batched knn_query calls on a dedicated
+thread pool, so handlers issuing several searches share one index pass.
+
+Uploads and deletes are buffered and written as one index update after a short
+interval, when enough documents are buffered, or on flush(), so loading in
+batches does not rewrite and reload the whole index once per batch.
+
+When the index manifest on disk gets a new version (an update from this client,
+another process or the builder), the new index is loaded in the background and
+swapped in; searches already running finish on the index they started with.
 """
 
+import atexit
 import os
 import json
+import time
 import asyncio
 from pathlib import Path
+from collections import OrderedDict
 from typing import List, Dict, Union, Optional, Any
 
 try:
     import hnswlib
+    import numpy as np
 except ImportError:
     hnswlib = None
 
 from core.config import CONFIG
-from core.embedding import get_embedding
+from core.embedding import get_embedding, batch_get_embeddings
+from core.prepare_cache import invalidate_sites
 from core.retriever import RetrievalClientBase
 from misc.logger.logging_config_helper import get_configured_logger
 from misc.logger.logger import LogLevel
+from retrieval_providers.utils.hnsw_metadata import HnswMetadataStore
+from retrieval_providers.utils.hnsw_index_writer import HnswIndexWriter, read_manifest
+from retrieval_providers.utils.knn_batcher import KnnBatcher
 
 logger = get_configured_logger("hnswlib_client")
 
 # Module-level cache for HnswlibClient instances
 _hnswlib_client_cache = {}
 
+# Sites with at most this many documents are searched exactly instead of through the graph
+EXACT_SEARCH_MAX_DOCS = 256
+
+# Number of per-site label filters kept
+SITE_FILTER_CACHE_SIZE = 64
+
+# Defaults for coalescing concurrent queries (overridable per endpoint)
+KNN_BATCH_WINDOW_MS = 2.0
+KNN_BATCH_MAX_SIZE = 64
+KNN_SEARCH_THREADS = 2
+
+# Seconds between checks of the index manifest for a new version (overridable per endpoint)
+INDEX_RELOAD_CHECK_SECONDS = 5.0
+
+# Seconds a replaced index's search threads and metadata are kept for searches still running on it
+RETIRED_INDEX_GRACE_SECONDS = 30.0
+
+# Seconds uploads and deletes are buffered before being written as one update (overridable per endpoint)
+UPDATE_FLUSH_SECONDS = 2.0
+
+# Buffered documents that are written right away (overridable per endpoint)
+UPDATE_FLUSH_MAX_DOCUMENTS = 20000
+
 
 class HnswlibClient(RetrievalClientBase):
     """
     Client for HNSW-based vector search operations.
-    Provides read-only access to pre-built indices created by build_hnswlib_index.py.
+    Searches indices created by build_hnswlib_index.py and hot-swaps updated versions.
     """
     
     @classmethod
@@ -86,10 +132,24 @@ class HnswlibClient(RetrievalClientBase):
         
         # Storage for loaded index and metadata
         self.index = None
-        self.metadata = {}
-        self.sites = {}
+        self.metadata = None  # HnswMetadataStore
+        self.sites = {}  # site -> array of labels
+        self.num_documents = 0
         self.dimension = None
+        self._site_filters = OrderedDict()  # sorted site tuple -> (labels, filter)
+        self._batcher = None  # KnnBatcher, created with the index
         self._index_loaded = False  # Track if index has been loaded
+        self._index_version = None  # Manifest version of the loaded index
+        self._reload_check_seconds = getattr(self.endpoint_config, 'reload_check_seconds', INDEX_RELOAD_CHECK_SECONDS)
+        self._last_reload_check = 0.0
+        self._reload_task = None
+        self._update_lock = None  # asyncio.Lock serializing index updates
+        self._pending_documents = []  # Buffered uploads, written on the next flush
+        self._pending_deletes = []  # Sites to delete on the next flush, before the uploads
+        self._flush_task = None
+        self._flush_seconds = getattr(self.endpoint_config, 'update_flush_seconds', UPDATE_FLUSH_SECONDS)
+        self._flush_max_documents = getattr(self.endpoint_config, 'update_flush_max_documents', UPDATE_FLUSH_MAX_DOCUMENTS)
+        self._exit_flush_registered = False
         
         # Don't load the index immediately - use lazy loading
         print("[HNSWLIB] Initialization complete (index will be loaded on first use)")
@@ -146,14 +206,23 @@ class HnswlibClient(RetrievalClientBase):
             print("[HNSWLIB] First use detected, loading index...")
             self._load_index()
             self._index_loaded = True
-            print(f"[HNSWLIB] Successfully loaded index with {len(self.metadata)} documents from {len(self.sites)} sites")
-            logger.info(f"Index loaded with {len(self.metadata)} documents from {len(self.sites)} sites")
+            print(f"[HNSWLIB] Successfully loaded index with {self.num_documents} documents from {len(self.sites)} sites")
+            logger.info(f"Index loaded with {self.num_documents} documents from {len(self.sites)} sites")
     
     def _load_index(self):
         """
         Load pre-built HNSW index and metadata from disk.
         Raises an error if index doesn't exist.
         """
+        self._install_index(self._read_index_files())
+    
+    def _read_index_files(self) -> Dict[str, Any]:
+        """
+        Read the index, metadata and site files without touching the loaded index.
+        
+        Returns:
+            Dictionary with index, dimension, metadata, sites, num_documents and version
+        """
         print(f"[HNSWLIB] Resolving path: {self.database_path}")
         base_path = self._resolve_path(self.database_path)
         print(f"[HNSWLIB] Resolved to: {base_path}")
@@ -164,6 +233,9 @@ class HnswlibClient(RetrievalClientBase):
             logger.error(error_msg)
             raise ValueError(error_msg)
         
+        # Read the manifest first: files replaced after it belong to a later version
+        manifest = read_manifest(base_path, self.index_name)
+        
         # Find index file (detect dimension from filename)
         index_files = list(base_path.glob(f"{self.index_name}_*.bin"))
         if not index_files:
@@ -172,12 +244,14 @@ class HnswlibClient(RetrievalClientBase):
             logger.error(error_msg)
             raise ValueError(error_msg)
         
-        # Use the first index file found
+        # Use the manifest's index file, or the first index file found
         index_file = index_files[0]
+        if manifest:
+            index_file = base_path / f"{self.index_name}_{manifest['dimension']}.bin"
         
         # Extract dimension from filename (e.g., nlweb_hnswlib_1536.bin -> 1536)
         try:
-            self.dimension = int(index_file.stem.split('_')[-1])
+            dimension = int(index_file.stem.split('_')[-1])
         except (ValueError, IndexError):
             error_msg = f"Could not extract dimension from index filename: {index_file.name}"
             logger.error(error_msg)
@@ -185,20 +259,22 @@ class HnswlibClient(RetrievalClientBase):
         
         # Load HNSW index
         logger.info(f"Loading HNSW index from {index_file}")
-        self.index = hnswlib.Index(space='cosine', dim=self.dimension)
-        self.index.load_index(str(index_file))
-        self.index.set_ef(self.ef_search)
-        
-        # Load metadata
-        metadata_file = base_path / f"{self.index_name}_metadata.json"
-        if not metadata_file.exists():
-            error_msg = f"Metadata file not found: {metadata_file}"
-            logger.error(error_msg)
-            raise ValueError(error_msg)
-        
-        with open(metadata_file, 'r') as f:
-            # Convert string keys to integers
-            self.metadata = {int(k): v for k, v in json.load(f).items()}
+        index = hnswlib.Index(space='cosine', dim=dimension)
+        index.load_index(str(index_file))
+        index.set_ef(self.ef_search)
+        
+        # Open metadata, converting a legacy JSON metadata file on first use
+        metadata_db = base_path / f"{self.index_name}_metadata.sqlite3"
+        if not metadata_db.exists():
+            metadata_json = base_path / f"{self.index_name}_metadata.json"
+            if not metadata_json.exists():
+                error_msg = f"Metadata file not found: {metadata_db}"
+                logger.error(error_msg)
+                raise ValueError(error_msg)
+            logger.info(f"Converting {metadata_json} to {metadata_db}")
+            count = HnswMetadataStore.from_json(str(metadata_json), str(metadata_db))
+            logger.info(f"Converted metadata for {count} documents")
+        metadata = HnswMetadataStore(str(metadata_db))
         
         # Load site index
         sites_file = base_path / f"{self.index_name}_sites.json"
@@ -208,41 +284,216 @@ class HnswlibClient(RetrievalClientBase):
             raise ValueError(error_msg)
         
         with open(sites_file, 'r') as f:
-            self.sites = json.load(f)
+            sites = {site: np.asarray(labels, dtype=np.int64) for site, labels in json.load(f).items()}
+        
+        return {
+            "index": index,
+            "dimension": dimension,
+            "metadata": metadata,
+            "sites": sites,
+            # Deleted elements stay in the graph; the manifest counts live documents
+            "num_documents": manifest["count"] if manifest else index.get_current_count(),
+            "version": manifest["version"] if manifest else None,
+        }
+    
+    def _install_index(self, files: Dict[str, Any]):
+        """
+        Make a loaded index the one searches use. Runs without awaiting, so searches see
+        either the old or the new index, never a mix; running searches keep what they captured.
+        """
+        old_batcher = self._batcher
+        old_metadata = self.metadata
+        
+        self.index = files["index"]
+        self.dimension = files["dimension"]
+        self.metadata = files["metadata"]
+        self.sites = files["sites"]
+        self.num_documents = files["num_documents"]
+        self._index_version = files["version"]
+        self._site_filters = OrderedDict()
+        self._batcher = KnnBatcher(
+            self.index,
+            window_ms=getattr(self.endpoint_config, 'knn_batch_window_ms', KNN_BATCH_WINDOW_MS),
+            max_batch=getattr(self.endpoint_config, 'knn_batch_max_size', KNN_BATCH_MAX_SIZE),
+            max_workers=getattr(self.endpoint_config, 'knn_search_threads', KNN_SEARCH_THREADS),
+            thread_name_prefix=f"hnswlib-{self.endpoint_name}",
+        )
+        
+        def retire():
+            if old_batcher is not None:
+                old_batcher.shutdown()
+            if old_metadata is not None:
+                old_metadata.close()
+        
+        if old_batcher is not None or old_metadata is not None:
+            try:
+                asyncio.get_running_loop().call_later(RETIRED_INDEX_GRACE_SECONDS, retire)
+            except RuntimeError:
+                retire()
+        
+        logger.info(f"Successfully loaded index with dimension {self.dimension} (version {self._index_version})")
+    
+    async def _maybe_reload(self):
+        """
+        Swap in a newer index version if the manifest changed. Checks at most every
+        reload_check_seconds; the load runs in a thread while searches use the current index.
+        """
+        now = time.monotonic()
+        if self._reload_task is not None or now - self._last_reload_check < self._reload_check_seconds:
+            return
+        self._last_reload_check = now
+        
+        base_path = self._resolve_path(self.database_path)
+        manifest = await asyncio.to_thread(read_manifest, base_path, self.index_name)
+        if not manifest or manifest.get("version") == self._index_version:
+            return
+        # Searches continue on the current index until the new one is installed
+        if self._reload_task is None:
+            self._reload_task = asyncio.create_task(self._reload())
+    
+    async def _reload(self):
+        try:
+            files = await asyncio.to_thread(self._read_index_files)
+            self._install_index(files)
+            print(f"[HNSWLIB] Swapped in index version {self._index_version} with {self.num_documents} documents")
+        except Exception as e:
+            logger.error(f"Failed to reload HNSW index, keeping the current one: {e}")
+        finally:
+            self._reload_task = None
+    
+    async def reload_index(self):
+        """Load the current index files now and swap them in."""
+        if not self._index_loaded:
+            self._ensure_index_loaded()
+            return
+        if self._reload_task is not None:
+            await self._reload_task
+        self._reload_task = asyncio.create_task(self._reload())
+        await self._reload_task
+    
+    def _writer(self) -> HnswIndexWriter:
+        return HnswIndexWriter(
+            str(self._resolve_path(self.database_path)),
+            self.index_name,
+            M=getattr(self.endpoint_config, 'M', 16),
+            ef_construction=getattr(self.endpoint_config, 'ef_construction', 200),
+            ef_search=self.ef_search,
+        )
+    
+    def _write_update(self, documents: List[Dict[str, Any]], delete_sites: List[str]) -> Dict[str, int]:
+        """Write an update to the index files (blocking)."""
+        # No index yet: the first upload builds it
+        return self._writer().update(documents, delete_sites, create_missing=True)
+    
+    async def flush(self) -> Dict[str, int]:
+        """
+        Write buffered uploads and deletes as one index update and swap in the result.
         
-        logger.info(f"Successfully loaded index with dimension {self.dimension}")
+        Returns:
+            Counts of added, deleted and skipped documents
+        """
+        if self._update_lock is None:
+            self._update_lock = asyncio.Lock()
+        async with self._update_lock:
+            documents, delete_sites = self._pending_documents, self._pending_deletes
+            self._pending_documents, self._pending_deletes = [], []
+            if not documents and not delete_sites:
+                return {"added": 0, "deleted": 0, "skipped": 0}
+            
+            try:
+                counts = await asyncio.to_thread(self._write_update, documents, delete_sites)
+            except BaseException:
+                # Keep the writes for the next flush; deletes still go before uploads
+                self._pending_documents = documents + self._pending_documents
+                self._pending_deletes = delete_sites + [s for s in self._pending_deletes if s not in delete_sites]
+                raise
+            if counts["added"] or counts["deleted"]:
+                await self.reload_index()
+            invalidate_sites([doc.get("site", "") for doc in documents] + delete_sites)
+        logger.info(f"Flushed index update: {counts}")
+        return counts
+    
+    def _schedule_flush(self):
+        if not self._exit_flush_registered:
+            atexit.register(self._flush_at_exit)
+            self._exit_flush_registered = True
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+    
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(self._flush_seconds)
+        finally:
+            self._flush_task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Failed to write buffered index update, will retry: {e}")
+            if self._pending_documents or self._pending_deletes:
+                self._schedule_flush()
+    
+    def _flush_at_exit(self):
+        """Write anything still buffered when the process exits without a flush."""
+        if self._pending_documents or self._pending_deletes:
+            counts = self._write_update(self._pending_documents, self._pending_deletes)
+            self._pending_documents, self._pending_deletes = [], []
+            print(f"[HNSWLIB] Wrote buffered index update at exit: {counts}")
+    
+    def _indexed_count(self, site: str) -> int:
+        """Documents of a site in the loaded index (0 if there is no index yet)."""
+        if not self._index_loaded:
+            try:
+                self._ensure_index_loaded()
+            except ValueError:
+                return 0
+        return len(self.sites.get(site, ()))
     
     async def delete_documents_by_site(self, site: str, **kwargs) -> int:
         """
-        Delete documents by site - NOT SUPPORTED for HNSW.
-        Index must be rebuilt using build_hnswlib_index.py.
+        Delete the documents of a site, including buffered uploads to it.
+        The delete is written with the next flush; the documents are marked deleted
+        in the index and their slots are reused by later uploads.
         
         Args:
             site: Site identifier
             **kwargs: Additional parameters
             
         Returns:
-            0 (operation not supported)
+            Number of documents deleted
         """
-        logger.warning(f"delete_documents_by_site not supported for HNSW. "
-                      f"Rebuild index using 'python -m tools.build_hnswlib_index'")
-        return 0
+        pending = [doc for doc in self._pending_documents if doc.get("site", "") == site]
+        if pending:
+            self._pending_documents = [doc for doc in self._pending_documents if doc.get("site", "") != site]
+        if site not in self._pending_deletes:
+            self._pending_deletes.append(site)
+        count = sum(1 for doc in pending if doc.get("embedding")) + self._indexed_count(site)
+        self._schedule_flush()
+        logger.info(f"Queued delete of {count} documents for site {site}")
+        return count
     
     async def upload_documents(self, documents: List[Dict[str, Any]], **kwargs) -> int:
         """
-        Upload documents - NOT SUPPORTED for HNSW.
-        Index must be rebuilt using build_hnswlib_index.py.
+        Add documents to the index; a document replaces an indexed one with the same URL.
+        Documents are buffered and written with the next flush.
         
         Args:
-            documents: List of document objects
+            documents: List of document objects with embedding, url, name, site and schema_json
             **kwargs: Additional parameters
             
         Returns:
-            0 (operation not supported)
+            Number of documents uploaded
         """
-        logger.warning(f"upload_documents not supported for HNSW. "
-                      f"Rebuild index using 'python -m tools.build_hnswlib_index'")
-        return 0
+        if not documents:
+            logger.info("No documents to upload")
+            return 0
+        self._pending_documents.extend(documents)
+        if len(self._pending_documents) >= self._flush_max_documents:
+            await self.flush()
+        else:
+            self._schedule_flush()
+        count = sum(1 for doc in documents if doc.get("embedding"))
+        logger.info(f"Queued {count} documents for upload ({len(documents) - count} without embeddings skipped)")
+        return count
     
     async def search(self, query: str, site: Union[str, List[str]], 
                     num_results: int = 50, query_params: Optional[Dict[str, Any]] = None, 
@@ -262,6 +513,7 @@ class HnswlibClient(RetrievalClientBase):
         """
         # Ensure index is loaded
         self._ensure_index_loaded()
+        await self._maybe_reload()
         
         # Get embedding for the query
         # Check if model is specified in query_params
@@ -277,43 +529,181 @@ class HnswlibClient(RetrievalClientBase):
         # Convert site to list for uniform handling
         sites_to_search = [site] if isinstance(site, str) else site
         
-        # Get all document IDs for the specified sites
-        valid_ids = set()
-        for s in sites_to_search:
-            if s in self.sites:
-                valid_ids.update(self.sites[s])
+        metadata = self.metadata
+        labels = (await self._search_embeddings([embedding], sites_to_search, num_results))[0]
         
-        if not valid_ids:
-            logger.info(f"No documents found for sites: {sites_to_search}")
-            return []
-        
-        # Search with a larger k to ensure we get enough results after filtering
-        k = min(len(valid_ids), num_results * 3)  # Search for more to account for filtering
+        results = self._format_results(labels, metadata)
         
-        # Perform the search
-        def search_sync():
-            labels, distances = self.index.knn_query([embedding], k=k)
-            return labels[0], distances[0]  # Return first (and only) query results
+        logger.debug(f"Search returned {len(results)} results for sites {sites_to_search}")
+        return results
+    
+    async def _search_embeddings(self, embeddings: List[List[float]], sites: Optional[List[str]],
+                                 num_results: int) -> List[Any]:
+        """
+        Find the nearest labels for several embeddings, restricted to the given sites.
+        Queries go through the batcher, so they share index passes with each other
+        and with concurrent searches on the same sites.
         
-        labels, distances = await asyncio.get_event_loop().run_in_executor(None, search_sync)
+        Args:
+            embeddings: Query embeddings
+            sites: Site identifiers, or None for all sites
+            num_results: Maximum number of results per embedding
+            
+        Returns:
+            Label array per embedding, nearest first
+        """
+        # Keep using this index if a new version is swapped in while we wait
+        batcher = self._batcher
+        if sites is None:
+            valid_labels, label_filter = None, None
+            k = min(num_results, self.num_documents)
+        else:
+            valid_labels, label_filter = self._get_site_filter(sites)
+            if len(valid_labels) == 0:
+                logger.info(f"No documents found for sites: {sites}")
+                return [[] for _ in embeddings]
+            k = min(len(valid_labels), num_results)
+            
+            if len(valid_labels) <= EXACT_SEARCH_MAX_DOCS:
+                return [labels for labels, _ in await asyncio.gather(*(
+                    batcher.run(self._exact_search, batcher.index, embedding, valid_labels, k)
+                    for embedding in embeddings
+                ))]
+        
+        if k == 0:
+            return [[] for _ in embeddings]
+        
+        # Queries on the whole index batch together whatever sites they named
+        group = tuple(sorted(set(sites))) if label_filter is not None else None
+        outcomes = await asyncio.gather(
+            *(batcher.query(embedding, k, group, label_filter) for embedding in embeddings),
+            return_exceptions=True,
+        )
         
-        # Filter results by site and format output
         results = []
-        for label, distance in zip(labels, distances):
-            if label in valid_ids:
-                meta = self.metadata[label]
-                results.append([
-                    meta["url"],
-                    meta["schema_json"],
-                    meta["name"],
-                    meta["site"]
-                ])
-                if len(results) >= num_results:
-                    break
+        for embedding, outcome in zip(embeddings, outcomes):
+            if isinstance(outcome, RuntimeError) and valid_labels is not None:
+                # The filtered graph search could not reach k labels of these sites
+                labels, _ = await batcher.run(self._exact_search, batcher.index, embedding, valid_labels, k)
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                labels, _ = outcome
+            results.append(labels)
+        return results
+    
+    async def knn_batch(self, embeddings: List[List[float]], site: Union[str, List[str], None] = None,
+                        num_results: int = 50) -> List[List[List[str]]]:
+        """
+        Search several query embeddings in one index pass.
         
-        logger.debug(f"Search returned {len(results)} results for sites {sites_to_search}")
+        Args:
+            embeddings: Query embeddings
+            site: Site identifier, list of sites, or None for all sites
+            num_results: Maximum number of results per embedding
+            
+        Returns:
+            Search results per embedding, each in format [url, schema_json, name, site]
+        """
+        self._ensure_index_loaded()
+        await self._maybe_reload()
+        
+        for embedding in embeddings:
+            if not embedding or len(embedding) != self.dimension:
+                raise ValueError(f"Invalid embedding dimension: expected {self.dimension}, got {len(embedding) if embedding else 0}")
+        
+        sites_to_search = [site] if isinstance(site, str) else site
+        metadata = self.metadata
+        label_lists = await self._search_embeddings(embeddings, sites_to_search, num_results)
+        return [self._format_results(labels, metadata) for labels in label_lists]
+    
+    async def search_batch(self, queries: List[str], site: Union[str, List[str], None] = None,
+                           num_results: int = 50, query_params: Optional[Dict[str, Any]] = None,
+                           **kwargs) -> List[List[List[str]]]:
+        """
+        Search several queries, embedding them in one request and searching them in one index pass.
+        
+        Args:
+            queries: Search query strings
+            site: Site identifier, list of sites, or None for all sites
+            num_results: Maximum number of results per query
+            query_params: Additional query parameters
+            **kwargs: Additional parameters
+            
+        Returns:
+            Search results per query, each in format [url, schema_json, name, site]
+        """
+        if not queries:
+            return []
+        
+        model = query_params.get('model') if query_params else None
+        embeddings = await batch_get_embeddings(queries, model=model)
+        
+        results = await self.knn_batch(embeddings, site, num_results)
+        logger.debug(f"Batch search of {len(queries)} queries returned {sum(len(r) for r in results)} results")
         return results
     
+    def _get_site_filter(self, sites: List[str]):
+        """
+        Get the labels of the given sites and an hnswlib filter accepting only them.
+        The filter is None when the sites cover the whole index.
+        
+        Args:
+            sites: Site identifiers
+            
+        Returns:
+            Tuple of (label array, filter callable or None)
+        """
+        key = tuple(sorted(set(sites)))
+        cached = self._site_filters.get(key)
+        if cached is not None:
+            self._site_filters.move_to_end(key)
+            return cached
+        
+        arrays = [self.sites[s] for s in key if s in self.sites]
+        labels = np.unique(np.concatenate(arrays)) if arrays else np.zeros(0, dtype=np.int64)
+        
+        if len(labels) == 0 or len(labels) >= self.num_documents:
+            label_filter = None
+        else:
+            # bytearray indexing keeps the per-candidate callback cheap
+            mask = np.zeros(int(labels.max()) + 1, dtype=np.uint8)
+            mask[labels] = 1
+            mask = bytearray(mask.tobytes())
+            size = len(mask)
+            label_filter = lambda label: label < size and mask[label] == 1
+        
+        self._site_filters[key] = (labels, label_filter)
+        if len(self._site_filters) > SITE_FILTER_CACHE_SIZE:
+            self._site_filters.popitem(last=False)
+        return labels, label_filter
+    
+    def _exact_search(self, index, embedding, labels, k: int):
+        """
+        Brute-force cosine search over the given labels.
+        
+        Args:
+            index: hnswlib index holding the labels
+            embedding: Query embedding
+            labels: Candidate labels
+            k: Number of neighbours
+            
+        Returns:
+            Tuple of (labels, distances) sorted by distance
+        """
+        vectors = np.asarray(index.get_items(labels), dtype=np.float32)
+        query = np.asarray(embedding, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+        distances = 1.0 - (vectors @ query) / np.where(norms == 0, 1.0, norms)
+        top = np.argsort(distances)[:k]
+        return labels[top], distances[top]
+    
+    def _format_results(self, labels, metadata: Optional[HnswMetadataStore] = None) -> List[List[str]]:
+        """Fetch metadata for labels, keeping their order, as [url, schema_json, name, site]."""
+        labels = [int(label) for label in labels]
+        rows = (metadata or self.metadata).get_many(labels)
+        return [rows[label] for label in labels if label in rows]
+    
     async def search_by_url(self, url: str, **kwargs) -> Optional[List[str]]:
         """
         Retrieve a document by its exact URL.
@@ -328,15 +718,10 @@ class HnswlibClient(RetrievalClientBase):
         # Ensure index is loaded
         self._ensure_index_loaded()
         
-        # Linear search through metadata (could be optimized with a URL index)
-        for doc_id, meta in self.metadata.items():
-            if meta["url"] == url:
-                return [
-                    meta["url"],
-                    meta["schema_json"],
-                    meta["name"],
-                    meta["site"]
-                ]
+        # Indexed lookup in the metadata file
+        found = self.metadata.get_by_url(url)
+        if found is not None:
+            return found[1]
         
         logger.debug(f"No document found with URL: {url}")
         return None
@@ -358,6 +743,7 @@ class HnswlibClient(RetrievalClientBase):
         """
         # Ensure index is loaded
         self._ensure_index_loaded()
+        await self._maybe_reload()
         
         # Get embedding for the query
         # Check if model is specified in query_params
@@ -371,23 +757,11 @@ class HnswlibClient(RetrievalClientBase):
             return []
         
         # Perform the search
-        def search_sync():
-            labels, distances = self.index.knn_query([embedding], k=num_results)
-            return labels[0], distances[0]  # Return first (and only) query results
-        
-        labels, distances = await asyncio.get_event_loop().run_in_executor(None, search_sync)
+        metadata = self.metadata
+        labels = (await self._search_embeddings([embedding], None, num_results))[0]
         
         # Format results
-        results = []
-        for label in labels:
-            if label in self.metadata:
-                meta = self.metadata[label]
-                results.append([
-                    meta["url"],
-                    meta["schema_json"],
-                    meta["name"],
-                    meta["site"]
-                ])
+        results = self._format_results(labels, metadata)
         
         logger.debug(f"Global search returned {len(results)} results")
         return results
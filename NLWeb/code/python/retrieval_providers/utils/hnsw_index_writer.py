@@ -0,0 +1,348 @@
+"""Streaming writer for HNSW index directories, with incremental add and delete."""
+
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import hnswlib
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are not serialized across processes
+    fcntl = None
+
+from retrieval_providers.utils.hnsw_metadata import HnswMetadataStore, HnswMetadataWriter
+
+logger = logging.getLogger(__name__)
+
+
+def manifest_path(index_dir: Path, index_name: str) -> Path:
+    """Path of the manifest that readers watch for new index versions."""
+    return Path(index_dir) / f"{index_name}_manifest.json"
+
+
+def read_manifest(index_dir: Path, index_name: str) -> Optional[Dict[str, Any]]:
+    """Read an index manifest, or None if the index has none (built before manifests)."""
+    try:
+        with open(manifest_path(index_dir, index_name), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _tmp_name(path: Path) -> str:
+    """Temporary name for a file being replaced, unique to this process."""
+    return f"{path}.{os.getpid()}.tmp"
+
+
+def _write_json(path: Path, data: Any) -> None:
+    tmp_path = _tmp_name(path)
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class _IndexState:
+    """An index being written: the hnswlib index, metadata and site labels."""
+
+    def __init__(self, metadata: HnswMetadataWriter, sites: Dict[str, List[int]],
+                 index=None, dimension: Optional[int] = None, next_label: int = 0):
+        self.metadata = metadata
+        self.sites = sites
+        self.index = index
+        self.dimension = dimension
+        self.next_label = next_label
+        self.removed: Dict[str, Set[int]] = {}  # site -> labels deleted from sites
+        self.replaced_sites: Set[str] = set()
+        self.added = 0
+        self.deleted = 0
+        self.skipped = 0
+
+
+class HnswIndexWriter:
+    """
+    Writes the files of an HNSW index directory: ``<name>_<dim>.bin``,
+    ``<name>_metadata.sqlite3``, ``<name>_sites.json`` and ``<name>_manifest.json``.
+
+    Documents are streamed: embeddings are copied into a float32 chunk buffer
+    and added a chunk at a time, metadata rows are written as chunks are
+    added, and the index grows with ``resize_index`` instead of being sized
+    up front. Updates load the existing index, add documents (replacing any
+    with the same URL), mark the documents of deleted sites as deleted,
+    change the metadata file in one transaction, and write the other files to
+    a temporary name before moving them into place. The manifest is written last with a new version, which is what a live
+    ``HnswlibClient`` watches to swap in the new index.
+
+    Builds and updates hold an exclusive lock on ``<name>.lock`` from loading
+    the index to writing the manifest, so writers in other processes (the
+    build tool, db_load, other web workers) apply their changes one after
+    another instead of overwriting each other's.
+    """
+
+    def __init__(self, index_dir: str, index_name: str = "nlweb_hnswlib", M: int = 16,
+                 ef_construction: int = 200, ef_search: int = 50,
+                 initial_capacity: int = 100000, chunk_size: int = 1000):
+        """
+        Args:
+            index_dir: Directory of the index files
+            index_name: Prefix of the index files
+            M: Number of bi-directional links created for each element
+            ef_construction: Size of the dynamic list used during construction
+            ef_search: Default ef stored with the index
+            initial_capacity: Elements allocated for a new index before it is grown
+            chunk_size: Documents added to the index at a time
+        """
+        self.index_dir = Path(index_dir)
+        self.index_name = index_name
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.initial_capacity = initial_capacity
+        self.chunk_size = chunk_size
+
+        self.metadata_file = self.index_dir / f"{index_name}_metadata.sqlite3"
+        self.sites_file = self.index_dir / f"{index_name}_sites.json"
+        self.lock_file = self.index_dir / f"{index_name}.lock"
+
+    @contextmanager
+    def _locked(self):
+        """Hold the index directory's writer lock."""
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_file, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def build(self, documents: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Write a new index from a stream of documents, replacing any existing index.
+
+        Args:
+            documents: Documents with embedding, url, name, site and schema_json
+
+        Returns:
+            Counts of added and skipped documents
+
+        Raises:
+            ValueError: If no document has an embedding
+        """
+        with self._locked():
+            return self._build(documents)
+
+    def _build(self, documents: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        state = _IndexState(HnswMetadataWriter(str(self.metadata_file)), sites={})
+        try:
+            self._add_documents(state, documents, upsert=False, replace_sites=False)
+            if state.index is None:
+                raise ValueError("No valid documents found with embeddings")
+            self._commit(state)
+        except BaseException:
+            state.metadata.abort()
+            raise
+        return {"added": state.added, "skipped": state.skipped}
+
+    def update(self, documents: Iterable[Dict[str, Any]] = (), delete_sites: Iterable[str] = (),
+               replace_sites: bool = False, create_missing: bool = False) -> Dict[str, int]:
+        """
+        Update an existing index in place of a rebuild.
+
+        Args:
+            documents: Documents to add; a document replaces an indexed one with the same URL
+            delete_sites: Sites whose documents are deleted before adding
+            replace_sites: Also delete the existing documents of every site in ``documents``
+            create_missing: Build the index from ``documents`` if there is none yet
+
+        Returns:
+            Counts of added, deleted and skipped documents
+
+        Raises:
+            FileNotFoundError: If there is no index and ``create_missing`` is not set
+        """
+        with self._locked():
+            try:
+                state = self._load()
+            except FileNotFoundError:
+                if not create_missing:
+                    raise
+                documents = list(documents)
+                if not documents:
+                    return {"added": 0, "deleted": 0, "skipped": 0}
+                # Built under the same lock, so a concurrent first upload is not overwritten
+                return {"deleted": 0, **self._build(documents)}
+            try:
+                for site in delete_sites:
+                    self._delete_site(state, site)
+                self._add_documents(state, documents, upsert=True, replace_sites=replace_sites)
+                if state.added or state.deleted:
+                    self._commit(state)
+                else:
+                    state.metadata.abort()
+            except BaseException:
+                state.metadata.abort()
+                raise
+        return {"added": state.added, "deleted": state.deleted, "skipped": state.skipped}
+
+    def _load(self) -> _IndexState:
+        """Load the existing index for an update."""
+        index_files = sorted(self.index_dir.glob(f"{self.index_name}_*.bin"))
+        if not index_files:
+            raise FileNotFoundError(f"No index files found matching {self.index_name}_*.bin in {self.index_dir}")
+        index_file = index_files[0]
+        dimension = int(index_file.stem.split('_')[-1])
+
+        index = hnswlib.Index(space='cosine', dim=dimension)
+        # Slots of deleted elements are reused by later adds
+        index.load_index(str(index_file), allow_replace_deleted=True)
+        ids = index.get_ids_list()
+        next_label = int(max(ids)) + 1 if len(ids) else 0
+
+        if not self.metadata_file.exists():
+            metadata_json = self.index_dir / f"{self.index_name}_metadata.json"
+            HnswMetadataStore.from_json(str(metadata_json), str(self.metadata_file))
+        with open(self.sites_file, 'r') as f:
+            sites = json.load(f)
+
+        return _IndexState(HnswMetadataWriter(str(self.metadata_file), update=True), sites,
+                           index=index, dimension=dimension, next_label=next_label)
+
+    def _new_index(self, dimension: int):
+        index = hnswlib.Index(space='cosine', dim=dimension)
+        index.init_index(max_elements=self.initial_capacity, ef_construction=self.ef_construction,
+                         M=self.M, allow_replace_deleted=True)
+        return index
+
+    def _add_documents(self, state: _IndexState, documents: Iterable[Dict[str, Any]],
+                       upsert: bool, replace_sites: bool) -> None:
+        buffer = None
+        labels: List[int] = []
+        rows: List[Tuple[int, Dict[str, Any]]] = []
+        stale: List[Tuple[int, str]] = []  # (label, site) replaced by this chunk
+        chunk_urls: Dict[str, int] = {}
+
+        for doc in documents:
+            embedding = doc.get("embedding")
+            if not embedding:
+                state.skipped += 1
+                continue
+            if state.dimension is None:
+                state.dimension = len(embedding)
+                logger.info(f"Detected embedding dimension: {state.dimension}")
+            if len(embedding) != state.dimension:
+                logger.warning(f"Skipping {doc.get('url', '')}: embedding dimension mismatch "
+                               f"(expected {state.dimension}, got {len(embedding)})")
+                state.skipped += 1
+                continue
+            if state.index is None:
+                state.index = self._new_index(state.dimension)
+            if buffer is None:
+                buffer = np.empty((self.chunk_size, state.dimension), dtype=np.float32)
+
+            site = doc.get("site", "")
+            url = doc.get("url", "")
+            if replace_sites and site not in state.replaced_sites:
+                state.replaced_sites.add(site)
+                self._delete_site(state, site)
+            if upsert and url:
+                if url in chunk_urls:
+                    stale.append((chunk_urls[url], site))
+                else:
+                    found = state.metadata.get_by_url(url)
+                    if found is not None:
+                        stale.append(found)
+
+            label = state.next_label
+            state.next_label += 1
+            buffer[len(labels)] = embedding
+            labels.append(label)
+            rows.append((label, {
+                "url": url,
+                "name": doc.get("name", ""),
+                "site": site,
+                "schema_json": doc.get("schema_json", ""),
+            }))
+            chunk_urls[url] = label
+
+            if len(labels) == self.chunk_size:
+                self._add_chunk(state, buffer, labels, rows, stale)
+                labels, rows, stale, chunk_urls = [], [], [], {}
+
+        if labels:
+            self._add_chunk(state, buffer, labels, rows, stale)
+
+    def _add_chunk(self, state: _IndexState, buffer, labels: List[int],
+                   rows: List[Tuple[int, Dict[str, Any]]], stale: List[Tuple[int, str]]) -> None:
+        index = state.index
+        needed = index.element_count + len(labels)
+        if needed > index.get_max_elements():
+            index.resize_index(max(needed, 2 * index.get_max_elements()))
+
+        index.add_items(buffer[:len(labels)], labels, replace_deleted=True)
+        state.metadata.add(rows)
+        for label, meta in rows:
+            if meta["site"]:
+                state.sites.setdefault(meta["site"], []).append(label)
+        self._delete_labels(state, stale)
+
+        state.added += len(labels)
+        if state.added % 10000 < len(labels):
+            logger.info(f"Added {state.added} documents to index")
+
+    def _delete_site(self, state: _IndexState, site: str) -> None:
+        labels = state.sites.pop(site, [])
+        self._delete_labels(state, [(label, None) for label in labels])
+        state.removed.pop(site, None)
+
+    def _delete_labels(self, state: _IndexState, entries: List[Tuple[int, Optional[str]]]) -> None:
+        """Mark labels deleted in the index and drop their metadata (and site entries)."""
+        if not entries:
+            return
+        labels = []
+        for label, site in entries:
+            try:
+                state.index.mark_deleted(int(label))
+            except RuntimeError:
+                continue  # Already deleted
+            labels.append(int(label))
+            if site:
+                state.removed.setdefault(site, set()).add(int(label))
+        state.metadata.delete(labels)
+        state.deleted += len(labels)
+
+    def _commit(self, state: _IndexState) -> None:
+        """Write every file under a temporary name and move it into place, manifest last."""
+        for site, removed in state.removed.items():
+            if site in state.sites:
+                state.sites[site] = [label for label in state.sites[site] if label not in removed]
+                if not state.sites[site]:
+                    del state.sites[site]
+
+        state.index.set_ef(self.ef_search)
+        index_file = self.index_dir / f"{self.index_name}_{state.dimension}.bin"
+        tmp_index_file = _tmp_name(index_file)
+        state.index.save_index(tmp_index_file)
+
+        # An update commits metadata rows in place: rows of new labels are
+        # unused until the new index is loaded, and rows deleted here only
+        # drop those results from readers still on the previous index
+        count = state.metadata.commit()
+        os.replace(tmp_index_file, index_file)
+        _write_json(self.sites_file, state.sites)
+
+        previous = read_manifest(self.index_dir, self.index_name) or {}
+        _write_json(manifest_path(self.index_dir, self.index_name), {
+            "version": previous.get("version", 0) + 1,
+            "dimension": state.dimension,
+            "count": count,
+            "elements": state.index.element_count,
+            "updated_at": time.time(),
+        })
+        logger.info(f"Wrote index with {count} documents from {len(state.sites)} sites to {self.index_dir}")
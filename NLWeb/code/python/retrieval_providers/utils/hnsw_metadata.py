@@ -0,0 +1,202 @@
+"""SQLite-backed document metadata for HNSW indices, looked up by label or URL."""
+
+import json
+import os
+import sqlite3
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# SQLite limits the number of bound parameters per statement
+_MAX_PARAMS = 900
+
+
+def _as_text(value: Any) -> str:
+    """Store schema_json as text even when older metadata holds it parsed."""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+class HnswMetadataStore:
+    """
+    Read-only view of the per-document metadata of an HNSW index.
+
+    Rows live in a SQLite file keyed by HNSW label, with a secondary index on
+    URL, so only the rows a query needs are read and nothing is parsed up front.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Open an existing metadata file read-only.
+
+        Args:
+            db_path: Path to the SQLite metadata file
+        """
+        self.db_path = db_path
+        self._conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        self._conn.execute("PRAGMA mmap_size=268435456")
+
+    @staticmethod
+    def create(db_path: str, rows: Iterable[Tuple[int, Dict[str, Any]]]) -> int:
+        """
+        Write a metadata file, replacing any existing one.
+
+        Args:
+            db_path: Path to the SQLite metadata file
+            rows: (label, metadata) pairs with url, name, site and schema_json
+
+        Returns:
+            Number of rows written
+        """
+        writer = HnswMetadataWriter(db_path)
+        try:
+            writer.add(rows)
+            return writer.commit()
+        except BaseException:
+            writer.abort()
+            raise
+
+    @classmethod
+    def from_json(cls, json_path: str, db_path: str) -> int:
+        """
+        Convert a legacy *_metadata.json file into a metadata file.
+
+        Args:
+            json_path: Path to the JSON metadata ({label: metadata})
+            db_path: Path to the SQLite metadata file to write
+
+        Returns:
+            Number of rows written
+        """
+        with open(json_path, "r") as f:
+            metadata = json.load(f)
+        return cls.create(db_path, ((int(k), v) for k, v in metadata.items()))
+
+    def count(self) -> int:
+        """Number of documents."""
+        return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def get_many(self, labels: List[int]) -> Dict[int, List[str]]:
+        """
+        Fetch documents by label.
+
+        Args:
+            labels: HNSW labels
+
+        Returns:
+            Mapping of label to [url, schema_json, name, site] for labels that exist
+        """
+        found = {}
+        labels = [int(label) for label in labels]
+        for i in range(0, len(labels), _MAX_PARAMS):
+            chunk = labels[i:i + _MAX_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            for label, url, schema_json, name, site in self._conn.execute(
+                f"SELECT label, url, schema_json, name, site FROM documents WHERE label IN ({placeholders})",
+                chunk,
+            ):
+                found[label] = [url, schema_json, name, site]
+        return found
+
+    def get_by_url(self, url: str) -> Optional[Tuple[int, List[str]]]:
+        """
+        Fetch a document by exact URL.
+
+        Args:
+            url: Document URL
+
+        Returns:
+            (label, [url, schema_json, name, site]) or None
+        """
+        row = self._conn.execute(
+            "SELECT label, url, schema_json, name, site FROM documents WHERE url = ? LIMIT 1",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], list(row[1:])
+
+    def close(self):
+        self._conn.close()
+
+
+class HnswMetadataWriter:
+    """
+    Incremental writer of a metadata file.
+
+    A new file is written under a temporary name unique to this writer and
+    replaces the file on commit. An update changes the existing file in a
+    single transaction, so readers see either none or all of its rows.
+    """
+
+    def __init__(self, db_path: str, update: bool = False):
+        """
+        Args:
+            db_path: Path to the SQLite metadata file
+            update: Change the existing file instead of writing a new one
+        """
+        self.db_path = db_path
+        self._tmp_path = None if update else f"{db_path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        # Transactions are managed explicitly
+        self._conn = sqlite3.connect(db_path if update else self._tmp_path, isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "label INTEGER PRIMARY KEY, url TEXT, name TEXT, site TEXT, schema_json TEXT)"
+        )
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._batch = []
+
+    def add(self, rows: Iterable[Tuple[int, Dict[str, Any]]]) -> None:
+        """Add or replace (label, metadata) rows."""
+        for label, meta in rows:
+            self._batch.append((
+                int(label),
+                meta.get("url", ""),
+                meta.get("name", ""),
+                meta.get("site", ""),
+                _as_text(meta.get("schema_json", "")),
+            ))
+            if len(self._batch) >= 10000:
+                self._flush()
+
+    def delete(self, labels: List[int]) -> None:
+        """Delete rows by label."""
+        self._flush()
+        labels = [int(label) for label in labels]
+        for i in range(0, len(labels), _MAX_PARAMS):
+            chunk = labels[i:i + _MAX_PARAMS]
+            self._conn.execute(f"DELETE FROM documents WHERE label IN ({','.join('?' * len(chunk))})", chunk)
+
+    def get_by_url(self, url: str) -> Optional[Tuple[int, str]]:
+        """(label, site) of the row with this URL, including rows added by this writer."""
+        self._flush()
+        return self._conn.execute("SELECT label, site FROM documents WHERE url = ? LIMIT 1", (url,)).fetchone()
+
+    def _flush(self) -> None:
+        if self._batch:
+            self._conn.executemany("INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?)", self._batch)
+            self._batch = []
+
+    def commit(self) -> int:
+        """
+        Commit the written rows, moving a new file into place.
+
+        Returns:
+            Number of rows in the file
+        """
+        self._flush()
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_url ON documents(url)")
+        count = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        self._conn.execute("COMMIT")
+        self._conn.close()
+        if self._tmp_path:
+            os.replace(self._tmp_path, self.db_path)
+        return count
+
+    def abort(self) -> None:
+        """Discard the written rows."""
+        if self._conn.in_transaction:
+            self._conn.execute("ROLLBACK")
+        self._conn.close()
+        if self._tmp_path and os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
@@ -0,0 +1,138 @@
+"""Coalesces concurrent kNN queries against one HNSW index into batched knn_query calls."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+class KnnBatcher:
+    """
+    Micro-batcher for hnswlib kNN queries.
+
+    Queries that arrive within ``window_ms`` of each other and share a filter
+    group are stacked into one 2-D ``knn_query`` call, run on a dedicated
+    thread pool (hnswlib releases the GIL while searching), and each waiting
+    coroutine receives its own row. A batch is searched with the largest k it
+    contains and every row is truncated to the k its caller asked for.
+    """
+
+    def __init__(self, index, window_ms: float = 2.0, max_batch: int = 64,
+                 max_workers: int = 2, thread_name_prefix: str = "hnswlib"):
+        """
+        Args:
+            index: Loaded hnswlib.Index
+            window_ms: How long the first query of a batch waits for others
+            max_batch: Batch size at which a batch is searched without waiting
+            max_workers: Threads in the search pool
+            thread_name_prefix: Name prefix of the search threads
+        """
+        self.index = index
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        # group key -> (label filter, [(embedding, k, future)])
+        self._pending: Dict[Hashable, Tuple[Optional[Callable], List[Tuple[Any, int, asyncio.Future]]]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.queries = 0
+        self.batches = 0
+
+    async def query(self, embedding, k: int, group: Hashable = None,
+                    label_filter: Optional[Callable[[int], bool]] = None):
+        """
+        Search one embedding, sharing the index pass with concurrent queries.
+
+        Args:
+            embedding: Query embedding
+            k: Number of neighbours
+            group: Key of the label filter; only queries with the same key are batched together
+            label_filter: hnswlib filter for the group, or None for the whole index
+
+        Returns:
+            Tuple of (labels, distances) arrays for this query
+
+        Raises:
+            RuntimeError: If hnswlib cannot return k neighbours under the filter
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        _, entries = self._pending.setdefault(group, (label_filter, []))
+        entries.append((embedding, k, future))
+        self.queries += 1
+
+        if len(entries) >= self.max_batch:
+            self._flush(group)
+        elif group not in self._timers:
+            self._timers[group] = loop.call_later(self.window, self._flush, group)
+        return await future
+
+    async def query_many(self, embeddings, k: int, group: Hashable = None,
+                         label_filter: Optional[Callable[[int], bool]] = None) -> list:
+        """
+        Search several embeddings in one batch.
+
+        Returns:
+            (labels, distances) per embedding, in order
+        """
+        return await asyncio.gather(*(self.query(e, k, group, label_filter) for e in embeddings))
+
+    def run(self, func: Callable, *args):
+        """Run other index work (for example exact search) on the search pool."""
+        return asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _flush(self, group: Hashable) -> None:
+        timer = self._timers.pop(group, None)
+        if timer is not None:
+            timer.cancel()
+        pending = self._pending.pop(group, None)
+        if pending is None:
+            return
+        task = asyncio.get_running_loop().create_task(self._execute(*pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, label_filter: Optional[Callable], entries: List[Tuple[Any, int, asyncio.Future]]) -> None:
+        self.batches += 1
+        try:
+            outcomes = await self.run(self._search_sync, label_filter, [(e, k) for e, k, _ in entries])
+        except Exception as e:
+            outcomes = [e] * len(entries)
+        for (_, _, future), outcome in zip(entries, outcomes):
+            if future.done():
+                continue
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    def _search_sync(self, label_filter: Optional[Callable], queries: List[Tuple[Any, int]]) -> list:
+        """Search a batch; if the filtered batch cannot fill the largest k, retry each query on its own."""
+        data = np.asarray([embedding for embedding, _ in queries], dtype=np.float32)
+        max_k = max(k for _, k in queries)
+        # A Python filter is called under the GIL, so extra search threads would only contend for it
+        num_threads = 1 if label_filter is not None else -1
+        try:
+            labels, distances = self.index.knn_query(data, k=max_k, num_threads=num_threads, filter=label_filter)
+            return [(labels[i][:k], distances[i][:k]) for i, (_, k) in enumerate(queries)]
+        except RuntimeError:
+            if len(queries) == 1:
+                raise
+
+        outcomes = []
+        for row, k in zip(data, (k for _, k in queries)):
+            try:
+                labels, distances = self.index.knn_query(row[np.newaxis], k=k, num_threads=1, filter=label_filter)
+                outcomes.append((labels[0], distances[0]))
+            except RuntimeError as e:
+                outcomes.append(e)
+        return outcomes
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Query and batch counters."""
+        return {"queries": self.queries, "batches": self.batches}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
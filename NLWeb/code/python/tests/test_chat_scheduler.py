@@ -0,0 +1,138 @@
+"""
+Tests for the chat task scheduler.
+"""
+
+import pytest
+import asyncio
+
+from chat.scheduler import ChatTaskScheduler, TaskPriority
+
+
+class TestChatTaskScheduler:
+    """Test concurrency caps, superseding, backpressure and shutdown"""
+
+    def make_job(self, name, gate=None):
+        """Factory recording when the job starts, optionally waiting on a gate"""
+        async def job():
+            self.started.append(name)
+            if gate is not None:
+                await gate.wait()
+            return name
+        return job
+
+    async def settle(self):
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+    @pytest.fixture(autouse=True)
+    def reset(self):
+        self.started = []
+
+    @pytest.mark.asyncio
+    async def test_per_conversation_cap(self):
+        """Test that one conversation cannot take more than its share of AI slots"""
+        scheduler = ChatTaskScheduler(max_concurrent=10, max_per_conversation=2)
+        gate = asyncio.Event()
+
+        futures = [scheduler.submit("conv_a", self.make_job(f"a{n}", gate)) for n in range(4)]
+        futures.append(scheduler.submit("conv_b", self.make_job("b0", gate)))
+        await self.settle()
+
+        assert sorted(self.started) == ["a0", "a1", "b0"]
+        assert scheduler.pending_count("conv_a") == 2
+        assert scheduler.get_metrics()["running"] == 3
+
+        gate.set()
+        assert await asyncio.gather(*futures) == ["a0", "a1", "a2", "a3", "b0"]
+        await self.settle()
+
+        # Finished conversations leave nothing behind
+        assert scheduler._pending == {}
+        assert scheduler._running_per_conversation == {}
+
+    @pytest.mark.asyncio
+    async def test_supersede_cancels_only_queued_jobs(self):
+        """Test that a newer job replaces a queued one but not a running one"""
+        scheduler = ChatTaskScheduler(max_concurrent=10, max_per_conversation=1)
+        gate = asyncio.Event()
+
+        running = scheduler.submit("conv_a", self.make_job("first", gate), supersede_key="ai_1")
+        queued = scheduler.submit("conv_a", self.make_job("second", gate), supersede_key="ai_1")
+        other = scheduler.submit("conv_a", self.make_job("other", gate), supersede_key="ai_2")
+        await self.settle()
+        newest = scheduler.submit("conv_a", self.make_job("newest", gate), supersede_key="ai_1")
+
+        assert queued.cancelled()
+        assert not running.done()
+        assert not other.done()
+        assert scheduler.get_metrics()["superseded"] == 1
+
+        gate.set()
+        assert await running == "first"
+        assert await other == "other"
+        assert await newest == "newest"
+        assert "second" not in self.started
+        await self.settle()
+        assert scheduler._pending == {}
+
+    @pytest.mark.asyncio
+    async def test_has_capacity_drops_oldest_ai_job(self):
+        """Test that a full conversation makes room by dropping its oldest queued AI job"""
+        scheduler = ChatTaskScheduler(max_concurrent=1, max_per_conversation=1, max_pending_per_conversation=2)
+        gate = asyncio.Event()
+
+        scheduler.submit("conv_a", self.make_job("running", gate))
+        oldest = scheduler.submit("conv_a", self.make_job("oldest", gate))
+        newer = scheduler.submit("conv_a", self.make_job("newer", gate))
+        await self.settle()
+        assert scheduler.pending_count("conv_a") == 2
+
+        assert scheduler.has_capacity("conv_a")
+        assert oldest.cancelled()
+        assert not newer.done()
+        assert scheduler.pending_count("conv_a") == 1
+        assert scheduler.get_metrics()["dropped"] == 1
+
+        # Persistence jobs start at once and do not count toward the queue limit
+        scheduler.submit("conv_a", self.make_job("persist", gate), TaskPriority.PERSISTENCE)
+        scheduler.submit("conv_a", self.make_job("persist_2", gate), TaskPriority.PERSISTENCE)
+        await self.settle()
+        assert "persist_2" in self.started
+        assert scheduler.pending_count("conv_a") == 1
+        assert scheduler.has_capacity("conv_a")
+        assert not newer.done()
+
+        gate.set()
+        await scheduler.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_shutdown_drains_persistence(self):
+        """Test that persistence runs outside the AI caps and shutdown waits for it"""
+        scheduler = ChatTaskScheduler(max_concurrent=1, max_per_conversation=1)
+        gate = asyncio.Event()
+
+        running = scheduler.submit("conv_a", self.make_job("running", gate))
+        queued_ai = scheduler.submit("conv_a", self.make_job("queued_ai", gate))
+        writes = [
+            scheduler.submit("conv_a", self.make_job(f"write_{n}", gate), TaskPriority.PERSISTENCE)
+            for n in range(2)
+        ]
+        await self.settle()
+
+        # Writes are not held back by the AI job holding the only slot
+        assert self.started == ["running", "write_0", "write_1"]
+        assert scheduler.get_metrics()["running_persistence"] == 2
+
+        shutdown = asyncio.create_task(scheduler.shutdown())
+        await self.settle()
+        assert queued_ai.cancelled()
+        assert not shutdown.done()
+
+        gate.set()
+        await shutdown
+
+        assert await running == "running"
+        assert [await write for write in writes] == ["write_0", "write_1"]
+        assert "queued_ai" not in self.started
+        assert scheduler._pending == {}
+        assert scheduler.get_metrics()["running"] == 0
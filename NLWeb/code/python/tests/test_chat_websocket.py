@@ -393,6 +393,120 @@ class TestWebSocketManager:
         assert "average_queue_depth" in metrics
 
 
+class TestSlowConsumerPolicies:
+    """Test outbound queueing and removal of slow or failing connections"""
+    
+    async def make_manager(self, policy, **config):
+        """Create a manager with one slow and one fast connection in a conversation"""
+        manager = WebSocketManager({
+            "send_queue_size": 2,
+            "slow_consumer_policy": policy,
+            **config
+        })
+        
+        self.release = asyncio.Event()
+        
+        async def blocked_send(payload):
+            await self.release.wait()
+        
+        slow_ws = AsyncMock()
+        slow_ws.closed = False
+        slow_ws.send_str = AsyncMock(side_effect=blocked_send)
+        fast_ws = AsyncMock()
+        fast_ws.closed = False
+        
+        slow = WebSocketConnection(slow_ws, "slow_user", "conv_slow", "Slow")
+        fast = WebSocketConnection(fast_ws, "fast_user", "conv_slow", "Fast")
+        await manager.add_connection("conv_slow", slow)
+        await manager.add_connection("conv_slow", fast)
+        return manager, slow, fast
+    
+    async def broadcast_numbers(self, manager, count):
+        # Let writers run between broadcasts, so only the blocked connection backs up
+        for n in range(count):
+            await manager.broadcast_message("conv_slow", {"n": n})
+            await self.settle()
+    
+    def sent(self, ws):
+        return [json.loads(call.args[0]) for call in ws.send_str.call_args_list]
+    
+    async def settle(self):
+        for _ in range(10):
+            await asyncio.sleep(0)
+    
+    @pytest.mark.asyncio
+    async def test_drop_oldest(self):
+        """Test that a full queue discards its oldest message"""
+        manager, slow, fast = await self.make_manager("drop_oldest")
+        await self.broadcast_numbers(manager, 5)
+        
+        # The first message is being sent, the queue holds two more
+        assert slow.queue_depth == 2
+        assert slow.dropped_count == 2
+        self.release.set()
+        await self.settle()
+        
+        assert self.sent(slow.ws) == [{"n": 0}, {"n": 3}, {"n": 4}]
+        assert self.sent(fast.ws) == [{"n": n} for n in range(5)]
+        assert slow.state == ConnectionState.CONNECTED
+        await manager.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_drop_newest(self):
+        """Test that a full queue discards the message being broadcast"""
+        manager, slow, fast = await self.make_manager("drop_newest")
+        await self.broadcast_numbers(manager, 5)
+        
+        assert slow.dropped_count == 2
+        self.release.set()
+        await self.settle()
+        
+        assert self.sent(slow.ws) == [{"n": 0}, {"n": 1}, {"n": 2}]
+        assert slow.state == ConnectionState.CONNECTED
+        assert manager.get_metrics()["dropped_messages"] == 2
+        await manager.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_disconnect(self):
+        """Test that a full queue disconnects the slow consumer and broadcasts its leave"""
+        manager, slow, fast = await self.make_manager("disconnect")
+        await self.broadcast_numbers(manager, 4)
+        
+        assert manager.get_active_participants("conv_slow") == ["fast_user"]
+        assert manager.get_metrics()["slow_consumer_disconnects"] == 1
+        leave = self.sent(fast.ws)[-1]
+        assert leave["type"] == "participant_update"
+        assert leave["action"] == "leave"
+        assert leave["participant"]["participantId"] == "slow_user"
+        await manager.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_send_failure_removes_connection(self):
+        """Test that a failed send removes the connection through the leave path"""
+        manager, slow, fast = await self.make_manager("drop_oldest")
+        slow.ws.send_str = AsyncMock(side_effect=ConnectionResetError("gone"))
+        await self.broadcast_numbers(manager, 1)
+        await self.settle()
+        
+        assert slow.state == ConnectionState.DISCONNECTED
+        assert manager.get_active_participants("conv_slow") == ["fast_user"]
+        assert manager.get_metrics()["active_connections"] == 1
+        assert self.sent(fast.ws)[-1]["action"] == "leave"
+        await manager.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_send_timeout_removes_connection(self):
+        """Test that a send slower than send_timeout removes the connection"""
+        manager, slow, fast = await self.make_manager("drop_oldest", send_timeout=0.01)
+        await self.broadcast_numbers(manager, 1)
+        await asyncio.sleep(0.05)
+        await self.settle()
+        
+        assert manager.get_active_participants("conv_slow") == ["fast_user"]
+        assert self.sent(fast.ws)[-1]["action"] == "leave"
+        await manager.shutdown()
+
+
 class TestWebSocketAuth:
     """Test WebSocket authentication"""
     
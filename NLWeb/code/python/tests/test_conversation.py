@@ -544,6 +544,83 @@ class TestConversationManager:
                 assert p.messages_received[0].content == "Broadcast test"
 
 
+class TestDeliveryContext:
+    """Test the context window passed to participants with each message"""
+    
+    def make_message(self, n):
+        return Message(
+            message_id=f"msg_{n}",
+            conversation_id="conv_ctx",
+            content=f"Message {n}",
+            message_type=MessageType.QUERY,
+            sender_info={"id": "user_sender", "name": "Sender"}
+        )
+    
+    async def make_manager(self):
+        """Manager whose storage holds two older messages and answers only when released"""
+        manager = ConversationManager({"context_window": 10})
+        self.release = asyncio.Event()
+        stored = [self.make_message(f"stored_{n}") for n in range(2)]
+        
+        async def get_conversation_messages(conversation_id, limit=100, after_sequence_id=None):
+            await self.release.wait()
+            return stored
+        
+        storage = AsyncMock()
+        storage.get_conversation_messages = AsyncMock(side_effect=get_conversation_messages)
+        manager.storage = storage
+        
+        self.contexts = {}
+        recipient = MockParticipant("user_recipient", ParticipantType.HUMAN)
+        
+        async def record(message, context, stream_callback=None):
+            self.contexts[message.message_id] = [m.message_id for m in context]
+        
+        recipient.process_message_mock.side_effect = record
+        manager.add_participant("conv_ctx", MockParticipant("user_sender", ParticipantType.HUMAN))
+        manager.add_participant("conv_ctx", recipient)
+        return manager
+    
+    async def wait_for_deliveries(self, count):
+        for _ in range(100):
+            if len(self.contexts) >= count:
+                return
+            await asyncio.sleep(0.01)
+    
+    @pytest.mark.asyncio
+    async def test_cold_miss_context_ends_at_message(self):
+        """Test that messages arriving during the storage load stay out of earlier contexts"""
+        manager = await self.make_manager()
+        
+        await manager.process_message(self.make_message(1))
+        await asyncio.sleep(0.01)  # Delivery of msg_1 is now waiting for storage
+        await manager.process_message(self.make_message(2))
+        self.release.set()
+        await self.wait_for_deliveries(2)
+        
+        assert self.contexts["msg_1"] == ["msg_stored_0", "msg_stored_1", "msg_1"]
+        assert self.contexts["msg_2"] == ["msg_stored_0", "msg_stored_1", "msg_1", "msg_2"]
+        await manager.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_warm_window_context_is_snapshot(self):
+        """Test that once loaded, each message gets the window as of its arrival"""
+        manager = await self.make_manager()
+        self.release.set()
+        await manager.process_message(self.make_message(1))
+        await self.wait_for_deliveries(1)
+        
+        # Both are queued before either is delivered
+        await manager.process_message(self.make_message(2))
+        await manager.process_message(self.make_message(3))
+        await self.wait_for_deliveries(3)
+        
+        assert self.contexts["msg_2"] == ["msg_stored_0", "msg_stored_1", "msg_1", "msg_2"]
+        assert self.contexts["msg_3"] == ["msg_stored_0", "msg_stored_1", "msg_1", "msg_2", "msg_3"]
+        assert manager.storage.get_conversation_messages.await_count == 1
+        await manager.shutdown()
+
+
 class TestConversationMode:
     """Test conversation mode enum"""
     
@@ -0,0 +1,101 @@
+"""
+Tests for the message log, lazy loading and compaction of memory storage.
+"""
+
+import pytest
+import json
+from unittest.mock import patch
+
+from core.schemas import Message, MessageType
+from chat_storage_providers.memory_storage import MemoryStorage
+
+
+class TestMemoryStoragePersistence:
+    """Test the message log, lazy loading and compaction of memory storage"""
+    
+    def make_config(self, tmp_path, **overrides):
+        config = {
+            "storage_path": str(tmp_path),
+            "max_messages_per_conversation": 3,
+            "compact_min_appends": 1000000,
+        }
+        config.update(overrides)
+        return config
+    
+    def make_message(self, conversation_id, n):
+        return Message(
+            message_id=f"{conversation_id}_msg_{n}",
+            conversation_id=conversation_id,
+            content=f"Message {n}",
+            message_type=MessageType.QUERY,
+            sender_info={"id": "user_123", "name": "Alice"}
+        )
+    
+    @pytest.mark.asyncio
+    async def test_lazy_load(self, tmp_path):
+        """Test that stored conversations are only parsed when first accessed"""
+        storage = MemoryStorage(self.make_config(tmp_path))
+        for n in range(5):
+            await storage.store_message(self.make_message("conv_a", n))
+            await storage.store_message(self.make_message("conv_b", n))
+        await storage.close()
+        
+        reopened = MemoryStorage(self.make_config(tmp_path))
+        await reopened._ensure_loaded()
+        assert reopened._conversations == {}
+        assert set(reopened._tail_spans) == {"conv_a", "conv_b"}
+        
+        messages = await reopened.get_conversation_messages("conv_a", limit=10)
+        assert [m.message_id for m in messages] == [f"conv_a_msg_{n}" for n in range(2, 5)]
+        assert set(reopened._conversations) == {"conv_a"}
+        assert "conv_b" in reopened._tail_spans
+        
+        # Unknown conversations are not created by reads
+        assert await reopened.get_conversation_messages("conv_missing") == []
+        assert "conv_missing" not in reopened._conversations
+    
+    @pytest.mark.asyncio
+    async def test_compaction_round_trip(self, tmp_path):
+        """Test that compaction groups the log by conversation without dropping history"""
+        config = self.make_config(tmp_path, compact_min_appends=1, compact_interval_seconds=0)
+        storage = MemoryStorage(config)
+        for n in range(5):
+            await storage.store_message(self.make_message("conv_a", n))
+        await storage.close()
+        
+        # Half of the conversations are unloaded when the next compaction runs
+        storage = MemoryStorage(config)
+        for n in range(5, 10):
+            await storage.store_message(self.make_message("conv_b", n))
+        await storage.close()
+        
+        assert (tmp_path / "messages.index.json").exists()
+        with open(tmp_path / "messages.jsonl") as f:
+            stored = [json.loads(line)["message_id"] for line in f]
+        assert stored == [f"conv_a_msg_{n}" for n in range(5)] + [f"conv_b_msg_{n}" for n in range(5, 10)]
+        
+        reopened = MemoryStorage(config)
+        await reopened._ensure_loaded()
+        assert set(reopened._snapshot_ranges) == {"conv_a", "conv_b"}
+        assert reopened._tail_spans == {}
+        messages = await reopened.get_conversation_messages("conv_a", limit=10)
+        assert [m.message_id for m in messages] == [f"conv_a_msg_{n}" for n in range(2, 5)]
+        messages = await reopened.get_conversation_messages("conv_b", limit=10)
+        assert [m.message_id for m in messages] == [f"conv_b_msg_{n}" for n in range(7, 10)]
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("policy,interval,expected", [
+        ("always", 1.0, 3),
+        ("interval", 3600.0, 0),
+        ("interval", 0.0, 3),
+        ("never", 1.0, 0),
+    ])
+    async def test_fsync_policies(self, tmp_path, policy, interval, expected):
+        """Test how often each fsync policy syncs the log"""
+        storage = MemoryStorage(self.make_config(tmp_path, fsync=policy, fsync_interval_seconds=interval))
+        with patch("chat_storage_providers.memory_storage.os.fsync") as fsync:
+            for n in range(3):
+                await storage.store_message(self.make_message("conv_a", n))
+                await storage.flush()
+            await storage.close()
+        assert fsync.call_count == expected
@@ -173,7 +173,10 @@ class AioHTTPServer:
                 'single_mode_timeout': chat_config.get('single_mode_timeout', 100),
                 'multi_mode_timeout': chat_config.get('multi_mode_timeout', 2000),
                 'queue_size_limit': chat_config.get('queue_size_limit', 1000),
-                'max_participants': chat_config.get('max_participants', 100)
+                'max_participants': chat_config.get('max_participants', 100),
+                'context_window': chat_config.get('context_window', 20),
+                'max_concurrent_jobs': chat_config.get('max_concurrent_jobs', 32),
+                'max_jobs_per_conversation': chat_config.get('max_jobs_per_conversation', 2)
             }
             app['conversation_manager'] = ConversationManager(conv_manager_config)
             
@@ -510,16 +510,35 @@ class DataImporter:
         return citation_map.get(case_type, [])
     
     async def _import_to_graph(self, bundles: List[ArgumentBundle]):
-        """Import bundles to graph database."""
-        for i, bundle in enumerate(bundles):
+        """Import bundles to graph database.
+        
+        Bundles are written in bulk chunks; a chunk that fails is retried
+        bundle by bundle so one bad bundle does not lose the rest.
+        """
+        chunk_size = settings.graph_upsert_chunk_size
+        start_time = datetime.now()
+        written = 0
+        failed = 0
+        
+        for i in range(0, len(bundles), chunk_size):
+            chunk = bundles[i:i + chunk_size]
             try:
-                success = self.graph_db.upsert_nodes_and_edges(bundle, tenant="default")
-                if success:
-                    logger.info(f"Imported bundle {i+1}/{len(bundles)} to graph DB")
-                else:
-                    logger.warning(f"Failed to import bundle {bundle.argument_id} to graph DB")
+                self.graph_db.upsert_bundles(chunk, tenant="default")
+                written += len(chunk)
+                continue
             except Exception as e:
-                logger.error(f"Error importing bundle {bundle.argument_id} to graph: {e}")
+                logger.warning(f"Graph chunk {i // chunk_size + 1} failed, retrying bundle by bundle: {e}")
+            
+            for bundle in chunk:
+                try:
+                    self.graph_db.upsert_bundles([bundle], tenant="default")
+                    written += 1
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"Error importing bundle {bundle.argument_id} to graph: {e}")
+        
+        elapsed = (datetime.now() - start_time).total_seconds()
+        logger.info(f"Imported {written} bundles to graph DB in {elapsed:.1f}s, {failed} failed")
     
     async def _import_to_vector(self, bundles: List[ArgumentBundle]):
         """Import bundles to vector database."""
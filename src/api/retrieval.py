@@ -6,12 +6,14 @@ import structlog
 
 from ..models.schemas import RetrievalRequest, RetrievalResponse
 from ..services.graphrag_retrieval import GraphRAGRetrieval
+from ..services.retrieval_cache import get_retrieval_cache
 
 logger = structlog.get_logger()
 router = APIRouter()
 
-# Initialize retrieval service
+# Initialize retrieval service and its response cache
 retrieval_service = GraphRAGRetrieval()
+retrieval_cache = get_retrieval_cache()
 
 
 @router.post(
@@ -40,7 +42,9 @@ async def retrieve_past_defenses(request: RetrievalRequest) -> RetrievalResponse
             jurisdiction=request.jurisdiction,
         )
         
-        response = await retrieval_service.retrieve_past_defenses(request)
+        response = await retrieval_cache.get_or_compute(
+            request, retrieval_service.retrieve_past_defenses
+        )
         
         if not response.bundles:
             logger.warning("No past defenses found", request=request.dict())
@@ -102,7 +106,9 @@ async def search_arguments(
             limit=limit,
         )
         
-        response = await retrieval_service.retrieve_past_defenses(request)
+        response = await retrieval_cache.get_or_compute(
+            request, retrieval_service.retrieve_past_defenses
+        )
         return response
         
     except ValueError as e:
@@ -38,12 +38,15 @@ class Settings(BaseSettings):
     weaviate_api_key: Optional[str] = Field(default=None)
     weaviate_class_name: str = Field(default="ArgumentSegments")
     weaviate_vector_size: int = Field(default=1536)
+    weaviate_pool_size: int = Field(default=4)  # Clients (and concurrent calls) for AsyncVectorDB
+    weaviate_query_timeout: float = Field(default=5.0)  # seconds
     
     # Neo4j Graph DB
     neo4j_uri: str = Field(default="bolt://neo4j:7687")  # Use Docker service name
     neo4j_user: str = Field(default="neo4j")
     neo4j_password: str = Field(default="CourtSim2024!")  # Match docker-compose.fast.yml
     neo4j_database: str = Field(default="neo4j")
+    graph_upsert_chunk_size: int = Field(default=500)  # Bundles per bulk upsert transaction
     
     # OpenAI / LLM
     openai_api_key: Optional[str] = Field(default=None)
@@ -51,6 +54,16 @@ class Settings(BaseSettings):
     llm_model: str = Field(default="gpt-4-turbo-preview")
     llm_temperature: float = Field(default=0.7)
     
+    # Embedding cache
+    embedding_cache_path: Optional[str] = Field(default="data/embedding_cache.sqlite3")  # None/empty disables disk tier
+    embedding_cache_memory_mb: int = Field(default=256)
+    embedding_cache_warmup_keys: int = Field(default=10000)
+    embedding_cache_max_disk_rows: int = Field(default=1000000)  # 0 disables eviction from the disk tier
+    embedding_batch_max_tokens: int = Field(default=100000)  # Token budget per embeddings request
+    embedding_batch_concurrency: int = Field(default=4)
+    embedding_microbatch_window_ms: float = Field(default=5.0)  # Merge concurrent embed_text calls
+    embedding_microbatch_max_size: int = Field(default=64)
+    
     # Azure OpenAI (for NLWeb)
     azure_openai_api_key: Optional[str] = Field(default=None)
     azure_openai_endpoint: Optional[str] = Field(default=None)
@@ -80,16 +93,38 @@ class Settings(BaseSettings):
     
     # GraphRAG Parameters
     graphrag_max_hops: int = Field(default=2)
+    issue_taxonomy_refresh_seconds: int = Field(default=3600)  # Reload interval for the in-process taxonomy index
     graphrag_alpha: float = Field(default=0.4)  # Vector score weight
     graphrag_beta: float = Field(default=0.2)   # Judge match weight
     graphrag_gamma: float = Field(default=0.2)  # Citation overlap weight
     graphrag_delta: float = Field(default=0.1)  # Outcome boost weight
     graphrag_epsilon: float = Field(default=0.1)  # Issue hop distance weight
+    graphrag_community_level: int = Field(default=2)  # Microsoft GraphRAG search context level
+    graphrag_response_type: str = Field(default="Multiple Paragraphs")
+    graphrag_query_concurrency: int = Field(default=4)  # Concurrent in-process GraphRAG searches
     
     # Retrieval Parameters
     retrieval_limit: int = Field(default=500)
     retrieval_top_k: int = Field(default=10)
     retrieval_timeout: int = Field(default=10)  # seconds
+    retrieval_graphrag_deadline: float = Field(default=8.0)  # Per-stage deadlines, seconds
+    retrieval_vector_deadline: float = Field(default=3.0)
+    retrieval_graph_deadline: float = Field(default=3.0)
+    retrieval_metrics_deadline: float = Field(default=3.0)
+    retrieval_hedge_delay_ms: float = Field(default=500)  # Start hybrid path if GraphRAG is slower than this
+    retrieval_cache_ttl_seconds: float = Field(default=300)
+    retrieval_cache_stale_seconds: float = Field(default=60)  # Served while refreshing in the background
+    retrieval_cache_max_entries: int = Field(default=1024)
+    
+    # stdio MCP server bridge
+    mcp_bridge_pool_size: int = Field(default=2)  # Server processes per server type
+    mcp_bridge_request_timeout: float = Field(default=30.0)  # seconds
+    mcp_bridge_max_failures: int = Field(default=3)  # Consecutive timeouts before a process is recycled
+    mcp_bridge_max_sessions: int = Field(default=10000)  # Session affinities kept per server type
+    
+    # Legal data NLP processing
+    nlp_process_workers: int = Field(default=2)  # Worker processes; 0 processes in a thread
+    nlp_chunk_size: int = Field(default=16)  # Items per worker task and nlp.pipe batch
     
     @validator("cors_origins", pre=True)
     def parse_cors_origins(cls, v):
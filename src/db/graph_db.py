@@ -10,6 +10,7 @@ import json
 import time
 
 from ..core.config import settings
+from .issue_taxonomy import get_issue_taxonomy_index
 from ..models.schemas import (
     ArgumentBundle,
     Case,
@@ -31,6 +32,8 @@ class GraphDB:
         self.driver: Driver = None
         self._connect_with_retry()
         self._ensure_constraints()
+        self.issue_index = get_issue_taxonomy_index()
+        self.issue_index.ensure_loaded(self.driver, self.database)
     
     @retry(stop=stop_after_attempt(10), wait=wait_exponential(multiplier=1, min=4, max=30))
     def _connect_with_retry(self):
@@ -98,6 +101,88 @@ class GraphDB:
                     if "already exists" not in str(e):
                         logger.error(f"Error creating index: {e}")
     
+    # Parameterised UNWIND statements used by upsert_bundles, in write order
+    _UPSERT_STATEMENTS = [
+        ("lawyers", """
+            UNWIND $rows AS row
+            MERGE (l:Lawyer {id: row.id, tenant: $tenant})
+            SET l.name = row.name,
+                l.bar_id = row.bar_id,
+                l.firm = row.firm,
+                l.updated_at = datetime()
+        """),
+        ("cases", """
+            UNWIND $rows AS row
+            MERGE (c:Case {id: row.id, tenant: $tenant})
+            SET c.caption = row.caption,
+                c.court = row.court,
+                c.jurisdiction = row.jurisdiction,
+                c.filed_date = row.filed_date,
+                c.outcome = row.outcome,
+                c.updated_at = datetime()
+        """),
+        ("judges", """
+            UNWIND $rows AS row
+            MERGE (j:Judge {id: row.id, tenant: $tenant})
+            SET j.name = row.name,
+                j.updated_at = datetime()
+            WITH j, row
+            MATCH (c:Case {id: row.case_id, tenant: $tenant})
+            MERGE (c)-[:HEARD_BY]->(j)
+        """),
+        ("issues", """
+            UNWIND $rows AS row
+            MERGE (i:Issue {id: row.id, tenant: $tenant})
+            SET i.title = row.title,
+                i.taxonomy_path = row.taxonomy_path,
+                i.updated_at = datetime()
+        """),
+        ("arguments", """
+            UNWIND $rows AS row
+            MERGE (a:Argument {id: row.id, tenant: $tenant})
+            SET a.stage = row.stage,
+                a.disposition = row.disposition,
+                a.signature_hash = row.signature_hash,
+                a.confidence = row.confidence,
+                a.updated_at = datetime()
+            WITH a, row
+            MATCH (c:Case {id: row.case_id, tenant: $tenant})
+            MERGE (a)-[:IN_CASE]->(c)
+            WITH a, row
+            MATCH (i:Issue {id: row.issue_id, tenant: $tenant})
+            MERGE (a)-[:ADDRESSES]->(i)
+        """),
+        ("argued", """
+            UNWIND $rows AS row
+            MATCH (l:Lawyer {id: row.lawyer_id, tenant: $tenant})
+            MATCH (a:Argument {id: row.argument_id, tenant: $tenant})
+            MERGE (l)-[:ARGUED]->(a)
+        """),
+        ("segments", """
+            UNWIND $rows AS row
+            MERGE (s:Segment {id: row.id, tenant: $tenant})
+            SET s.text = row.text,
+                s.role = row.role,
+                s.seq = row.seq,
+                s.citations = row.citations,
+                s.updated_at = datetime()
+            WITH s, row
+            MATCH (a:Argument {id: row.argument_id, tenant: $tenant})
+            MERGE (s)-[:PART_OF]->(a)
+        """),
+    ] + [
+        (f"citations:{label}", f"""
+            UNWIND $rows AS row
+            MERGE (c:{label} {{text: row.text, tenant: $tenant}})
+            SET c.normalized = row.normalized,
+                c.updated_at = datetime()
+            WITH c, row
+            MATCH (a:Argument {{id: row.argument_id, tenant: $tenant}})
+            MERGE (a)-[:CITES]->(c)
+        """)
+        for label in ("Precedent", "Statute", "Citation")
+    ]
+    
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -117,210 +202,188 @@ class GraphDB:
             Success status
         """
         try:
-            with self.driver.session(database=self.database) as session:
-                # Upsert Lawyer node
-                if bundle.lawyer:
-                    session.run(
-                        """
-                        MERGE (l:Lawyer {id: $id, tenant: $tenant})
-                        SET l.name = $name,
-                            l.bar_id = $bar_id,
-                            l.firm = $firm,
-                            l.updated_at = datetime()
-                        """,
-                        id=bundle.lawyer.id,
-                        name=bundle.lawyer.name,
-                        bar_id=bundle.lawyer.bar_id,
-                        firm=bundle.lawyer.firm,
-                        tenant=tenant,
-                    )
-                
-                # Upsert Case node
-                session.run(
-                    """
-                    MERGE (c:Case {id: $id, tenant: $tenant})
-                    SET c.caption = $caption,
-                        c.court = $court,
-                        c.jurisdiction = $jurisdiction,
-                        c.filed_date = $filed_date,
-                        c.outcome = $outcome,
-                        c.updated_at = datetime()
-                    """,
-                    id=bundle.case.id,
-                    caption=bundle.case.caption,
-                    court=bundle.case.court,
-                    jurisdiction=bundle.case.jurisdiction,
-                    filed_date=bundle.case.filed_date.isoformat() if bundle.case.filed_date else None,
-                    outcome=bundle.case.outcome,
-                    tenant=tenant,
-                )
-                
-                # Upsert Judge node if present
-                if bundle.case.judge_id:
-                    session.run(
-                        """
-                        MERGE (j:Judge {id: $id, tenant: $tenant})
-                        SET j.name = $name,
-                            j.updated_at = datetime()
-                        """,
-                        id=bundle.case.judge_id,
-                        name=bundle.case.judge_name,
-                        tenant=tenant,
-                    )
-                    
-                    # Create HEARD_BY relationship
-                    session.run(
-                        """
-                        MATCH (c:Case {id: $case_id, tenant: $tenant})
-                        MATCH (j:Judge {id: $judge_id, tenant: $tenant})
-                        MERGE (c)-[:HEARD_BY]->(j)
-                        """,
-                        case_id=bundle.case.id,
-                        judge_id=bundle.case.judge_id,
-                        tenant=tenant,
-                    )
-                
-                # Upsert Issue node
-                session.run(
-                    """
-                    MERGE (i:Issue {id: $id, tenant: $tenant})
-                    SET i.title = $title,
-                        i.taxonomy_path = $taxonomy_path,
-                        i.updated_at = datetime()
-                    """,
-                    id=bundle.issue.id,
-                    title=bundle.issue.title,
-                    taxonomy_path=bundle.issue.taxonomy_path,
-                    tenant=tenant,
-                )
-                
-                # Upsert Argument node
-                session.run(
-                    """
-                    MERGE (a:Argument {id: $id, tenant: $tenant})
-                    SET a.stage = $stage,
-                        a.disposition = $disposition,
-                        a.signature_hash = $signature_hash,
-                        a.confidence = $confidence,
-                        a.updated_at = datetime()
-                    """,
-                    id=bundle.argument_id,
-                    stage=bundle.stage.value if bundle.stage else None,
-                    disposition=bundle.disposition.value if bundle.disposition else None,
-                    signature_hash=bundle.signature_hash,
-                    confidence=bundle.confidence.value,
-                    tenant=tenant,
-                )
-                
-                # Create relationships
-                # Lawyer -> Argument
-                if bundle.lawyer:
-                    session.run(
-                        """
-                        MATCH (l:Lawyer {id: $lawyer_id, tenant: $tenant})
-                        MATCH (a:Argument {id: $argument_id, tenant: $tenant})
-                        MERGE (l)-[:ARGUED]->(a)
-                        """,
-                        lawyer_id=bundle.lawyer.id,
-                        argument_id=bundle.argument_id,
-                        tenant=tenant,
-                    )
-                
-                # Argument -> Case
-                session.run(
-                    """
-                    MATCH (a:Argument {id: $argument_id, tenant: $tenant})
-                    MATCH (c:Case {id: $case_id, tenant: $tenant})
-                    MERGE (a)-[:IN_CASE]->(c)
-                    """,
-                    argument_id=bundle.argument_id,
-                    case_id=bundle.case.id,
-                    tenant=tenant,
-                )
-                
-                # Argument -> Issue
-                session.run(
-                    """
-                    MATCH (a:Argument {id: $argument_id, tenant: $tenant})
-                    MATCH (i:Issue {id: $issue_id, tenant: $tenant})
-                    MERGE (a)-[:ADDRESSES]->(i)
-                    """,
-                    argument_id=bundle.argument_id,
-                    issue_id=bundle.issue.id,
-                    tenant=tenant,
-                )
-                
-                # Upsert Segments
-                for segment in bundle.segments:
-                    session.run(
-                        """
-                        MERGE (s:Segment {id: $id, tenant: $tenant})
-                        SET s.text = $text,
-                            s.role = $role,
-                            s.seq = $seq,
-                            s.citations = $citations,
-                            s.updated_at = datetime()
-                        """,
-                        id=segment.segment_id,
-                        text=segment.text,
-                        role=segment.role,
-                        seq=segment.seq,
-                        citations=segment.citations,
-                        tenant=tenant,
-                    )
-                    
-                    # Segment -> Argument
-                    session.run(
-                        """
-                        MATCH (s:Segment {id: $segment_id, tenant: $tenant})
-                        MATCH (a:Argument {id: $argument_id, tenant: $tenant})
-                        MERGE (s)-[:PART_OF]->(a)
-                        """,
-                        segment_id=segment.segment_id,
-                        argument_id=bundle.argument_id,
-                        tenant=tenant,
-                    )
-                
-                # Handle Citations
-                for citation in bundle.citations:
-                    if citation.type == "case":
-                        node_label = "Precedent"
-                    elif citation.type == "statute":
-                        node_label = "Statute"
-                    else:
-                        node_label = "Citation"
-                    
-                    # Create citation node
-                    session.run(
-                        f"""
-                        MERGE (c:{node_label} {{text: $text, tenant: $tenant}})
-                        SET c.normalized = $normalized,
-                            c.updated_at = datetime()
-                        """,
-                        text=citation.text,
-                        normalized=citation.normalized,
-                        tenant=tenant,
-                    )
-                    
-                    # Argument -> Citation
-                    session.run(
-                        f"""
-                        MATCH (a:Argument {{id: $argument_id, tenant: $tenant}})
-                        MATCH (c:{node_label} {{text: $citation_text, tenant: $tenant}})
-                        MERGE (a)-[:CITES]->(c)
-                        """,
-                        argument_id=bundle.argument_id,
-                        citation_text=citation.text,
-                        tenant=tenant,
-                    )
-                
-                logger.info(f"Upserted graph nodes for argument {bundle.argument_id}")
-                return True
+            self.upsert_bundles([bundle], tenant=tenant)
+            logger.info(f"Upserted graph nodes for argument {bundle.argument_id}")
+            return True
                 
         except Exception as e:
             logger.error(f"Error upserting graph data: {e}")
             raise
     
+    def upsert_bundles(
+        self,
+        bundles: List[ArgumentBundle],
+        tenant: str = "default",
+        chunk_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Bulk upsert nodes and relationships for many argument bundles.
+        
+        Each chunk of bundles is written with one parameterised ``UNWIND``
+        statement per label/relationship type inside a single explicit
+        transaction.
+        
+        Args:
+            bundles: Argument bundles to write
+            tenant: Tenant identifier
+            chunk_size: Bundles per transaction, defaults to settings
+            
+        Returns:
+            Throughput statistics
+        """
+        chunk_size = chunk_size or settings.graph_upsert_chunk_size
+        start_time = time.time()
+        rows_written = 0
+        statements_run = 0
+        
+        with self.driver.session(database=self.database) as session:
+            for i in range(0, len(bundles), chunk_size):
+                chunk = bundles[i:i + chunk_size]
+                batches = self._build_upsert_rows(chunk)
+                session.execute_write(self._write_upsert_rows, batches, tenant)
+                rows_written += sum(len(rows) for rows in batches.values())
+                statements_run += len(batches)
+                self.issue_index.add_issues(tenant, batches.get("issues", []))
+        
+        # Imported lazily: the services package imports this module
+        from ..services.retrieval_cache import invalidate_tenant
+        invalidate_tenant(tenant)
+        
+        elapsed = time.time() - start_time
+        stats = {
+            "bundles": len(bundles),
+            "chunks": (len(bundles) + chunk_size - 1) // chunk_size,
+            "statements": statements_run,
+            "rows": rows_written,
+            "elapsed_seconds": round(elapsed, 3),
+            "bundles_per_second": round(len(bundles) / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+        logger.info("Bulk upserted argument bundles to graph", **stats)
+        return stats
+    
+    @staticmethod
+    def _build_upsert_rows(bundles: List[ArgumentBundle]) -> Dict[str, List[Dict[str, Any]]]:
+        """Flatten bundles into per-statement parameter rows.
+        
+        Shared nodes (lawyers, cases, issues, ...) are deduplicated by key;
+        as with sequential upserts, the last bundle in the chunk wins.
+        
+        Args:
+            bundles: Argument bundles
+            
+        Returns:
+            Rows keyed by statement name, empty batches omitted
+        """
+        lawyers: Dict[str, Dict[str, Any]] = {}
+        cases: Dict[str, Dict[str, Any]] = {}
+        judges: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        issues: Dict[str, Dict[str, Any]] = {}
+        arguments: Dict[str, Dict[str, Any]] = {}
+        argued: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        segments: Dict[str, Dict[str, Any]] = {}
+        citations: Dict[str, Dict[Tuple[str, str], Dict[str, Any]]] = {}
+        
+        for bundle in bundles:
+            if bundle.lawyer:
+                lawyers[bundle.lawyer.id] = {
+                    "id": bundle.lawyer.id,
+                    "name": bundle.lawyer.name,
+                    "bar_id": bundle.lawyer.bar_id,
+                    "firm": bundle.lawyer.firm,
+                }
+                argued[(bundle.lawyer.id, bundle.argument_id)] = {
+                    "lawyer_id": bundle.lawyer.id,
+                    "argument_id": bundle.argument_id,
+                }
+            
+            cases[bundle.case.id] = {
+                "id": bundle.case.id,
+                "caption": bundle.case.caption,
+                "court": bundle.case.court,
+                "jurisdiction": bundle.case.jurisdiction,
+                "filed_date": bundle.case.filed_date.isoformat() if bundle.case.filed_date else None,
+                "outcome": bundle.case.outcome,
+            }
+            
+            if bundle.case.judge_id:
+                judges[(bundle.case.judge_id, bundle.case.id)] = {
+                    "id": bundle.case.judge_id,
+                    "name": bundle.case.judge_name,
+                    "case_id": bundle.case.id,
+                }
+            
+            issues[bundle.issue.id] = {
+                "id": bundle.issue.id,
+                "title": bundle.issue.title,
+                "taxonomy_path": bundle.issue.taxonomy_path,
+            }
+            
+            arguments[bundle.argument_id] = {
+                "id": bundle.argument_id,
+                "stage": bundle.stage.value if bundle.stage else None,
+                "disposition": bundle.disposition.value if bundle.disposition else None,
+                "signature_hash": bundle.signature_hash,
+                "confidence": bundle.confidence.value,
+                "case_id": bundle.case.id,
+                "issue_id": bundle.issue.id,
+            }
+            
+            for segment in bundle.segments:
+                segments[segment.segment_id] = {
+                    "id": segment.segment_id,
+                    "text": segment.text,
+                    "role": segment.role,
+                    "seq": segment.seq,
+                    "citations": segment.citations,
+                    "argument_id": bundle.argument_id,
+                }
+            
+            for citation in bundle.citations:
+                if citation.type == "case":
+                    node_label = "Precedent"
+                elif citation.type == "statute":
+                    node_label = "Statute"
+                else:
+                    node_label = "Citation"
+                
+                citations.setdefault(f"citations:{node_label}", {})[
+                    (citation.text, bundle.argument_id)
+                ] = {
+                    "text": citation.text,
+                    "normalized": citation.normalized,
+                    "argument_id": bundle.argument_id,
+                }
+        
+        batches = {
+            "lawyers": list(lawyers.values()),
+            "cases": list(cases.values()),
+            "judges": list(judges.values()),
+            "issues": list(issues.values()),
+            "arguments": list(arguments.values()),
+            "argued": list(argued.values()),
+            "segments": list(segments.values()),
+            **{name: list(rows.values()) for name, rows in citations.items()},
+        }
+        return {name: rows for name, rows in batches.items() if rows}
+    
+    @classmethod
+    def _write_upsert_rows(
+        cls,
+        tx,
+        batches: Dict[str, List[Dict[str, Any]]],
+        tenant: str,
+    ) -> None:
+        """Run the UNWIND statements for one chunk inside a transaction.
+        
+        Args:
+            tx: Managed Neo4j transaction
+            batches: Rows keyed by statement name
+            tenant: Tenant identifier
+        """
+        for name, query in cls._UPSERT_STATEMENTS:
+            rows = batches.get(name)
+            if rows:
+                tx.run(query, rows=rows, tenant=tenant).consume()
+    
     def expand_issues(
         self,
         issue_id: str,
@@ -337,6 +400,12 @@ class GraphDB:
         Returns:
             List of expanded issue IDs
         """
+        # Served from the in-process taxonomy index when it knows the issue
+        if self.issue_index.ensure_loaded(self.driver, self.database):
+            expanded_ids = self.issue_index.expand(issue_id, tenant, max_hops)
+            if expanded_ids is not None:
+                return expanded_ids
+        
         try:
             with self.driver.session(database=self.database) as session:
                 # Use APOC if available, otherwise manual traversal
@@ -523,6 +592,105 @@ class GraphDB:
             logger.error(f"Error calculating graph boosts: {e}")
             return boosts
     
+    def calculate_graph_boosts_many(
+        self,
+        argument_ids: List[str],
+        judge_id: Optional[str] = None,
+        tenant: str = "default",
+    ) -> Dict[str, List[Any]]:
+        """Calculate graph-based scoring boosts for many arguments in one query.
+        
+        Uses the same thresholds as ``calculate_graph_boosts``.
+        
+        Args:
+            argument_ids: Arguments to score
+            judge_id: Optional judge for matching
+            tenant: Tenant identifier
+            
+        Returns:
+            Columnar result: one list per feature, aligned with ``argument_ids``
+        """
+        n = len(argument_ids)
+        columns: Dict[str, List[Any]] = {
+            "argument_ids": list(argument_ids),
+            "judge_match": [0.0] * n,
+            "citation_overlap": [0.0] * n,
+            "outcome_boost": [0.0] * n,
+            "issue_centrality": [0.0] * n,
+            "judge_matched": [False] * n,
+            "citation_count": [0] * n,
+            "disposition": [None] * n,
+            "related_issue_count": [0] * n,
+        }
+        if not argument_ids:
+            return columns
+        
+        try:
+            with self.driver.session(database=self.database) as session:
+                result = session.run(
+                    """
+                    UNWIND range(0, size($argument_ids) - 1) AS idx
+                    OPTIONAL MATCH (a:Argument {id: $argument_ids[idx], tenant: $tenant})
+                    CALL {
+                        WITH a
+                        OPTIONAL MATCH (a)-[:IN_CASE]->(:Case)-[:HEARD_BY]->(j:Judge {id: $judge_id})
+                        RETURN count(j) AS judge_matches
+                    }
+                    CALL {
+                        WITH a
+                        OPTIONAL MATCH (a)-[:CITES]->(cite)
+                        RETURN count(DISTINCT cite) AS citation_count
+                    }
+                    CALL {
+                        WITH a
+                        OPTIONAL MATCH (a)-[:ADDRESSES]->(:Issue)-[:NARROWER_THAN|BROADER_THAN]-(related:Issue)
+                        RETURN count(DISTINCT related) AS related_count
+                    }
+                    RETURN idx, judge_matches, citation_count,
+                           a.disposition AS disposition, related_count
+                    """,
+                    argument_ids=list(argument_ids),
+                    judge_id=judge_id,
+                    tenant=tenant,
+                )
+                
+                for record in result:
+                    idx = record["idx"]
+                    citation_count = record["citation_count"]
+                    disposition = record["disposition"]
+                    related_count = record["related_count"]
+                    
+                    columns["judge_matched"][idx] = record["judge_matches"] > 0
+                    columns["citation_count"][idx] = citation_count
+                    columns["disposition"][idx] = disposition
+                    columns["related_issue_count"][idx] = related_count
+                    
+                    if record["judge_matches"] > 0:
+                        columns["judge_match"][idx] = 0.1
+                    
+                    if citation_count > 10:
+                        columns["citation_overlap"][idx] = 0.2
+                    elif citation_count > 5:
+                        columns["citation_overlap"][idx] = 0.15
+                    elif citation_count > 0:
+                        columns["citation_overlap"][idx] = 0.1
+                    
+                    if disposition == "granted":
+                        columns["outcome_boost"][idx] = 0.15
+                    elif disposition == "partial":
+                        columns["outcome_boost"][idx] = 0.1
+                    
+                    if related_count > 5:
+                        columns["issue_centrality"][idx] = 0.1
+                    elif related_count > 2:
+                        columns["issue_centrality"][idx] = 0.05
+                
+                return columns
+                
+        except Exception as e:
+            logger.error(f"Error calculating batched graph boosts: {e}")
+            return columns
+    
     def get_issue_hierarchy(
         self,
         issue_id: str,
@@ -537,6 +705,11 @@ class GraphDB:
         Returns:
             Issue hierarchy data
         """
+        if self.issue_index.ensure_loaded(self.driver, self.database):
+            hierarchy = self.issue_index.hierarchy(issue_id, tenant)
+            if hierarchy is not None:
+                return hierarchy
+        
         try:
             with self.driver.session(database=self.database) as session:
                 result = session.run(
@@ -0,0 +1,346 @@
+"""In-process index over the issue taxonomy stored in Neo4j."""
+
+from typing import List, Dict, Any, Optional, Iterable
+from dataclasses import dataclass, field
+from collections import deque
+import threading
+import time
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class _TenantTaxonomy:
+    """Taxonomy of one tenant as integer adjacency arrays (CSR layout)."""
+    ids: List[str]
+    positions: Dict[str, int]
+    properties: List[Dict[str, Any]]
+    # Undirected NARROWER_THAN|BROADER_THAN neighbours
+    indptr: np.ndarray
+    indices: np.ndarray
+    # Directed BROADER_THAN edges: i -> broader and i <- narrower
+    broader_indptr: np.ndarray
+    broader_indices: np.ndarray
+    narrower_indptr: np.ndarray
+    narrower_indices: np.ndarray
+    # Precomputed transitive closure up to closure_hops, same CSR layout
+    closure_hops: int = 0
+    closure_indptr: Optional[np.ndarray] = None
+    closure_indices: Optional[np.ndarray] = None
+    # Issues added since the last load; they have no taxonomy edges yet
+    added: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+def _to_csr(n: int, edges: Iterable[tuple]) -> tuple:
+    """Build CSR (indptr, indices) arrays from (src, dst) integer pairs."""
+    edge_array = np.array(list(edges), dtype=np.int32).reshape(-1, 2)
+    order = np.lexsort((edge_array[:, 1], edge_array[:, 0]))
+    edge_array = edge_array[order]
+    counts = np.bincount(edge_array[:, 0], minlength=n)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    return indptr, edge_array[:, 1].copy()
+
+
+class IssueTaxonomyIndex:
+    """Transitive closures of the issue taxonomy, held in memory.
+
+    The taxonomy is loaded from Neo4j once, stored per tenant as compact
+    integer adjacency arrays, and closures up to ``max_hops`` are
+    precomputed so expansion is an array slice. Issues written by
+    ``GraphDB.upsert_bundles`` are added incrementally; taxonomy edges are
+    not written by this application, so the full index (edges included) is
+    reloaded after ``refresh_seconds``. A stale index is
+    reloaded in a background thread and keeps being served until the new
+    snapshot is built, so only the first load blocks its caller.
+    """
+
+    # Minimum delay between load attempts after a failure
+    RETRY_SECONDS = 30
+
+    def __init__(self, max_hops: int = 2, refresh_seconds: float = 3600):
+        """Initialize issue taxonomy index.
+
+        Args:
+            max_hops: Hops to precompute closures for
+            refresh_seconds: Age after which the index is reloaded
+        """
+        self.max_hops = max_hops
+        self.refresh_seconds = refresh_seconds
+        self._tenants: Dict[str, _TenantTaxonomy] = {}
+        self._loaded_at: Optional[float] = None
+        self._failed_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the index holds a non-stale snapshot."""
+        return (
+            self._loaded_at is not None
+            and time.time() - self._loaded_at < self.refresh_seconds
+        )
+
+    def ensure_loaded(self, driver, database: str) -> bool:
+        """Load the index if it has never been loaded or has gone stale.
+
+        Args:
+            driver: Neo4j driver
+            database: Neo4j database name
+
+        Returns:
+            Whether a loaded index is available
+        """
+        if self.is_loaded:
+            return True
+        if self._failed_at is not None and time.time() - self._failed_at < self.RETRY_SECONDS:
+            return self._loaded_at is not None
+        if self._loaded_at is not None:
+            # Serve the stale snapshot while a new one is loaded
+            self._refresh_in_background(driver, database)
+            return True
+        try:
+            self.load(driver, database)
+            self._failed_at = None
+            return True
+        except Exception as e:
+            logger.error(f"Error loading issue taxonomy index: {e}")
+            self._failed_at = time.time()
+            return self._loaded_at is not None
+
+    def _refresh_in_background(self, driver, database: str) -> None:
+        """Start a background reload unless one is running."""
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(
+                target=self._refresh,
+                args=(driver, database),
+                name="issue-taxonomy-refresh",
+                daemon=True,
+            )
+            self._refresh_thread.start()
+
+    def _refresh(self, driver, database: str) -> None:
+        try:
+            self.load(driver, database)
+            self._failed_at = None
+        except Exception as e:
+            logger.error(f"Error refreshing issue taxonomy index, keeping the current one: {e}")
+            self._failed_at = time.time()
+
+    def load(self, driver, database: str) -> None:
+        """Load every tenant's taxonomy from Neo4j.
+
+        Args:
+            driver: Neo4j driver
+            database: Neo4j database name
+        """
+        start_time = time.time()
+
+        with driver.session(database=database) as session:
+            issues = session.run(
+                """
+                MATCH (i:Issue)
+                RETURN i.id AS id, i.tenant AS tenant, properties(i) AS props
+                """
+            ).data()
+            edges = session.run(
+                """
+                MATCH (a:Issue)-[r:NARROWER_THAN|BROADER_THAN]->(b:Issue)
+                WHERE a.tenant = b.tenant
+                RETURN a.id AS src, b.id AS dst, a.tenant AS tenant, type(r) AS type
+                """
+            ).data()
+
+        issues_by_tenant: Dict[str, List[Dict[str, Any]]] = {}
+        for row in issues:
+            issues_by_tenant.setdefault(row["tenant"], []).append(row)
+        edges_by_tenant: Dict[str, List[Dict[str, Any]]] = {}
+        for row in edges:
+            edges_by_tenant.setdefault(row["tenant"], []).append(row)
+
+        tenants = {
+            tenant: self._build_tenant(rows, edges_by_tenant.get(tenant, []))
+            for tenant, rows in issues_by_tenant.items()
+        }
+
+        with self._lock:
+            self._tenants = tenants
+            self._loaded_at = time.time()
+
+        logger.info(
+            f"Loaded issue taxonomy index: {len(issues)} issues, {len(edges)} edges, "
+            f"{len(tenants)} tenants in {int((time.time() - start_time) * 1000)}ms"
+        )
+
+    def add_issues(self, tenant: str, issues: List[Dict[str, Any]]) -> None:
+        """Register newly written issues without reloading.
+
+        New issues carry no taxonomy edges, so each expands to itself until
+        the next reload picks up any edges added to them.
+
+        Args:
+            tenant: Tenant identifier
+            issues: Issue property dicts with at least ``id``
+        """
+        with self._lock:
+            taxonomy = self._tenants.get(tenant)
+            if taxonomy is None:
+                if self._loaded_at is None:
+                    return
+                taxonomy = self._build_tenant([], [])
+                self._tenants[tenant] = taxonomy
+            for issue in issues:
+                position = taxonomy.positions.get(issue["id"])
+                if position is not None:
+                    taxonomy.properties[position] = {**taxonomy.properties[position], **issue}
+                else:
+                    taxonomy.added[issue["id"]] = dict(issue)
+
+    def expand(self, issue_id: str, tenant: str, max_hops: int) -> Optional[List[str]]:
+        """Expand an issue to every issue within ``max_hops`` taxonomy edges.
+
+        Args:
+            issue_id: Starting issue ID
+            tenant: Tenant identifier
+            max_hops: Maximum hops for expansion
+
+        Returns:
+            Expanded issue IDs (including the start), or None if unknown
+        """
+        taxonomy = self._tenants.get(tenant)
+        if taxonomy is None:
+            return None
+        if issue_id in taxonomy.added:
+            return [issue_id]
+        position = taxonomy.positions.get(issue_id)
+        if position is None:
+            return None
+
+        if max_hops == taxonomy.closure_hops and taxonomy.closure_indptr is not None:
+            start, end = taxonomy.closure_indptr[position], taxonomy.closure_indptr[position + 1]
+            members = taxonomy.closure_indices[start:end]
+        else:
+            members = self._bfs(taxonomy, position, max_hops)
+
+        return [taxonomy.ids[i] for i in members]
+
+    def hierarchy(self, issue_id: str, tenant: str) -> Optional[Dict[str, Any]]:
+        """Get an issue with its direct broader and narrower issues.
+
+        Args:
+            issue_id: Issue ID
+            tenant: Tenant identifier
+
+        Returns:
+            Issue hierarchy data, or None if unknown
+        """
+        taxonomy = self._tenants.get(tenant)
+        if taxonomy is None:
+            return None
+        if issue_id in taxonomy.added:
+            return {"issue": dict(taxonomy.added[issue_id]), "broader": [], "narrower": []}
+        position = taxonomy.positions.get(issue_id)
+        if position is None:
+            return None
+
+        def neighbours(indptr: np.ndarray, indices: np.ndarray) -> List[Dict[str, Any]]:
+            return [
+                dict(taxonomy.properties[i])
+                for i in indices[indptr[position]:indptr[position + 1]]
+            ]
+
+        return {
+            "issue": dict(taxonomy.properties[position]),
+            "broader": neighbours(taxonomy.broader_indptr, taxonomy.broader_indices),
+            "narrower": neighbours(taxonomy.narrower_indptr, taxonomy.narrower_indices),
+        }
+
+    def _build_tenant(
+        self,
+        issues: List[Dict[str, Any]],
+        edges: List[Dict[str, Any]],
+    ) -> _TenantTaxonomy:
+        """Build adjacency arrays and closures for one tenant."""
+        ids = [row["id"] for row in issues]
+        positions = {issue_id: i for i, issue_id in enumerate(ids)}
+        properties = [dict(row.get("props") or {"id": row["id"]}) for row in issues]
+        n = len(ids)
+
+        undirected = set()
+        broader = set()
+        for edge in edges:
+            src = positions.get(edge["src"])
+            dst = positions.get(edge["dst"])
+            if src is None or dst is None:
+                continue
+            undirected.add((src, dst))
+            undirected.add((dst, src))
+            if edge["type"] == "BROADER_THAN":
+                broader.add((src, dst))
+
+        indptr, indices = _to_csr(n, undirected)
+        broader_indptr, broader_indices = _to_csr(n, broader)
+        narrower_indptr, narrower_indices = _to_csr(n, ((dst, src) for src, dst in broader))
+
+        taxonomy = _TenantTaxonomy(
+            ids=ids,
+            positions=positions,
+            properties=properties,
+            indptr=indptr,
+            indices=indices,
+            broader_indptr=broader_indptr,
+            broader_indices=broader_indices,
+            narrower_indptr=narrower_indptr,
+            narrower_indices=narrower_indices,
+        )
+
+        # Precompute closures for the configured hop count
+        closure_indptr = np.zeros(n + 1, dtype=np.int64)
+        closures = []
+        for i in range(n):
+            members = self._bfs(taxonomy, i, self.max_hops)
+            closures.append(members)
+            closure_indptr[i + 1] = closure_indptr[i] + len(members)
+        taxonomy.closure_hops = self.max_hops
+        taxonomy.closure_indptr = closure_indptr
+        taxonomy.closure_indices = (
+            np.concatenate(closures).astype(np.int32) if closures else np.zeros(0, dtype=np.int32)
+        )
+        return taxonomy
+
+    @staticmethod
+    def _bfs(taxonomy: _TenantTaxonomy, start: int, max_hops: int) -> np.ndarray:
+        """Breadth-first search over the undirected adjacency arrays."""
+        seen = {start}
+        queue = deque([(start, 0)])
+        while queue:
+            node, depth = queue.popleft()
+            if depth >= max_hops:
+                continue
+            for neighbour in taxonomy.indices[taxonomy.indptr[node]:taxonomy.indptr[node + 1]]:
+                neighbour = int(neighbour)
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    queue.append((neighbour, depth + 1))
+        return np.array(sorted(seen), dtype=np.int32)
+
+
+# Process-wide index shared by every GraphDB instance
+_issue_taxonomy_index = None
+
+
+def get_issue_taxonomy_index() -> IssueTaxonomyIndex:
+    """Get singleton instance of the issue taxonomy index."""
+    global _issue_taxonomy_index
+    if _issue_taxonomy_index is None:
+        from ..core.config import settings
+
+        _issue_taxonomy_index = IssueTaxonomyIndex(
+            max_hops=settings.graphrag_max_hops,
+            refresh_seconds=settings.issue_taxonomy_refresh_seconds,
+        )
+    return _issue_taxonomy_index
@@ -1,6 +1,9 @@
 """Vector database abstraction layer using Weaviate."""
 
 from typing import List, Dict, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
 import numpy as np
 import weaviate
 import weaviate.classes as wvc
@@ -225,6 +228,10 @@ class VectorDB:
             success_count = len(objects) - len(failed_objects)
             logger.info(f"Upserted {success_count}/{len(objects)} segments to Weaviate")
             
+            # Imported lazily: the services package imports this module
+            from ..services.retrieval_cache import invalidate_tenant
+            invalidate_tenant(metadata.get("tenant", "default"))
+            
             return len(failed_objects) == 0
             
         except Exception as e:
@@ -525,4 +532,183 @@ class VectorDB:
             self.client.close()
             logger.info("Weaviate client connection closed")
         except Exception as e:
-            logger.error(f"Error closing Weaviate client: {e}")
\ No newline at end of file
+            logger.error(f"Error closing Weaviate client: {e}")
+
+
+class AsyncVectorDB:
+    """Non-blocking VectorDB for use from async code.
+    
+    Calls are offloaded to a dedicated thread pool, each one holding a
+    Weaviate client checked out of a bounded pool, so a slow query never
+    blocks the event loop. The pool size caps concurrent Weaviate calls and
+    every call is bounded by a timeout that includes waiting for a client.
+    The synchronous ``VectorDB`` remains the API for scripts.
+    """
+    
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        timeout: Optional[float] = None,
+        client: Optional[VectorDB] = None,
+    ):
+        """Initialize async VectorDB.
+        
+        Args:
+            pool_size: Maximum number of Weaviate clients (and concurrent calls)
+            timeout: Default per-call timeout in seconds
+            client: Existing client to seed the pool with
+        """
+        self.pool_size = pool_size or settings.weaviate_pool_size
+        self.timeout = timeout or settings.weaviate_query_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.pool_size,
+            thread_name_prefix="weaviate",
+        )
+        
+        # First client is created eagerly so connection errors surface here
+        self._clients: List[VectorDB] = [client or VectorDB()]
+        self._opened = 1
+        self._closed = False
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._idle.put_nowait(self._clients[0])
+    
+    async def search_similar(
+        self,
+        query_embedding: List[float],
+        filters: Optional[Dict[str, Any]] = None,
+        limit: int = 100,
+        score_threshold: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """Search for similar segments. See ``VectorDB.search_similar``."""
+        return await self._call(
+            "search_similar",
+            query_embedding,
+            filters=filters,
+            limit=limit,
+            score_threshold=score_threshold,
+            timeout=timeout,
+        )
+    
+    async def upsert_segments(
+        self,
+        segments: List[ArgumentSegment],
+        embeddings: List[List[float]],
+        metadata: Dict[str, Any],
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """Upsert argument segments. See ``VectorDB.upsert_segments``."""
+        return await self._call(
+            "upsert_segments", segments, embeddings, metadata, timeout=timeout
+        )
+    
+    async def get_by_ids(
+        self,
+        segment_ids: List[str],
+        timeout: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Retrieve segments by IDs. See ``VectorDB.get_by_ids``."""
+        return await self._call("get_by_ids", segment_ids, timeout=timeout)
+    
+    async def delete_by_filter(
+        self,
+        filters: Dict[str, Any],
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """Delete segments matching filters. See ``VectorDB.delete_by_filter``."""
+        return await self._call("delete_by_filter", filters, timeout=timeout)
+    
+    async def get_collection_info(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Get collection statistics. See ``VectorDB.get_collection_info``."""
+        return await self._call("get_collection_info", timeout=timeout)
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics.
+        
+        Returns:
+            Pool size, open clients and idle clients
+        """
+        return {
+            "pool_size": self.pool_size,
+            "open_clients": len(self._clients),
+            "idle_clients": self._idle.qsize(),
+        }
+    
+    def close(self):
+        """Close every pooled client and the worker threads."""
+        self._closed = True
+        for client in self._clients:
+            client.close()
+        self._clients = []
+        self._executor.shutdown(wait=False)
+    
+    async def _call(self, method: str, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run a VectorDB method on a pooled client in the thread pool.
+        
+        Args:
+            method: VectorDB method name
+            timeout: Per-call timeout, defaults to the pool timeout
+            
+        Returns:
+            The method's return value
+        """
+        timeout = timeout or self.timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        
+        try:
+            client = await asyncio.wait_for(self._acquire(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Timed out waiting for a Weaviate client for {method}")
+            raise
+        
+        future = loop.run_in_executor(
+            self._executor,
+            functools.partial(getattr(client, method), *args, **kwargs),
+        )
+        # Return the client only once the thread is done, even after a timeout
+        future.add_done_callback(lambda _: self._idle.put_nowait(client))
+        
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(future),
+                max(deadline - loop.time(), 0),
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Weaviate {method} exceeded {timeout}s timeout")
+            raise
+    
+    async def _acquire(self) -> VectorDB:
+        """Check out an idle client, opening a new one if the pool allows."""
+        if self._idle.empty() and self._opened < self.pool_size:
+            self._opened += 1
+            opening = asyncio.get_running_loop().run_in_executor(
+                self._executor, VectorDB
+            )
+            try:
+                # Shielded so a caller timeout does not orphan the thread's client
+                client = await asyncio.shield(opening)
+            except asyncio.CancelledError:
+                opening.add_done_callback(self._adopt_client)
+                raise
+            except BaseException:
+                self._opened -= 1
+                raise
+            self._clients.append(client)
+            logger.debug(f"Opened Weaviate client {self._opened}/{self.pool_size}")
+            return client
+        
+        return await self._idle.get()
+    
+    def _adopt_client(self, opening: asyncio.Future) -> None:
+        """Pool (or close) a client whose opener was cancelled before it was ready."""
+        if opening.cancelled() or opening.exception() is not None:
+            self._opened -= 1
+            return
+        client = opening.result()
+        if self._closed:
+            client.close()
+            return
+        self._clients.append(client)
+        self._idle.put_nowait(client)
+        logger.debug(f"Pooled Weaviate client {self._opened}/{self.pool_size} opened after its caller gave up")
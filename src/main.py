@@ -7,6 +7,7 @@ from contextlib import asynccontextmanager
 import structlog
 import uvicorn
 from prometheus_client import make_asgi_app, Counter, Histogram
+import asyncio
 import time
 import uuid
 
@@ -15,6 +16,8 @@ from .api import retrieval, legal_analysis, health, metrics, smart_analysis, sim
 # Temporarily comment out to fix nltk import error
 # from .api.legal_data_websocket import websocket_endpoint
 from .db.graph_db import GraphDB
+from .services.graphrag_query_engine import DEFAULT_GRAPHRAG_DATA_DIR, get_graphrag_query_engine
+from .services.embedding_cache import close_embedding_cache, get_embedding_cache
 
 # Configure structured logging
 structlog.configure(
@@ -63,10 +66,21 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize databases: {e}")
         raise
     
+    # Open and warm the embedding cache off the event loop
+    await asyncio.to_thread(get_embedding_cache)
+    
+    # Load the GraphRAG index in the background so the first query doesn't pay for it
+    graphrag_warmup = None
+    if DEFAULT_GRAPHRAG_DATA_DIR.joinpath("output").exists():
+        graphrag_warmup = asyncio.create_task(get_graphrag_query_engine().warm())
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Legal Analysis System")
+    if graphrag_warmup and not graphrag_warmup.done():
+        graphrag_warmup.cancel()
+    await asyncio.to_thread(close_embedding_cache)
     graph_db.close()
 
 
@@ -236,6 +236,8 @@ class RetrievalResponse(BaseModel):
     query_time_ms: int
     confidence_threshold: float = 0.5
     metrics: Optional[Dict[str, Any]] = None  # Core metrics if requested
+    source: Optional[str] = None  # microsoft_graphrag, hybrid or mock
+    stage_timings_ms: Optional[Dict[str, int]] = None  # Per-stage retrieval timings
     
     class Config:
         json_schema_extra = {
@@ -0,0 +1,512 @@
+"""Tiered, content-addressed cache for text embeddings."""
+
+from typing import Dict, List, Optional, Any, Tuple
+from collections import OrderedDict
+from pathlib import Path
+import asyncio
+import hashlib
+import queue
+import sqlite3
+import threading
+import time
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache.
+
+    Tier 1 is an in-process LRU bounded by a byte budget. Tier 2 is a SQLite
+    file shared by every worker on the host, storing vectors as float32 blobs
+    keyed by ``(model, sha256(text))`` and bounded by a row budget that evicts
+    the least hit rows. Writes and hit counts go to the shared tier through a
+    background writer thread; async callers read it through ``get_many``.
+    Disk failures are logged and never fail the embedding request.
+    """
+
+    # Flush accumulated hit counts to disk after this many distinct keys
+    HIT_FLUSH_THRESHOLD = 256
+
+    # Maximum queued writes committed in one transaction
+    WRITE_BATCH_SIZE = 512
+
+    # Fraction of the row budget kept when the shared tier is over budget
+    DISK_PRUNE_TARGET = 0.9
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_memory_bytes: int = 256 * 1024 * 1024,
+        max_disk_rows: int = 0,
+    ):
+        """Initialize embedding cache.
+
+        Args:
+            db_path: SQLite file for the shared tier, or None for memory only
+            max_memory_bytes: Byte budget for the in-memory LRU
+            max_disk_rows: Row budget for the shared tier, 0 for unbounded
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_rows = max_disk_rows
+        self._memory: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._memory_bytes = 0
+        self._pending_hits: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.RLock()
+        # Serializes use of the SQLite connection, which is slow; never taken with _lock held
+        self._db_lock = threading.Lock()
+
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "disk_writes": 0,
+            "disk_evictions": 0,
+            "disk_errors": 0,
+        }
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disk_rows = 0  # Upper estimate, recounted before pruning
+        self._writes: "queue.Queue[Optional[Tuple[Tuple[str, str], np.ndarray]]]" = queue.Queue()
+        self._flush_requested = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        if db_path:
+            self._conn = self._open_store(db_path)
+        if self._conn:
+            self._writer = threading.Thread(
+                target=self._writer_loop, name="embedding-cache-writer", daemon=True
+            )
+            self._writer.start()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """Content hash used as the cache address of a text.
+
+        Args:
+            text: Text to hash
+
+        Returns:
+            Hex digest
+        """
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Look up an embedding, promoting disk hits into memory.
+
+        Reads the shared tier on the calling thread; use ``get_many`` from
+        async code.
+
+        Args:
+            model: Embedding model name
+            text: Source text
+
+        Returns:
+            Embedding vector or None on miss
+        """
+        key = (model, self.hash_text(text))
+
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                self._record_hit(key)
+                return vector.tolist()
+
+        vector = self._read_disk(key)
+
+        with self._lock:
+            if vector is None:
+                self.stats["misses"] += 1
+                return None
+
+            self.stats["disk_hits"] += 1
+            self._record_hit(key)
+            self._store_memory(key, vector)
+            return vector.tolist()
+
+    async def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up embeddings without blocking the event loop.
+
+        Memory hits are served inline; the remaining texts are read from the
+        shared tier in one query on a worker thread.
+
+        Args:
+            model: Embedding model name
+            texts: Source texts
+
+        Returns:
+            Embedding vector or None per text, in input order
+        """
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        missing: Dict[Tuple[str, str], List[int]] = {}
+
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = (model, self.hash_text(text))
+                vector = self._memory.get(key)
+                if vector is None:
+                    missing.setdefault(key, []).append(i)
+                    continue
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                self._record_hit(key)
+                results[i] = vector.tolist()
+
+        if not missing:
+            return results
+
+        found = await asyncio.to_thread(self._read_disk_many, list(missing)) if self._conn else {}
+
+        with self._lock:
+            for key, indexes in missing.items():
+                vector = found.get(key)
+                if vector is None:
+                    self.stats["misses"] += len(indexes)
+                    continue
+                self.stats["disk_hits"] += len(indexes)
+                self._record_hit(key)
+                self._store_memory(key, vector)
+                embedding = vector.tolist()
+                for i in indexes:
+                    results[i] = embedding
+        return results
+
+    def put(self, model: str, text: str, embedding: List[float]) -> None:
+        """Store an embedding in memory and queue it for the shared tier.
+
+        Args:
+            model: Embedding model name
+            text: Source text
+            embedding: Embedding vector
+        """
+        key = (model, self.hash_text(text))
+        vector = np.asarray(embedding, dtype=np.float32)
+
+        with self._lock:
+            self._store_memory(key, vector)
+
+        if self._writer is not None:
+            self._writes.put((key, vector))
+
+    def warm_up(self, limit: int) -> int:
+        """Preload the most frequently hit keys from disk into memory.
+
+        Args:
+            limit: Maximum number of keys to load
+
+        Returns:
+            Number of embeddings loaded
+        """
+        if not self._conn or limit <= 0:
+            return 0
+
+        try:
+            with self._db_lock:
+                rows = self._conn.execute(
+                    """
+                    SELECT model, text_hash, vector FROM embeddings
+                    ORDER BY hits DESC, last_access DESC
+                    LIMIT ?
+                    """,
+                    (limit,),
+                ).fetchall()
+        except sqlite3.Error as e:
+            self.stats["disk_errors"] += 1
+            logger.warning(f"Embedding cache warm-up failed: {e}")
+            return 0
+
+        loaded = 0
+        with self._lock:
+            # Load coldest first so the hottest end up most recently used
+            for model, text_hash, blob in reversed(rows):
+                vector = np.frombuffer(blob, dtype=np.float32)
+                if self._memory_bytes + vector.nbytes > self.max_memory_bytes:
+                    continue
+                self._store_memory((model, text_hash), vector)
+                loaded += 1
+
+        logger.info(f"Warmed embedding cache with {loaded} embeddings")
+        return loaded
+
+    def flush(self) -> None:
+        """Ask the writer thread to persist accumulated hit counts."""
+        if self._writer is not None:
+            self._flush_requested.set()
+            self._writes.put(None)
+
+    def close(self) -> None:
+        """Write queued embeddings and hit counts, then close the shared tier.
+
+        Blocks until the writer thread has finished; call it off the event loop.
+        """
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            self._writes.put(None)
+            writer.join()
+            # Hits recorded while the writer was stopping
+            self._flush_hits()
+        if self._conn:
+            with self._db_lock:
+                self._conn.close()
+                self._conn = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Counters plus current memory usage and hit rate
+        """
+        with self._lock:
+            lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            return {
+                **self.stats,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "persistent": self._conn is not None,
+            }
+
+    def _open_store(self, db_path: str) -> Optional[sqlite3.Connection]:
+        """Open (and create if needed) the shared SQLite store."""
+        try:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(db_path, timeout=5.0, check_same_thread=False)
+            # WAL lets several worker processes read while one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_hits ON embeddings (hits DESC)"
+            )
+            conn.commit()
+            self._disk_rows = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            logger.info(f"Opened persistent embedding cache at {db_path}")
+            return conn
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent embedding cache unavailable, using memory only: {e}")
+            return None
+
+    def _store_memory(self, key: Tuple[str, str], vector: np.ndarray) -> None:
+        """Insert into the LRU tier and evict down to the byte budget.
+
+        Must be called with the lock held.
+        """
+        if vector.nbytes > self.max_memory_bytes:
+            return
+
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.nbytes
+
+        self._memory[key] = vector
+        self._memory_bytes += vector.nbytes
+
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+            self.stats["evictions"] += 1
+
+    def _record_hit(self, key: Tuple[str, str]) -> None:
+        """Count a hit for warm-up ordering. Must be called with the lock held."""
+        if not self._conn:
+            return
+        self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+        if len(self._pending_hits) >= self.HIT_FLUSH_THRESHOLD and not self._flush_requested.is_set():
+            self.flush()
+
+    def _read_disk(self, key: Tuple[str, str]) -> Optional[np.ndarray]:
+        """Read a vector from the shared tier."""
+        if not self._conn:
+            return None
+        try:
+            with self._db_lock:
+                row = self._conn.execute(
+                    "SELECT vector FROM embeddings WHERE model = ? AND text_hash = ?",
+                    key,
+                ).fetchone()
+        except sqlite3.Error as e:
+            self.stats["disk_errors"] += 1
+            logger.warning(f"Embedding cache read failed: {e}")
+            return None
+
+        if row is None:
+            return None
+        return np.frombuffer(row[0], dtype=np.float32)
+
+    def _read_disk_many(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], np.ndarray]:
+        """Read vectors of several keys from the shared tier, grouped by model."""
+        found: Dict[Tuple[str, str], np.ndarray] = {}
+        by_model: Dict[str, List[str]] = {}
+        for model, text_hash in keys:
+            by_model.setdefault(model, []).append(text_hash)
+
+        try:
+            with self._db_lock:
+                if not self._conn:
+                    return found
+                for model, hashes in by_model.items():
+                    # Stay well under SQLite's bound-parameter limit
+                    for start in range(0, len(hashes), 500):
+                        chunk = hashes[start:start + 500]
+                        rows = self._conn.execute(
+                            f"""
+                            SELECT text_hash, vector FROM embeddings
+                            WHERE model = ? AND text_hash IN ({",".join("?" * len(chunk))})
+                            """,
+                            [model, *chunk],
+                        ).fetchall()
+                        for text_hash, blob in rows:
+                            found[(model, text_hash)] = np.frombuffer(blob, dtype=np.float32)
+        except sqlite3.Error as e:
+            self.stats["disk_errors"] += 1
+            logger.warning(f"Embedding cache read failed: {e}")
+        return found
+
+    def _writer_loop(self) -> None:
+        """Commit queued embeddings in batches and flush hit counts when asked.
+
+        ``None`` items wake the thread; it exits once ``close`` has cleared
+        ``_writer`` and the queue is drained.
+        """
+        while True:
+            item = self._writes.get()
+            batch = [item] if item is not None else []
+            while len(batch) < self.WRITE_BATCH_SIZE:
+                try:
+                    item = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    batch.append(item)
+
+            if batch:
+                self._write_disk(batch)
+            stopping = self._writer is None
+            if self._flush_requested.is_set() or stopping:
+                self._flush_requested.clear()
+                self._flush_hits()
+            if stopping and self._writes.empty():
+                return
+
+    def _write_disk(self, batch: List[Tuple[Tuple[str, str], np.ndarray]]) -> None:
+        """Write vectors to the shared tier in one transaction, then enforce the row budget."""
+        now = time.time()
+        try:
+            with self._db_lock, self._conn:
+                self._conn.executemany(
+                    """
+                    INSERT INTO embeddings (model, text_hash, dim, vector, hits, created_at, last_access)
+                    VALUES (?, ?, ?, ?, 0, ?, ?)
+                    ON CONFLICT (model, text_hash) DO UPDATE SET
+                        vector = excluded.vector,
+                        dim = excluded.dim,
+                        last_access = excluded.last_access
+                    """,
+                    [
+                        (key[0], key[1], int(vector.shape[0]), vector.tobytes(), now, now)
+                        for key, vector in batch
+                    ],
+                )
+            self.stats["disk_writes"] += len(batch)
+            self._disk_rows += len(batch)
+        except sqlite3.Error as e:
+            self.stats["disk_errors"] += 1
+            logger.warning(f"Embedding cache write failed: {e}")
+            return
+
+        if self.max_disk_rows and self._disk_rows > self.max_disk_rows:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Delete the least hit, least recently used rows down to the prune target."""
+        try:
+            with self._db_lock, self._conn:
+                # Other workers share the file and upserts overcount, so recount first
+                self._disk_rows = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                if self._disk_rows <= self.max_disk_rows:
+                    return
+                excess = self._disk_rows - int(self.max_disk_rows * self.DISK_PRUNE_TARGET)
+                deleted = self._conn.execute(
+                    """
+                    DELETE FROM embeddings WHERE rowid IN (
+                        SELECT rowid FROM embeddings
+                        ORDER BY hits ASC, last_access ASC, rowid ASC
+                        LIMIT ?
+                    )
+                    """,
+                    (excess,),
+                ).rowcount
+            self._disk_rows -= deleted
+            self.stats["disk_evictions"] += deleted
+            logger.info(f"Evicted {deleted} embeddings from the persistent cache")
+        except sqlite3.Error as e:
+            self.stats["disk_errors"] += 1
+            logger.warning(f"Embedding cache eviction failed: {e}")
+
+    def _flush_hits(self) -> None:
+        """Persist accumulated hit counts to the shared tier."""
+        with self._lock:
+            pending = self._pending_hits
+            self._pending_hits = {}
+
+        if not self._conn or not pending:
+            return
+
+        now = time.time()
+        try:
+            with self._db_lock, self._conn:
+                self._conn.executemany(
+                    """
+                    UPDATE embeddings SET hits = hits + ?, last_access = ?
+                    WHERE model = ? AND text_hash = ?
+                    """,
+                    [(count, now, model, text_hash) for (model, text_hash), count in pending.items()],
+                )
+        except sqlite3.Error as e:
+            self.stats["disk_errors"] += 1
+            logger.warning(f"Failed to flush embedding cache hit counts: {e}")
+
+
+# Process-wide cache shared by every EmbeddingService instance
+_embedding_cache = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get singleton instance of the embedding cache, warming it on first use."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        from ..core.config import settings
+
+        _embedding_cache = EmbeddingCache(
+            db_path=settings.embedding_cache_path or None,
+            max_memory_bytes=settings.embedding_cache_memory_mb * 1024 * 1024,
+            max_disk_rows=settings.embedding_cache_max_disk_rows,
+        )
+        _embedding_cache.warm_up(settings.embedding_cache_warmup_keys)
+    return _embedding_cache
+
+
+def close_embedding_cache() -> None:
+    """Close the process-wide cache if it was created, writing anything still queued."""
+    global _embedding_cache
+    if _embedding_cache is not None:
+        _embedding_cache.close()
+        _embedding_cache = None
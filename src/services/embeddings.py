@@ -1,16 +1,17 @@
 """Embedding service for text vectorization."""
 
-from typing import List, Optional
+from typing import List, Optional, Dict, Any, Tuple, Set
+import asyncio
 import openai
 from openai import AsyncOpenAI
 import numpy as np
 import structlog
 from tenacity import retry, stop_after_attempt, wait_exponential
 import tiktoken
-import hashlib
 import json
 
 from ..core.config import settings
+from .embedding_cache import EmbeddingCache, get_embedding_cache
 
 logger = structlog.get_logger()
 
@@ -18,18 +19,36 @@ logger = structlog.get_logger()
 class EmbeddingService:
     """Service for generating text embeddings."""
     
-    def __init__(self):
-        """Initialize embedding service."""
+    def __init__(self, cache: Optional[EmbeddingCache] = None):
+        """Initialize embedding service.
+        
+        Args:
+            cache: Embedding cache, defaults to the shared process-wide cache
+                (opened on first use, so building the service does no disk I/O)
+        """
         self.client = AsyncOpenAI(api_key=settings.openai_api_key)
         self.model = settings.embedding_model
         self.encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
         self.max_tokens = 8191  # Max for text-embedding-3-small
-        self._cache = {}  # Simple in-memory cache
+        self._cache_instance = cache
+        self.batch_max_tokens = settings.embedding_batch_max_tokens
+        self.batch_concurrency = settings.embedding_batch_concurrency
+        
+        # Single-flight map and micro-batching state for embed_text
+        self.microbatch_window = settings.embedding_microbatch_window_ms / 1000
+        self.microbatch_max_size = settings.embedding_microbatch_max_size
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: List[Tuple[str, str, asyncio.Future, bool]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._microbatch_tasks: Set[asyncio.Task] = set()
+    
+    @property
+    def _cache(self) -> EmbeddingCache:
+        """Embedding cache, opening the shared one on first use."""
+        if self._cache_instance is None:
+            self._cache_instance = get_embedding_cache()
+        return self._cache_instance
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-    )
     async def embed_text(
         self,
         text: str,
@@ -37,6 +56,10 @@ class EmbeddingService:
     ) -> List[float]:
         """Generate embedding for text.
         
+        Concurrent calls for the same text share one in-flight request, and
+        independent misses arriving within the micro-batching window are
+        merged into a single ``embeddings.create`` call.
+        
         Args:
             text: Text to embed
             use_cache: Whether to use cache
@@ -47,25 +70,23 @@ class EmbeddingService:
         try:
             # Check cache
             if use_cache:
-                cache_key = self._get_cache_key(text)
-                if cache_key in self._cache:
+                cached = (await self._cache.get_many(self.model, [text]))[0]
+                if cached is not None:
                     logger.debug("Using cached embedding")
-                    return self._cache[cache_key]
+                    return cached
             
-            # Truncate if necessary
-            truncated_text = self._truncate_text(text)
+            # Join an identical in-flight request, or enqueue a new one
+            key = self._get_cache_key(text)
+            future = self._inflight.get(key)
+            if future is None:
+                future = asyncio.get_running_loop().create_future()
+                self._inflight[key] = future
+                self._enqueue(key, text, future, use_cache)
+            else:
+                logger.debug("Joining in-flight embedding request")
             
-            # Generate embedding
-            response = await self.client.embeddings.create(
-                model=self.model,
-                input=truncated_text,
-            )
-            
-            embedding = response.data[0].embedding
-            
-            # Cache result
-            if use_cache:
-                self._cache[cache_key] = embedding
+            # Shield so a cancelled caller does not cancel the shared request
+            embedding = await asyncio.shield(future)
             
             logger.debug(f"Generated embedding for text of length {len(text)}")
             return embedding
@@ -74,50 +95,200 @@ class EmbeddingService:
             logger.error(f"Error generating embedding: {e}")
             raise
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-    )
+    def _enqueue(
+        self,
+        key: str,
+        text: str,
+        future: asyncio.Future,
+        use_cache: bool,
+    ) -> None:
+        """Add a miss to the current micro-batch, flushing when full.
+        
+        Args:
+            key: In-flight key for the text
+            text: Text to embed
+            future: Future resolved with the embedding
+            use_cache: Whether to cache the result
+        """
+        self._pending.append((key, text, future, use_cache))
+        
+        if len(self._pending) >= self.microbatch_max_size:
+            self._flush_pending()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.microbatch_window, self._flush_pending
+            )
+    
+    def _flush_pending(self) -> None:
+        """Send the current micro-batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        
+        waiters = {text: (key, future, use_cache) for key, text, future, use_cache in pending}
+        for batch in self._pack_batches(list(waiters), self.microbatch_max_size):
+            task = asyncio.create_task(self._run_microbatch(batch, waiters))
+            self._microbatch_tasks.add(task)
+            task.add_done_callback(self._microbatch_tasks.discard)
+    
+    async def _run_microbatch(
+        self,
+        batch: List[Tuple[str, str]],
+        waiters: Dict[str, Tuple[str, asyncio.Future, bool]],
+    ) -> None:
+        """Embed one micro-batch and resolve its waiters.
+        
+        Args:
+            batch: (original text, truncated text) pairs
+            waiters: In-flight key, future and cache flag per original text
+        """
+        try:
+            embeddings = await self._embed_sub_batch([truncated for _, truncated in batch])
+        except Exception as e:
+            for text, _ in batch:
+                key, future, _ = waiters[text]
+                self._inflight.pop(key, None)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        if len(batch) > 1:
+            logger.debug(f"Coalesced {len(batch)} embedding requests into one call")
+        
+        for (text, _), embedding in zip(batch, embeddings):
+            key, future, use_cache = waiters[text]
+            if use_cache:
+                self._cache.put(self.model, text, embedding)
+            self._inflight.pop(key, None)
+            if not future.done():
+                future.set_result(embedding)
+    
     async def embed_batch(
         self,
         texts: List[str],
         batch_size: int = 100,
+        use_cache: bool = True,
     ) -> List[List[float]]:
         """Generate embeddings for multiple texts.
         
+        Cache hits are served locally and duplicate texts are embedded once.
+        Misses are packed into sub-batches bounded by both ``batch_size`` and
+        a token budget, sent concurrently, and retried independently so one
+        failing sub-batch does not re-embed the others.
+        
         Args:
             texts: List of texts to embed
-            batch_size: Batch size for API calls
+            batch_size: Maximum texts per API call
+            use_cache: Whether to use cache
             
         Returns:
-            List of embedding vectors
+            List of embedding vectors, in input order
         """
         try:
-            embeddings = []
+            results: List[Optional[List[float]]] = [None] * len(texts)
+            
+            # Collapse duplicates: each unique text maps to its input positions
+            positions: Dict[str, List[int]] = {}
+            for i, text in enumerate(texts):
+                positions.setdefault(text, []).append(i)
             
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i:i + batch_size]
+            # Serve cache hits locally
+            misses = []
+            unique = list(positions)
+            cached_embeddings = (
+                await self._cache.get_many(self.model, unique) if use_cache else [None] * len(unique)
+            )
+            for text, cached in zip(unique, cached_embeddings):
+                if cached is None:
+                    misses.append(text)
+                    continue
+                for i in positions[text]:
+                    results[i] = cached
+            
+            if misses:
+                sub_batches = self._pack_batches(misses, batch_size)
+                semaphore = asyncio.Semaphore(self.batch_concurrency)
                 
-                # Truncate texts
-                truncated_batch = [self._truncate_text(t) for t in batch]
+                async def run(batch: List[Tuple[str, str]]) -> None:
+                    async with semaphore:
+                        embeddings = await self._embed_sub_batch([t for _, t in batch])
+                    for (text, _), embedding in zip(batch, embeddings):
+                        if use_cache:
+                            self._cache.put(self.model, text, embedding)
+                        for i in positions[text]:
+                            results[i] = embedding
                 
-                # Generate embeddings
-                response = await self.client.embeddings.create(
-                    model=self.model,
-                    input=truncated_batch,
-                )
+                await asyncio.gather(*(run(batch) for batch in sub_batches))
                 
-                batch_embeddings = [item.embedding for item in response.data]
-                embeddings.extend(batch_embeddings)
-                
-                logger.debug(f"Generated {len(batch_embeddings)} embeddings in batch")
+                logger.debug(
+                    f"Embedded {len(misses)} unique texts in {len(sub_batches)} sub-batches "
+                    f"for {len(texts)} inputs"
+                )
             
-            return embeddings
+            return results
             
         except Exception as e:
             logger.error(f"Error generating batch embeddings: {e}")
             raise
     
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+    )
+    async def _embed_sub_batch(self, inputs: List[str]) -> List[List[float]]:
+        """Embed one sub-batch with a single API call.
+        
+        Args:
+            inputs: Already truncated texts
+            
+        Returns:
+            Embedding vectors in input order
+        """
+        response = await self.client.embeddings.create(
+            model=self.model,
+            input=inputs,
+        )
+        data = sorted(response.data, key=lambda item: item.index)
+        return [item.embedding for item in data]
+    
+    def _pack_batches(
+        self,
+        texts: List[str],
+        batch_size: int,
+    ) -> List[List[Tuple[str, str]]]:
+        """Pack texts into sub-batches bounded by count and token budget.
+        
+        Args:
+            texts: Unique texts to embed
+            batch_size: Maximum texts per sub-batch
+            
+        Returns:
+            Sub-batches of (original text, truncated text) pairs
+        """
+        batches = []
+        current: List[Tuple[str, str]] = []
+        current_tokens = 0
+        
+        for text in texts:
+            truncated, n_tokens = self._prepare_text(text)
+            if current and (
+                len(current) >= batch_size
+                or current_tokens + n_tokens > self.batch_max_tokens
+            ):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append((text, truncated))
+            current_tokens += n_tokens
+        
+        if current:
+            batches.append(current)
+        return batches
+    
     def _truncate_text(self, text: str) -> str:
         """Truncate text to fit within token limits.
         
@@ -127,19 +298,30 @@ class EmbeddingService:
         Returns:
             Truncated text
         """
+        return self._prepare_text(text)[0]
+    
+    def _prepare_text(self, text: str) -> Tuple[str, int]:
+        """Truncate text to fit within token limits and count its tokens.
+        
+        Args:
+            text: Text to truncate
+            
+        Returns:
+            Truncated text and its (estimated) token count
+        """
         try:
             tokens = self.encoding.encode(text)
             if len(tokens) > self.max_tokens:
+                logger.warning(f"Truncated text from {len(tokens)} to {self.max_tokens} tokens")
                 tokens = tokens[:self.max_tokens]
                 text = self.encoding.decode(tokens)
-                logger.warning(f"Truncated text from {len(tokens)} to {self.max_tokens} tokens")
-            return text
+            return text, len(tokens)
         except Exception:
             # Fallback to character truncation
             max_chars = self.max_tokens * 4  # Rough estimate
             if len(text) > max_chars:
                 text = text[:max_chars]
-            return text
+            return text, len(text) // 4 + 1
     
     def _get_cache_key(self, text: str) -> str:
         """Generate cache key for text.
@@ -150,7 +332,15 @@ class EmbeddingService:
         Returns:
             Cache key
         """
-        return hashlib.md5(f"{self.model}:{text}".encode()).hexdigest()
+        return f"{self.model}:{self._cache.hash_text(text)}"
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get embedding cache statistics.
+        
+        Returns:
+            Hit/miss/eviction counters and memory usage
+        """
+        return self._cache.get_stats()
     
     def calculate_similarity(
         self,
@@ -0,0 +1,268 @@
+"""Resident Microsoft GraphRAG query engine."""
+
+import asyncio
+import inspect
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+# Default GraphRAG project root (settings.yaml and output/)
+DEFAULT_GRAPHRAG_DATA_DIR = Path(__file__).parent.parent.parent / "graphrag_data"
+
+
+@dataclass
+class GraphRAGSearchResult:
+    """Answer of one GraphRAG search with the context records it was built from."""
+    method: str
+    response: str
+    context: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    duration_ms: int = 0
+
+    def context_count(self) -> int:
+        """Total number of context records (entities, reports, sources, ...)."""
+        return sum(len(records) for records in self.context.values())
+
+
+@dataclass
+class _IndexState:
+    """Loaded GraphRAG config and index tables."""
+    config: Any
+    tables: Dict[str, Any]
+    signature: Tuple[Tuple[str, float, int], ...]
+
+
+class GraphRAGQueryEngine:
+    """Answers GraphRAG local and global searches in-process.
+
+    The project settings and the parquet index artifacts (entities,
+    communities, community reports, text units, relationships) are loaded
+    once and kept in memory, and searches call the ``graphrag.api`` query
+    functions directly instead of starting the CLI. Artifacts are reloaded
+    when the files in the output directory change, e.g. after re-indexing.
+    """
+
+    # Logical table -> artifact file names (current names first, then pre-1.0 names)
+    ARTIFACTS = {
+        "entities": ("entities.parquet", "create_final_entities.parquet"),
+        "nodes": ("create_final_nodes.parquet",),
+        "communities": ("communities.parquet", "create_final_communities.parquet"),
+        "community_reports": ("community_reports.parquet", "create_final_community_reports.parquet"),
+        "text_units": ("text_units.parquet", "create_final_text_units.parquet"),
+        "relationships": ("relationships.parquet", "create_final_relationships.parquet"),
+        "covariates": ("covariates.parquet", "create_final_covariates.parquet"),
+    }
+
+    def __init__(
+        self,
+        root_dir: Optional[str] = None,
+        community_level: int = 2,
+        response_type: str = "Multiple Paragraphs",
+        max_concurrency: int = 4,
+    ):
+        """Initialize the query engine.
+
+        Args:
+            root_dir: GraphRAG project root containing settings.yaml and output/
+            community_level: Community hierarchy level used for search context
+            response_type: Response format passed to the search prompts
+            max_concurrency: Searches running at the same time
+        """
+        self.root_dir = Path(root_dir or DEFAULT_GRAPHRAG_DATA_DIR)
+        self.output_dir = self.root_dir / "output"
+        self.community_level = community_level
+        self.response_type = response_type
+
+        self._state: Optional[_IndexState] = None
+        self._load_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._unavailable = False
+
+        self.searches = 0
+        self.loads = 0
+
+    async def warm(self) -> bool:
+        """Load the config and index artifacts ahead of the first search.
+
+        Returns:
+            True if the index is loaded
+        """
+        return await self._ensure_loaded() is not None
+
+    async def local_search(self, query: str) -> Optional[GraphRAGSearchResult]:
+        """Entity-centred search over the knowledge graph.
+
+        Args:
+            query: Search query
+
+        Returns:
+            Search result, or None if GraphRAG or its index is unavailable
+        """
+        return await self._search("local", query)
+
+    async def global_search(self, query: str) -> Optional[GraphRAGSearchResult]:
+        """Search over community reports of the whole corpus.
+
+        Args:
+            query: Search query
+
+        Returns:
+            Search result, or None if GraphRAG or its index is unavailable
+        """
+        return await self._search("global", query)
+
+    async def _search(self, method: str, query: str) -> Optional[GraphRAGSearchResult]:
+        async with self._semaphore:
+            state = await self._ensure_loaded()
+            if state is None:
+                return None
+
+            from graphrag import api
+
+            search = getattr(api, f"{method}_search")
+            start_time = time.time()
+            response, context = await search(**self._search_kwargs(search, state, query))
+            self.searches += 1
+
+            return GraphRAGSearchResult(
+                method=method,
+                response=response if isinstance(response, str) else str(response),
+                context=self._context_records(context),
+                duration_ms=int((time.time() - start_time) * 1000),
+            )
+
+    def _search_kwargs(self, search, state: _IndexState, query: str) -> Dict[str, Any]:
+        """Arguments for a ``graphrag.api`` search function.
+
+        The table parameters differ between GraphRAG releases, so only the
+        parameters the installed version declares are passed.
+        """
+        candidates = {
+            "config": state.config,
+            "community_level": self.community_level,
+            "dynamic_community_selection": False,
+            "response_type": self.response_type,
+            "query": query,
+            **state.tables,
+        }
+        params = inspect.signature(search).parameters
+        kwargs = {name: value for name, value in candidates.items() if name in params}
+
+        missing = [
+            name for name, param in params.items()
+            if param.default is inspect.Parameter.empty and name not in kwargs
+        ]
+        # Optional tables such as covariates are passed as None when not indexed
+        for name in missing:
+            if name in self.ARTIFACTS:
+                kwargs[name] = None
+        return kwargs
+
+    @staticmethod
+    def _context_records(context: Any) -> Dict[str, List[Dict[str, Any]]]:
+        """Convert search context data (DataFrames per table) to plain records."""
+        if not isinstance(context, dict):
+            return {}
+        records = {}
+        for name, value in context.items():
+            if hasattr(value, "to_dict"):
+                records[name] = value.to_dict("records")
+            elif isinstance(value, list):
+                records[name] = value
+        return records
+
+    async def _ensure_loaded(self) -> Optional[_IndexState]:
+        """Return the loaded index, (re)loading it if the artifacts changed."""
+        if self._unavailable:
+            return None
+
+        signature = await asyncio.to_thread(self._artifact_signature)
+        if self._state is not None and self._state.signature == signature:
+            return self._state
+
+        async with self._load_lock:
+            if self._state is None or self._state.signature != signature:
+                try:
+                    self._state = await asyncio.to_thread(self._load, signature)
+                except ImportError as e:
+                    logger.error(f"GraphRAG is not installed, in-process search disabled: {e}")
+                    self._unavailable = True
+                    return None
+                except Exception as e:
+                    logger.error(f"Failed to load GraphRAG index from {self.output_dir}: {e}")
+                    # Keep serving the previous index if there is one
+                    return self._state
+        return self._state
+
+    def _artifact_signature(self) -> Tuple[Tuple[str, float, int], ...]:
+        """(name, mtime, size) of every index artifact, to detect re-indexing."""
+        signature = []
+        for names in self.ARTIFACTS.values():
+            for name in names:
+                path = self.output_dir / name
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                signature.append((name, stat.st_mtime, stat.st_size))
+        return tuple(signature)
+
+    def _load(self, signature: Tuple[Tuple[str, float, int], ...]) -> _IndexState:
+        """Load the GraphRAG config and the index tables."""
+        import pandas as pd
+        from graphrag.config.load_config import load_config
+
+        start_time = time.time()
+        config = load_config(self.root_dir)
+
+        tables = {}
+        for table, names in self.ARTIFACTS.items():
+            for name in names:
+                path = self.output_dir / name
+                if path.exists():
+                    tables[table] = pd.read_parquet(path)
+                    break
+        if not tables:
+            raise FileNotFoundError(f"No GraphRAG index artifacts in {self.output_dir}")
+
+        self.loads += 1
+        logger.info(
+            f"Loaded GraphRAG index ({', '.join(sorted(tables))}) "
+            f"in {int((time.time() - start_time) * 1000)}ms"
+        )
+        return _IndexState(config=config, tables=tables, signature=signature)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Search and load counters."""
+        return {
+            "loaded": self._state is not None,
+            "searches": self.searches,
+            "loads": self.loads,
+            "tables": {
+                name: len(frame) for name, frame in (self._state.tables.items() if self._state else [])
+            },
+        }
+
+
+# Engines by project root, shared by every service instance
+_query_engines: Dict[Path, GraphRAGQueryEngine] = {}
+
+
+def get_graphrag_query_engine(root_dir: Optional[str] = None) -> GraphRAGQueryEngine:
+    """Get the query engine for a GraphRAG project root."""
+    from ..core.config import settings
+
+    root = Path(root_dir or DEFAULT_GRAPHRAG_DATA_DIR).resolve()
+    if root not in _query_engines:
+        _query_engines[root] = GraphRAGQueryEngine(
+            root_dir=str(root),
+            community_level=settings.graphrag_community_level,
+            response_type=settings.graphrag_response_type,
+            max_concurrency=settings.graphrag_query_concurrency,
+        )
+    return _query_engines[root]
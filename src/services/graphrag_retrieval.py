@@ -1,6 +1,7 @@
 """GraphRAG hybrid retrieval system using Microsoft's official GraphRAG."""
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Awaitable
+import asyncio
 import numpy as np
 from datetime import datetime
 import structlog
@@ -9,7 +10,7 @@ import hashlib
 import time
 
 from ..core.config import settings
-from ..db.vector_db import VectorDB
+from ..db.vector_db import AsyncVectorDB
 from ..db.graph_db import GraphDB
 from ..services.metrics import MetricsService
 from ..models.schemas import (
@@ -32,10 +33,23 @@ logger = structlog.get_logger()
 class GraphRAGRetrieval:
     """Hybrid retrieval system using Microsoft's official GraphRAG."""
     
+    # Columns of the hybrid scoring feature matrix
+    FEATURE_NAMES = (
+        "vector_similarity",
+        "graph_relevance",
+        "judge_alignment",
+        "citation_strength",
+        "outcome_similarity",
+        "hop_distance",
+    )
+    
+    # Outcome similarity by disposition
+    OUTCOME_SCORES = {"granted": 1.0, "partial": 0.5}
+    
     def __init__(self):
         """Initialize GraphRAG retrieval system."""
         # Keep existing services for fallback and metrics
-        self.vector_db = VectorDB()
+        self.vector_db = AsyncVectorDB()
         self.graph_db = GraphDB()
         self.embedding_service = EmbeddingService()
         self.metrics_service = MetricsService()
@@ -63,127 +77,261 @@ class GraphRAGRetrieval:
     ) -> RetrievalResponse:
         """Retrieve past defense arguments using GraphRAG.
         
+        Independent stages run concurrently, each under its own deadline:
+        metrics run alongside retrieval, vector and graph search run side by
+        side, and the Microsoft GraphRAG path is hedged against the hybrid
+        path, taking whichever first returns real (non-mock) results. A stage
+        that misses its deadline contributes nothing and the response is
+        built from the stages that finished.
+        
         Args:
             request: Retrieval request with issue text and filters
             
         Returns:
-            Response with ranked argument bundles and explanations
+            Response with ranked argument bundles, explanations and per-stage timings
         """
         start_time = time.time()
+        timings: Dict[str, int] = {}
         
-        # Try Microsoft GraphRAG first if available
-        if self.use_microsoft_graphrag and self.microsoft_graphrag:
-            try:
-                logger.info("Using Microsoft GraphRAG for retrieval")
-                response = await self.microsoft_graphrag.retrieve_past_defenses(request)
-                
-                # Add metrics if lawyer_id provided
-                if request.lawyer_id:
-                    response.metrics = await self._calculate_metrics(request.lawyer_id)
-                
-                return response
-                
-            except Exception as e:
-                logger.warning(f"Microsoft GraphRAG failed, falling back: {e}")
-                # Continue to fallback system below
+        metrics_task = None
+        if request.lawyer_id:
+            metrics_task = asyncio.create_task(self._run_stage(
+                "metrics",
+                self._calculate_metrics(request.lawyer_id),
+                settings.retrieval_metrics_deadline,
+                timings,
+            ))
         
-        # Fallback to original hybrid system
         try:
-            logger.info("Using fallback hybrid retrieval system")
+            if self.use_microsoft_graphrag and self.microsoft_graphrag:
+                response = await self._hedged_retrieve(request, timings)
+            else:
+                response = await self._hybrid_retrieve(request, timings)
             
-            # 1. Vector search for semantically similar arguments
-            vector_results = await self._vector_search(
-                request.issue_text,
-                request.tenant,
-                request.limit * 3,  # Over-fetch for re-ranking
+            if metrics_task:
+                response.metrics = await metrics_task
+        finally:
+            if metrics_task and not metrics_task.done():
+                metrics_task.cancel()
+        
+        response.query_time_ms = int((time.time() - start_time) * 1000)
+        response.stage_timings_ms = timings
+        return response
+    
+    async def _run_stage(
+        self,
+        name: str,
+        coro: Awaitable[Any],
+        deadline: float,
+        timings: Dict[str, int],
+        default: Any = None,
+    ) -> Any:
+        """Run one pipeline stage under a deadline, recording its duration.
+        
+        Args:
+            name: Stage name used in timings and logs
+            coro: Stage coroutine
+            deadline: Seconds before the stage is abandoned
+            timings: Per-stage timings, updated in place
+            default: Result used when the stage times out or fails
+            
+        Returns:
+            Stage result, or ``default``
+        """
+        stage_start = time.time()
+        try:
+            return await asyncio.wait_for(coro, timeout=deadline)
+        except asyncio.TimeoutError:
+            logger.warning(f"Retrieval stage '{name}' exceeded {deadline}s deadline")
+            return default
+        except Exception as e:
+            logger.error(f"Retrieval stage '{name}' failed: {e}")
+            return default
+        finally:
+            timings[name] = int((time.time() - stage_start) * 1000)
+    
+    async def _hedged_retrieve(
+        self,
+        request: RetrievalRequest,
+        timings: Dict[str, int],
+    ) -> RetrievalResponse:
+        """Race Microsoft GraphRAG against the hybrid path.
+        
+        The hybrid path starts after ``retrieval_hedge_delay_ms`` unless
+        GraphRAG has already returned real results. The first real response
+        wins; mock responses are only used when nothing better arrives.
+        
+        Args:
+            request: Retrieval request
+            timings: Per-stage timings, updated in place
+            
+        Returns:
+            Winning response
+        """
+        logger.info("Using Microsoft GraphRAG for retrieval, hedged with hybrid retrieval")
+        graphrag_task = asyncio.create_task(self._run_stage(
+            "microsoft_graphrag",
+            self.microsoft_graphrag.retrieve_past_defenses(request),
+            settings.retrieval_graphrag_deadline,
+            timings,
+        ))
+        pending = {graphrag_task}
+        fallback = None
+        
+        try:
+            done, pending = await asyncio.wait(
+                pending, timeout=settings.retrieval_hedge_delay_ms / 1000
             )
+            if done:
+                response = graphrag_task.result()
+                if self._is_acceptable(response):
+                    return response
+                fallback = response
+            
+            hybrid_task = asyncio.create_task(self._hybrid_retrieve(request, timings))
+            pending.add(hybrid_task)
+            
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task is hybrid_task and task.exception() is not None:
+                        if fallback is None and not pending:
+                            raise task.exception()
+                        logger.warning(f"Hybrid retrieval failed during hedge: {task.exception()}")
+                        continue
+                    response = task.result()
+                    if self._is_acceptable(response):
+                        return response
+                    fallback = fallback or response
+            
+            return fallback or self._mock_response(request)
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    @staticmethod
+    def _is_acceptable(response: Optional[RetrievalResponse]) -> bool:
+        """Whether a response carries real, non-empty results."""
+        return bool(response and response.bundles and response.source != "mock")
+    
+    async def _hybrid_retrieve(
+        self,
+        request: RetrievalRequest,
+        timings: Dict[str, int],
+    ) -> RetrievalResponse:
+        """Hybrid vector + graph retrieval with concurrent, deadline-bound stages.
+        
+        Args:
+            request: Retrieval request
+            timings: Per-stage timings, updated in place
             
-            # 2. Graph traversal for related legal concepts
-            graph_results = await self._graph_search(
-                request.issue_text,
-                request.lawyer_id,
-                request.jurisdiction,
-                request.limit * 2,
+        Returns:
+            Response with ranked argument bundles
+        """
+        try:
+            logger.info("Using hybrid retrieval system")
+            
+            # Restrict vector search to the current issue's taxonomy neighbourhood
+            issue_ids = None
+            if request.current_issue_id:
+                # Off the event loop: a first index load or a Cypher fallback blocks
+                issue_ids = await asyncio.to_thread(
+                    self.graph_db.expand_issues,
+                    request.current_issue_id,
+                    request.tenant,
+                    settings.graphrag_max_hops,
+                )
+            
+            # 1-2. Vector search and graph traversal run concurrently
+            vector_results, graph_results = await asyncio.gather(
+                self._run_stage(
+                    "vector_search",
+                    self._vector_search(
+                        request.issue_text,
+                        request.tenant,
+                        request.limit * 3,  # Over-fetch for re-ranking
+                        issue_ids=issue_ids,
+                    ),
+                    settings.retrieval_vector_deadline,
+                    timings,
+                    default=[],
+                ),
+                self._run_stage(
+                    "graph_search",
+                    self._graph_search(
+                        request.issue_text,
+                        request.lawyer_id,
+                        request.jurisdiction,
+                        request.limit * 2,
+                    ),
+                    settings.retrieval_graph_deadline,
+                    timings,
+                    default=[],
+                ),
             )
             
             # 3. Check if we have any results, if not use mock data
             if not vector_results and not graph_results:
                 logger.info("No results from databases, using enhanced mock data")
-                final_bundles = self._generate_mock_bundles(request.issue_text, request.limit)
-                query_time_ms = int((time.time() - start_time) * 1000)
-                
-                # Calculate metrics even for mock data
-                metrics = None
-                if request.lawyer_id:
-                    metrics = await self._calculate_metrics(request.lawyer_id)
-                
-                return RetrievalResponse(
-                    bundles=final_bundles,
-                    total_count=len(final_bundles),
-                    query_time_ms=query_time_ms,
-                    graph_explanations=[],
-                    metrics=metrics,
-                )
-            
-            # 3. Hybrid scoring and re-ranking
+                return self._mock_response(request)
+            
+            # 4. Hybrid scoring and re-ranking, with graph features for all candidates
+            await self._run_stage(
+                "graph_features",
+                self._attach_graph_features(vector_results, request),
+                settings.retrieval_graph_deadline,
+                timings,
+            )
+            rerank_start = time.time()
             combined_results = self._hybrid_scoring(
                 vector_results,
                 graph_results,
                 request,
+                top_k=request.limit,
             )
             
-            # 4. Build argument bundles
+            # 5. Build argument bundles
             final_bundles = await self._build_bundles(
-                combined_results[:request.limit],
+                combined_results,
                 request.tenant,
             )
             
-            # 5. Add graph explanations
+            # 6. Add graph explanations
             explanations = self._generate_explanations(
                 final_bundles,
                 vector_results,
                 graph_results,
             )
-            
-            # 6. Calculate metrics if lawyer_id provided
-            metrics = None
-            if request.lawyer_id:
-                metrics = await self._calculate_metrics(request.lawyer_id)
-            
-            query_time_ms = int((time.time() - start_time) * 1000)
+            timings["rerank"] = int((time.time() - rerank_start) * 1000)
             
             return RetrievalResponse(
                 bundles=final_bundles,
                 total_count=len(final_bundles),
-                query_time_ms=query_time_ms,
+                query_time_ms=0,
                 graph_explanations=explanations,
-                metrics=metrics,
+                source="hybrid",
             )
             
         except Exception as e:
-            logger.error(f"Error in fallback GraphRAG retrieval: {e}")
+            logger.error(f"Error in hybrid GraphRAG retrieval: {e}")
             
             # Return mock data for demo if database is empty
             if "collection" in str(e).lower() or "not found" in str(e).lower():
                 logger.info("Database empty, returning mock data for demo")
-                final_bundles = self._generate_mock_bundles(request.issue_text, request.limit)
-                
-                # Calculate metrics even for mock data
-                metrics = None
-                if request.lawyer_id:
-                    metrics = await self._calculate_metrics(request.lawyer_id)
-                
-                query_time_ms = int((time.time() - start_time) * 1000)
-                
-                return RetrievalResponse(
-                    bundles=final_bundles,
-                    total_count=len(final_bundles),
-                    query_time_ms=query_time_ms,
-                    graph_explanations=[],
-                    metrics=metrics,
-                )
+                return self._mock_response(request)
             raise
     
+    def _mock_response(self, request: RetrievalRequest) -> RetrievalResponse:
+        """Build a response from enhanced mock data."""
+        final_bundles = self._generate_mock_bundles(request.issue_text, request.limit)
+        return RetrievalResponse(
+            bundles=final_bundles,
+            total_count=len(final_bundles),
+            query_time_ms=0,
+            graph_explanations=[],
+            source="mock",
+        )
+    
     async def _calculate_metrics(self, lawyer_id: str) -> Dict[str, Any]:
         """Calculate core metrics for the lawyer.
         
@@ -194,10 +342,12 @@ class GraphRAGRetrieval:
             Dictionary containing win rate, judge alignment, and argument diversity
         """
         try:
-            # Get all three metrics
-            win_rate = await self.metrics_service.calculate_win_rate(lawyer_id)
-            judge_alignment = await self.metrics_service.calculate_judge_alignment(lawyer_id)
-            argument_diversity = await self.metrics_service.calculate_argument_diversity(lawyer_id)
+            # The metrics service is synchronous; run the three queries concurrently
+            win_rate, judge_alignment, argument_diversity = await asyncio.gather(
+                asyncio.to_thread(self.metrics_service.calculate_win_rate, lawyer_id),
+                asyncio.to_thread(self.metrics_service.calculate_judge_alignment_rate, lawyer_id),
+                asyncio.to_thread(self.metrics_service.calculate_argument_diversity, lawyer_id),
+            )
             
             # Check if we got real data
             if win_rate.get("total_cases", 0) > 0:
@@ -284,6 +434,7 @@ class GraphRAGRetrieval:
         issue_text: str,
         tenant: str,
         limit: int,
+        issue_ids: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
         """Perform vector similarity search.
         
@@ -291,6 +442,7 @@ class GraphRAGRetrieval:
             issue_text: Query text
             tenant: Tenant identifier
             limit: Maximum results
+            issue_ids: Optional issue IDs to restrict results to
             
         Returns:
             List of vector search results
@@ -300,9 +452,15 @@ class GraphRAGRetrieval:
         
         # Search in vector database
         try:
-            results = self.vector_db.search_similar(
+            filters = {}
+            if tenant:
+                filters["tenant"] = tenant
+            if issue_ids:
+                filters["issue.id"] = issue_ids
+            
+            results = await self.vector_db.search_similar(
                 query_embedding,
-                filters={"tenant": tenant} if tenant else None,
+                filters=filters or None,
                 limit=limit,
             )
             
@@ -357,16 +515,23 @@ class GraphRAGRetrieval:
         vector_results: List[Dict[str, Any]],
         graph_results: List[Dict[str, Any]],
         request: RetrievalRequest,
+        top_k: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
         """Combine and score results from vector and graph search.
         
+        Candidate features are gathered into one matrix and combined with
+        the alpha..epsilon weights in a single matrix-vector product; only
+        the top ``top_k`` rows are selected and sorted. Each returned result
+        carries its feature row under ``features`` for the confidence score.
+        
         Args:
             vector_results: Results from vector search
             graph_results: Results from graph search
             request: Original request
+            top_k: Number of results to return, all if None
             
         Returns:
-            Combined and scored results
+            Combined results, best first
         """
         # Create a map for deduplication
         result_map = {}
@@ -379,7 +544,7 @@ class GraphRAGRetrieval:
                     **result,
                     "vector_score": result.get("score", 0),
                     "graph_score": 0,
-                    "hop_distance": float("inf"),
+                    "hop_distance": None,
                 }
         
         # Process graph results
@@ -397,58 +562,114 @@ class GraphRAGRetrieval:
                         "hop_distance": result.get("hop_distance", 0),
                     }
         
-        # Calculate hybrid scores
-        for result in result_map.values():
-            # Base scores
-            vector_score = result.get("vector_score", 0)
-            graph_score = result.get("graph_score", 0)
-            
-            # Additional features
-            judge_score = self._calculate_judge_alignment_score(result, request)
-            citation_score = self._calculate_citation_score(result)
-            outcome_score = self._calculate_outcome_score(result)
-            hop_penalty = result.get("hop_distance", 0)
-            
-            # Combined score using formula from PDF
-            result["hybrid_score"] = (
-                self.alpha * vector_score +
-                self.beta * judge_score +
-                self.gamma * citation_score +
-                self.delta * outcome_score -
-                self.epsilon * hop_penalty
-            )
+        results = list(result_map.values())
+        if not results:
+            return []
+        
+        features = self._feature_matrix(results)
+        scores = features @ self._feature_weights()
+        
+        # Select top-k without sorting the whole candidate set
+        n = len(results)
+        k = n if top_k is None else min(top_k, n)
+        if k < n:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(n)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        
+        ranked = []
+        for i in top:
+            result = results[i]
+            result["hybrid_score"] = float(scores[i])
+            result["features"] = dict(zip(self.FEATURE_NAMES, features[i].tolist()))
+            ranked.append(result)
         
-        # Sort by hybrid score
-        sorted_results = sorted(
-            result_map.values(),
-            key=lambda x: x["hybrid_score"],
-            reverse=True,
+        return ranked
+    
+    def _feature_weights(self) -> np.ndarray:
+        """Weights for FEATURE_NAMES in the hybrid score formula."""
+        return np.array(
+            [self.alpha, 0.0, self.beta, self.gamma, self.delta, -self.epsilon],
+            dtype=np.float64,
+        )
+    
+    def _feature_matrix(self, results: List[Dict[str, Any]]) -> np.ndarray:
+        """Build the (candidates x FEATURE_NAMES) feature matrix.
+        
+        Args:
+            results: Deduplicated candidates
+            
+        Returns:
+            Feature matrix
+        """
+        n = len(results)
+        # Candidates not reached by graph traversal sit just beyond the hop limit
+        unreached_hops = settings.graphrag_max_hops + 1
+        
+        vector = np.fromiter((r.get("vector_score") or 0 for r in results), np.float64, n)
+        graph = np.fromiter((r.get("graph_score") or 0 for r in results), np.float64, n)
+        # Judge alignment: 1/0 when graph data says so, neutral otherwise
+        judge = np.fromiter(
+            (float(bool(r["judge_match"])) if "judge_match" in r else 0.5 for r in results),
+            np.float64,
+            n,
+        )
+        citations = np.fromiter(
+            (r.get("citation_count", len(r.get("citations") or [])) for r in results),
+            np.float64,
+            n,
+        )
+        outcome = np.fromiter(
+            (self.OUTCOME_SCORES.get(r.get("outcome") or r.get("disposition"), 0.0) for r in results),
+            np.float64,
+            n,
+        )
+        hops = np.fromiter(
+            (unreached_hops if r.get("hop_distance") is None else r["hop_distance"] for r in results),
+            np.float64,
+            n,
         )
         
-        return sorted_results
+        return np.column_stack([
+            vector,
+            graph,
+            judge,
+            np.minimum(citations / 10, 1.0),  # Normalize to 0-1
+            outcome,
+            hops,
+        ])
     
-    def _calculate_judge_alignment_score(
+    async def _attach_graph_features(
         self,
-        result: Dict[str, Any],
+        results: List[Dict[str, Any]],
         request: RetrievalRequest,
-    ) -> float:
-        """Calculate judge alignment score."""
-        # Placeholder - would check historical judge decisions
-        return 0.5
-    
-    def _calculate_citation_score(self, result: Dict[str, Any]) -> float:
-        """Calculate citation overlap score."""
-        citations = result.get("citations", [])
-        return min(len(citations) / 10, 1.0)  # Normalize to 0-1
-    
-    def _calculate_outcome_score(self, result: Dict[str, Any]) -> float:
-        """Calculate outcome similarity score."""
-        outcome = result.get("outcome", "")
-        if outcome == "granted":
-            return 1.0
-        elif outcome == "partial":
-            return 0.5
-        return 0.0
+    ) -> None:
+        """Attach graph features to candidates with one batched graph query.
+        
+        Args:
+            results: Candidate results, updated in place
+            request: Original request
+        """
+        candidates = [r for r in results if r.get("id")]
+        if not candidates:
+            return
+        
+        boosts = await asyncio.to_thread(
+            self.graph_db.calculate_graph_boosts_many,
+            [r["id"] for r in candidates],
+            request.judge_id,
+            request.tenant,
+        )
+        
+        for i, result in enumerate(candidates):
+            if request.judge_id:
+                result["judge_match"] = boosts["judge_matched"][i]
+            result["citation_count"] = max(
+                boosts["citation_count"][i], len(result.get("citations", []))
+            )
+            if boosts["disposition"][i]:
+                result["disposition"] = boosts["disposition"][i]
     
     async def _build_bundles(
         self,
@@ -476,14 +697,8 @@ class GraphRAGRetrieval:
             
             # Build confidence score
             confidence = ConfidenceScore(
-                value=result.get("hybrid_score", 0.5),
-                features={
-                    "vector_similarity": result.get("vector_score", 0),
-                    "graph_relevance": result.get("graph_score", 0),
-                    "judge_alignment": self._calculate_judge_alignment_score(result, None),
-                    "citation_strength": self._calculate_citation_score(result),
-                    "outcome_similarity": self._calculate_outcome_score(result),
-                },
+                value=min(max(result.get("hybrid_score", 0.5), 0.0), 1.0),
+                features=result.get("features", {}),
             )
             
             # Create bundle
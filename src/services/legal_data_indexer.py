@@ -20,7 +20,7 @@ from neo4j.exceptions import ServiceUnavailable, TransientError
 from .legal_data_processor import ProcessedLegalDocument, LegalEntity, LegalCitation, LegalConcept
 from .legal_data_apis import LegalCase, LegalDocument, DataSource
 from ..db.graph_db import GraphDB
-from ..db.vector_db import VectorDB
+from ..db.vector_db import VectorDB, AsyncVectorDB
 from ..services.embeddings import EmbeddingService
 from ..core.config import settings
 
@@ -85,6 +85,7 @@ class LegalDataIndexer:
         self.logger = logger
         self.graph_db = graph_db or GraphDB()
         self.vector_db = vector_db or VectorDB()
+        self.async_vector_db = AsyncVectorDB(client=self.vector_db)
         self.embedding_service = embedding_service or EmbeddingService()
         
         # Initialize stats
@@ -752,36 +753,53 @@ class LegalDataIndexer:
         document_id = doc.standardized_metadata.get('id')
         
         try:
+            # Embed segments, summary and key points in one batched call
+            segments = [
+                (i, segment) for i, segment in enumerate(doc.text_segments or [])
+                if segment.strip()
+            ]
+            key_points = [
+                (i, key_point) for i, key_point in enumerate(doc.key_points or [])
+                if key_point.strip()
+            ]
+            texts = [segment for _, segment in segments]
+            if doc.summary:
+                texts.append(doc.summary)
+            texts.extend(key_point for _, key_point in key_points)
+            
+            if not texts:
+                return 0
+            
+            embeddings = await self.embedding_service.embed_batch(texts)
+            embedding_iter = iter(embeddings)
+            
             # Create embeddings for text segments
-            if doc.text_segments:
-                for i, segment in enumerate(doc.text_segments):
-                    if segment.strip():
-                        # Generate embedding
-                        embedding = await self.embedding_service.embed_text(segment)
-                        
-                        # Prepare metadata
-                        metadata = {
-                            'document_id': document_id,
-                            'segment_index': i,
-                            'segment_text': segment[:500],  # Truncate for storage
-                            'document_type': doc.standardized_metadata.get('type'),
-                            'source': doc.standardized_metadata.get('source'),
-                            'title': doc.standardized_metadata.get('title', '')[:200],
-                            'quality_score': doc.quality_metrics.get('overall_quality', 0.5)
-                        }
-                        
-                        # Store in vector database
-                        vector_id = f"{document_id}_segment_{i}"
-                        self.vector_db.add_vector(
-                            vector_id=vector_id,
-                            vector=embedding,
-                            metadata=metadata
-                        )
-                        vectors_created += 1
+            for i, segment in segments:
+                embedding = next(embedding_iter)
+                
+                # Prepare metadata
+                metadata = {
+                    'document_id': document_id,
+                    'segment_index': i,
+                    'segment_text': segment[:500],  # Truncate for storage
+                    'document_type': doc.standardized_metadata.get('type'),
+                    'source': doc.standardized_metadata.get('source'),
+                    'title': doc.standardized_metadata.get('title', '')[:200],
+                    'quality_score': doc.quality_metrics.get('overall_quality', 0.5)
+                }
+                
+                # Store in vector database
+                vector_id = f"{document_id}_segment_{i}"
+                self.vector_db.add_vector(
+                    vector_id=vector_id,
+                    vector=embedding,
+                    metadata=metadata
+                )
+                vectors_created += 1
             
             # Create embedding for summary if available
             if doc.summary:
-                summary_embedding = await self.embedding_service.embed_text(doc.summary)
+                summary_embedding = next(embedding_iter)
                 
                 summary_metadata = {
                     'document_id': document_id,
@@ -801,28 +819,26 @@ class LegalDataIndexer:
                 vectors_created += 1
             
             # Create embeddings for key points
-            if doc.key_points:
-                for i, key_point in enumerate(doc.key_points):
-                    if key_point.strip():
-                        key_point_embedding = await self.embedding_service.embed_text(key_point)
-                        
-                        key_point_metadata = {
-                            'document_id': document_id,
-                            'content_type': 'key_point',
-                            'key_point_index': i,
-                            'document_type': doc.standardized_metadata.get('type'),
-                            'source': doc.standardized_metadata.get('source'),
-                            'title': doc.standardized_metadata.get('title', '')[:200],
-                            'quality_score': doc.quality_metrics.get('overall_quality', 0.5)
-                        }
-                        
-                        key_point_vector_id = f"{document_id}_keypoint_{i}"
-                        self.vector_db.add_vector(
-                            vector_id=key_point_vector_id,
-                            vector=key_point_embedding,
-                            metadata=key_point_metadata
-                        )
-                        vectors_created += 1
+            for i, key_point in key_points:
+                key_point_embedding = next(embedding_iter)
+                
+                key_point_metadata = {
+                    'document_id': document_id,
+                    'content_type': 'key_point',
+                    'key_point_index': i,
+                    'document_type': doc.standardized_metadata.get('type'),
+                    'source': doc.standardized_metadata.get('source'),
+                    'title': doc.standardized_metadata.get('title', '')[:200],
+                    'quality_score': doc.quality_metrics.get('overall_quality', 0.5)
+                }
+                
+                key_point_vector_id = f"{document_id}_keypoint_{i}"
+                self.vector_db.add_vector(
+                    vector_id=key_point_vector_id,
+                    vector=key_point_embedding,
+                    metadata=key_point_metadata
+                )
+                vectors_created += 1
             
         except Exception as e:
             self.logger.error(f"Error creating vector embeddings: {e}")
@@ -862,7 +878,7 @@ class LegalDataIndexer:
                 filters['source'] = source
             
             # Search in vector database
-            results = self.vector_db.search_similar(
+            results = await self.async_vector_db.search_similar(
                 query_embedding,
                 filters=filters,
                 limit=limit * 2  # Get more results to filter
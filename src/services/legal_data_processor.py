@@ -7,9 +7,12 @@ from various legal data APIs into unified formats for GraphRAG integration.
 
 import asyncio
 import hashlib
+import multiprocessing
 import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional, Set, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple, AsyncIterator
 from dataclasses import dataclass
 import structlog
 from pydantic import BaseModel
@@ -23,9 +26,13 @@ import textdistance
 
 from .legal_data_apis import LegalCase, LegalDocument, DataSource
 from ..models.schemas import Case, Issue, ArgumentSegment
+from ..core.config import settings
 
 logger = structlog.get_logger()
 
+# spaCy input limit per document
+MAX_NLP_CHARS = 1000000
+
 
 @dataclass
 class ProcessingStats:
@@ -85,9 +92,17 @@ class ProcessedLegalDocument(BaseModel):
 class LegalDataProcessor:
     """Advanced legal data processor with NLP and standardization capabilities."""
     
-    def __init__(self):
-        """Initialize the legal data processor."""
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: Optional[int] = None):
+        """Initialize the legal data processor.
+        
+        Args:
+            max_workers: NLP worker processes; 0 processes in a thread of this process
+            chunk_size: Items sent to a worker at a time (and batched through ``nlp.pipe``)
+        """
         self.logger = logger
+        self.max_workers = settings.nlp_process_workers if max_workers is None else max_workers
+        self.chunk_size = max(1, chunk_size or settings.nlp_chunk_size)
+        self._pool: Optional[ProcessPoolExecutor] = None
         
         # Initialize NLP models
         self._init_nlp_models()
@@ -207,25 +222,32 @@ class LegalDataProcessor:
         Returns:
             List of processed documents
         """
-        start_time = datetime.now()
-        processed_docs = []
-        
-        for case in cases:
-            try:
-                processed_doc = await self._process_single_case(
-                    case, include_nlp, include_citations, include_concepts
-                )
-                processed_docs.append(processed_doc)
-                self.stats.documents_processed += 1
-                
-            except Exception as e:
-                self.logger.error(f"Error processing case {case.case_id}: {e}")
-        
-        # Update stats
-        processing_time = (datetime.now() - start_time).total_seconds() * 1000
-        self.stats.processing_time_ms += int(processing_time)
+        return await self._process_all(
+            "case", cases, (include_nlp, include_citations, include_concepts)
+        )
+    
+    async def stream_legal_cases(
+        self,
+        cases: List[LegalCase],
+        include_nlp: bool = True,
+        include_citations: bool = True,
+        include_concepts: bool = True
+    ) -> AsyncIterator[ProcessedLegalDocument]:
+        """
+        Process legal cases in parallel, yielding each as soon as it is done.
         
-        return processed_docs
+        Args:
+            cases: List of legal cases to process
+            include_nlp: Whether to perform NLP analysis
+            include_citations: Whether to extract citations
+            include_concepts: Whether to identify legal concepts
+            
+        Yields:
+            Processed documents in completion order
+        """
+        flags = (include_nlp, include_citations, include_concepts)
+        async for _, processed_doc in self._stream("case", cases, flags):
+            yield processed_doc
     
     async def process_legal_documents(
         self,
@@ -246,70 +268,244 @@ class LegalDataProcessor:
         Returns:
             List of processed documents
         """
+        return await self._process_all(
+            "document", documents, (include_nlp, include_citations, include_concepts)
+        )
+    
+    async def stream_legal_documents(
+        self,
+        documents: List[LegalDocument],
+        include_nlp: bool = True,
+        include_citations: bool = True,
+        include_concepts: bool = True
+    ) -> AsyncIterator[ProcessedLegalDocument]:
+        """
+        Process legal documents in parallel, yielding each as soon as it is done.
+        
+        Args:
+            documents: List of legal documents to process
+            include_nlp: Whether to perform NLP analysis
+            include_citations: Whether to extract citations
+            include_concepts: Whether to identify legal concepts
+            
+        Yields:
+            Processed documents in completion order
+        """
+        flags = (include_nlp, include_citations, include_concepts)
+        async for _, processed_doc in self._stream("document", documents, flags):
+            yield processed_doc
+    
+    async def _process_all(
+        self,
+        kind: str,
+        items: List[Any],
+        flags: Tuple[bool, bool, bool]
+    ) -> List[ProcessedLegalDocument]:
+        """Process every item and return the results in input order."""
         start_time = datetime.now()
-        processed_docs = []
         
-        for doc in documents:
-            try:
-                processed_doc = await self._process_single_document(
-                    doc, include_nlp, include_citations, include_concepts
-                )
-                processed_docs.append(processed_doc)
-                self.stats.documents_processed += 1
-                
-            except Exception as e:
-                self.logger.error(f"Error processing document {doc.doc_id}: {e}")
+        results = [(index, doc) async for index, doc in self._stream(kind, items, flags)]
+        results.sort(key=lambda r: r[0])
         
         # Update stats
         processing_time = (datetime.now() - start_time).total_seconds() * 1000
         self.stats.processing_time_ms += int(processing_time)
         
-        return processed_docs
+        return [doc for _, doc in results]
+    
+    async def _stream(
+        self,
+        kind: str,
+        items: List[Any],
+        flags: Tuple[bool, bool, bool]
+    ) -> AsyncIterator[Tuple[int, ProcessedLegalDocument]]:
+        """Process items in chunks off the event loop, yielding (index, document) as chunks finish.
+        
+        Args:
+            kind: "case" or "document"
+            items: Cases or documents
+            flags: (include_nlp, include_citations, include_concepts)
+            
+        Yields:
+            Input index and processed document
+        """
+        indexed = list(enumerate(items))
+        chunks = [indexed[i:i + self.chunk_size] for i in range(0, len(indexed), self.chunk_size)]
+        if not chunks:
+            return
+        
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        if pool is not None:
+            futures = {
+                loop.run_in_executor(pool, _run_worker_batch, kind, chunk, flags): chunk
+                for chunk in chunks
+            }
+        else:
+            futures = {
+                asyncio.ensure_future(asyncio.to_thread(self._process_batch, kind, chunk, flags)): chunk
+                for chunk in chunks
+            }
+        
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                retry = []
+                for future in done:
+                    try:
+                        batch = future.result()
+                    except BrokenProcessPool:
+                        retry.append(futures[future])
+                        continue
+                    for result in self._collect(kind, items, batch):
+                        yield result
+                
+                if retry:
+                    # A worker died; finish the unfinished chunks in this process
+                    self.logger.error("NLP worker pool failed, processing remaining items in-process")
+                    self._shutdown_pool()
+                    retry.extend(futures[future] for future in pending)
+                    for future in pending:
+                        future.cancel()
+                    pending = set()
+                    for chunk in retry:
+                        future = asyncio.ensure_future(asyncio.to_thread(self._process_batch, kind, chunk, flags))
+                        futures[future] = chunk
+                        pending.add(future)
+        finally:
+            for future in pending:
+                future.cancel()
+    
+    def _collect(
+        self,
+        kind: str,
+        items: List[Any],
+        batch: List[Tuple[int, Optional[ProcessedLegalDocument], Optional[str]]]
+    ) -> List[Tuple[int, ProcessedLegalDocument]]:
+        """Update stats from a finished batch and log its failures."""
+        results = []
+        for index, processed_doc, error in batch:
+            if processed_doc is None:
+                item = items[index]
+                if kind == "case":
+                    self.logger.error(f"Error processing case {item.case_id}: {error}")
+                else:
+                    self.logger.error(f"Error processing document {item.doc_id}: {error}")
+                continue
+            self.stats.documents_processed += 1
+            self.stats.entities_extracted += len(processed_doc.extracted_entities)
+            self.stats.citations_found += len(processed_doc.extracted_citations)
+            self.stats.legal_concepts_identified += len(processed_doc.identified_concepts)
+            results.append((index, processed_doc))
+        return results
+    
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Get the worker pool, starting it on first use; None when processing in-process."""
+        if self.max_workers <= 0:
+            return None
+        if self._pool is None:
+            # spawn: forking a process with a running event loop and threads is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+        return self._pool
     
-    async def _process_single_case(
+    def _shutdown_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+    
+    def close(self):
+        """Stop the NLP worker processes."""
+        self._shutdown_pool()
+    
+    def _process_batch(
+        self,
+        kind: str,
+        chunk: List[Tuple[int, Any]],
+        flags: Tuple[bool, bool, bool]
+    ) -> List[Tuple[int, Optional[ProcessedLegalDocument], Optional[str]]]:
+        """Process a chunk of cases or documents, running spaCy over them with ``nlp.pipe``.
+        
+        Args:
+            kind: "case" or "document"
+            chunk: (index, case or document) pairs
+            flags: (include_nlp, include_citations, include_concepts)
+            
+        Returns:
+            (index, processed document or None, error message or None) per item
+        """
+        include_nlp = flags[0]
+        texts = [self._extract_text_content(item.dict()) for _, item in chunk]
+        
+        spacy_docs = [None] * len(chunk)
+        if include_nlp and self.nlp:
+            try:
+                spacy_docs = list(self.nlp.pipe(
+                    (text[:MAX_NLP_CHARS] for text in texts), batch_size=self.chunk_size
+                ))
+            except Exception as e:
+                self.logger.error(f"Error extracting entities: {e}")
+        
+        process = self._process_single_case if kind == "case" else self._process_single_document
+        results = []
+        for (index, item), text, spacy_doc in zip(chunk, texts, spacy_docs):
+            try:
+                results.append((index, process(item, *flags, text_content=text, spacy_doc=spacy_doc), None))
+            except Exception as e:
+                results.append((index, None, str(e)))
+        return results
+    
+    def _process_single_case(
         self,
         case: LegalCase,
         include_nlp: bool,
         include_citations: bool,
-        include_concepts: bool
+        include_concepts: bool,
+        text_content: Optional[str] = None,
+        spacy_doc: Any = None
     ) -> ProcessedLegalDocument:
-        """Process a single legal case."""
+        """Process a single legal case (CPU-bound; runs in a worker)."""
         
         # Combine text content
-        text_content = self._extract_text_content(case.dict())
+        if text_content is None:
+            text_content = self._extract_text_content(case.dict())
         
         # Extract entities if NLP enabled
         entities = []
         if include_nlp and text_content:
-            entities = await self._extract_entities(text_content)
-            self.stats.entities_extracted += len(entities)
+            entities = self._extract_entities(text_content, spacy_doc)
         
         # Extract citations
         citations = []
         if include_citations and text_content:
-            citations = await self._extract_citations(text_content)
-            self.stats.citations_found += len(citations)
+            citations = self._extract_citations(text_content)
         
         # Identify legal concepts
         concepts = []
         if include_concepts and text_content:
-            concepts = await self._identify_legal_concepts(text_content)
-            self.stats.legal_concepts_identified += len(concepts)
+            concepts = self._identify_legal_concepts(text_content)
+        
+        # Tokenize sentences once for segments, summary, key points and metrics
+        sentences = self._tokenize_sentences(text_content)
         
         # Create text segments
-        segments = await self._create_text_segments(text_content)
+        segments = self._create_text_segments(text_content, sentences)
         
         # Generate summary
-        summary = await self._generate_summary(text_content, entities, concepts)
+        summary = self._generate_summary(text_content, entities, concepts, sentences)
         
         # Extract key points
-        key_points = await self._extract_key_points(text_content, entities, concepts)
+        key_points = self._extract_key_points(text_content, entities, concepts, sentences)
         
         # Calculate quality metrics
-        quality_metrics = await self._calculate_quality_metrics(text_content)
+        quality_metrics = self._calculate_quality_metrics(text_content, sentences)
         
         # Standardize metadata
-        standardized_metadata = await self._standardize_case_metadata(case)
+        standardized_metadata = self._standardize_case_metadata(case)
         
         return ProcessedLegalDocument(
             original_doc=case.dict(),
@@ -324,50 +520,53 @@ class LegalDataProcessor:
             processing_timestamp=datetime.now(timezone.utc)
         )
     
-    async def _process_single_document(
+    def _process_single_document(
         self,
         doc: LegalDocument,
         include_nlp: bool,
         include_citations: bool,
-        include_concepts: bool
+        include_concepts: bool,
+        text_content: Optional[str] = None,
+        spacy_doc: Any = None
     ) -> ProcessedLegalDocument:
-        """Process a single legal document."""
+        """Process a single legal document (CPU-bound; runs in a worker)."""
         
         # Extract text content
-        text_content = self._extract_text_content(doc.dict())
+        if text_content is None:
+            text_content = self._extract_text_content(doc.dict())
         
         # Extract entities if NLP enabled
         entities = []
         if include_nlp and text_content:
-            entities = await self._extract_entities(text_content)
-            self.stats.entities_extracted += len(entities)
+            entities = self._extract_entities(text_content, spacy_doc)
         
         # Extract citations
         citations = []
         if include_citations and text_content:
-            citations = await self._extract_citations(text_content)
-            self.stats.citations_found += len(citations)
+            citations = self._extract_citations(text_content)
         
         # Identify legal concepts
         concepts = []
         if include_concepts and text_content:
-            concepts = await self._identify_legal_concepts(text_content)
-            self.stats.legal_concepts_identified += len(concepts)
+            concepts = self._identify_legal_concepts(text_content)
+        
+        # Tokenize sentences once for segments, summary, key points and metrics
+        sentences = self._tokenize_sentences(text_content)
         
         # Create text segments
-        segments = await self._create_text_segments(text_content)
+        segments = self._create_text_segments(text_content, sentences)
         
         # Generate summary
-        summary = await self._generate_summary(text_content, entities, concepts)
+        summary = self._generate_summary(text_content, entities, concepts, sentences)
         
         # Extract key points
-        key_points = await self._extract_key_points(text_content, entities, concepts)
+        key_points = self._extract_key_points(text_content, entities, concepts, sentences)
         
         # Calculate quality metrics
-        quality_metrics = await self._calculate_quality_metrics(text_content)
+        quality_metrics = self._calculate_quality_metrics(text_content, sentences)
         
         # Standardize metadata
-        standardized_metadata = await self._standardize_document_metadata(doc)
+        standardized_metadata = self._standardize_document_metadata(doc)
         
         return ProcessedLegalDocument(
             original_doc=doc.dict(),
@@ -401,15 +600,16 @@ class LegalDataProcessor:
         
         return ' '.join(text_parts)
     
-    async def _extract_entities(self, text: str) -> List[LegalEntity]:
-        """Extract legal entities from text using NLP."""
+    def _extract_entities(self, text: str, doc: Any = None) -> List[LegalEntity]:
+        """Extract legal entities from text using NLP, reusing a parsed spaCy doc if given."""
         entities = []
         
         if not self.nlp or not text:
             return entities
         
         try:
-            doc = self.nlp(text[:1000000])  # Limit text length
+            if doc is None:
+                doc = self.nlp(text[:MAX_NLP_CHARS])  # Limit text length
             
             for ent in doc.ents:
                 # Map spaCy entity types to legal entity types
@@ -426,7 +626,7 @@ class LegalDataProcessor:
                 entities.append(entity)
             
             # Also extract court names and case names using patterns
-            court_entities = await self._extract_court_entities(text)
+            court_entities = self._extract_court_entities(text)
             entities.extend(court_entities)
             
         except Exception as e:
@@ -447,7 +647,7 @@ class LegalDataProcessor:
         }
         return mapping.get(spacy_label, 'OTHER')
     
-    async def _extract_court_entities(self, text: str) -> List[LegalEntity]:
+    def _extract_court_entities(self, text: str) -> List[LegalEntity]:
         """Extract court names using patterns."""
         entities = []
         
@@ -475,7 +675,7 @@ class LegalDataProcessor:
         
         return entities
     
-    async def _extract_citations(self, text: str) -> List[LegalCitation]:
+    def _extract_citations(self, text: str) -> List[LegalCitation]:
         """Extract legal citations from text."""
         citations = []
         
@@ -539,7 +739,7 @@ class LegalDataProcessor:
         normalized = re.sub(r'\s+', ' ', citation.strip())
         return normalized
     
-    async def _identify_legal_concepts(self, text: str) -> List[LegalConcept]:
+    def _identify_legal_concepts(self, text: str) -> List[LegalConcept]:
         """Identify legal concepts in text."""
         concepts = []
         text_lower = text.lower()
@@ -592,14 +792,24 @@ class LegalDataProcessor:
         
         return 'general'
     
-    async def _create_text_segments(self, text: str) -> List[str]:
+    def _tokenize_sentences(self, text: str) -> Optional[List[str]]:
+        """Split text into sentences, or None if tokenization fails (callers then fall back)."""
+        if not text:
+            return []
+        try:
+            return sent_tokenize(text)
+        except Exception:
+            return None
+    
+    def _create_text_segments(self, text: str, sentences: Optional[List[str]] = None) -> List[str]:
         """Create meaningful text segments."""
         if not text:
             return []
         
         try:
             # Split into sentences
-            sentences = sent_tokenize(text)
+            if sentences is None:
+                sentences = sent_tokenize(text)
             
             # Group sentences into paragraphs/segments
             segments = []
@@ -625,11 +835,12 @@ class LegalDataProcessor:
             # Fallback: split by double newlines or periods
             return [seg.strip() for seg in re.split(r'\n\n|\.{2,}', text) if seg.strip()]
     
-    async def _generate_summary(
+    def _generate_summary(
         self,
         text: str,
         entities: List[LegalEntity],
-        concepts: List[LegalConcept]
+        concepts: List[LegalConcept],
+        sentences: Optional[List[str]] = None
     ) -> Optional[str]:
         """Generate a summary of the document."""
         if not text:
@@ -637,7 +848,9 @@ class LegalDataProcessor:
         
         try:
             # Simple extractive summary using first few sentences and key concepts
-            sentences = sent_tokenize(text)[:3]  # First 3 sentences
+            if sentences is None:
+                sentences = sent_tokenize(text)
+            sentences = sentences[:3]  # First 3 sentences
             
             # Add key legal concepts
             key_concepts = [c.concept for c in concepts[:5]]  # Top 5 concepts
@@ -652,11 +865,12 @@ class LegalDataProcessor:
             self.logger.error(f"Error generating summary: {e}")
             return text[:500] + "..." if len(text) > 500 else text
     
-    async def _extract_key_points(
+    def _extract_key_points(
         self,
         text: str,
         entities: List[LegalEntity],
-        concepts: List[LegalConcept]
+        concepts: List[LegalConcept],
+        sentences: Optional[List[str]] = None
     ) -> List[str]:
         """Extract key points from the document."""
         key_points = []
@@ -666,7 +880,8 @@ class LegalDataProcessor:
         
         try:
             # Extract sentences with legal significance indicators
-            sentences = sent_tokenize(text)
+            if sentences is None:
+                sentences = sent_tokenize(text)
             
             significance_indicators = [
                 'held that', 'ruled that', 'concluded that', 'found that',
@@ -689,7 +904,7 @@ class LegalDataProcessor:
             self.logger.error(f"Error extracting key points: {e}")
             return []
     
-    async def _calculate_quality_metrics(self, text: str) -> Dict[str, float]:
+    def _calculate_quality_metrics(self, text: str, sentences: Optional[List[str]] = None) -> Dict[str, float]:
         """Calculate quality metrics for the document."""
         metrics = {}
         
@@ -698,8 +913,9 @@ class LegalDataProcessor:
         
         try:
             # Basic text statistics
-            word_count = len(word_tokenize(text))
-            sentence_count = len(sent_tokenize(text))
+            tokens = word_tokenize(text)
+            word_count = len(tokens)
+            sentence_count = len(sentences if sentences is not None else sent_tokenize(text))
             
             metrics['word_count'] = float(word_count)
             metrics['sentence_count'] = float(sentence_count)
@@ -715,7 +931,7 @@ class LegalDataProcessor:
             
             # Legal content density (percentage of legal terms)
             legal_term_count = 0
-            words = [word.lower() for word in word_tokenize(text)]
+            words = [word.lower() for word in tokens]
             
             all_legal_terms = []
             for category_terms in self.legal_concepts.values():
@@ -743,7 +959,7 @@ class LegalDataProcessor:
         
         return metrics
     
-    async def _standardize_case_metadata(self, case: LegalCase) -> Dict[str, Any]:
+    def _standardize_case_metadata(self, case: LegalCase) -> Dict[str, Any]:
         """Standardize case metadata."""
         metadata = {
             'id': case.case_id,
@@ -767,7 +983,7 @@ class LegalDataProcessor:
         
         return {k: v for k, v in metadata.items() if v is not None}
     
-    async def _standardize_document_metadata(self, doc: LegalDocument) -> Dict[str, Any]:
+    def _standardize_document_metadata(self, doc: LegalDocument) -> Dict[str, Any]:
         """Standardize document metadata."""
         metadata = {
             'id': doc.doc_id,
@@ -803,6 +1019,25 @@ class LegalDataProcessor:
         )
 
 
+# Per-process processor used by NLP workers; spaCy is loaded once per worker
+_worker_processor: Optional[LegalDataProcessor] = None
+
+
+def _init_worker():
+    """Load NLP models in a worker process."""
+    global _worker_processor
+    _worker_processor = LegalDataProcessor(max_workers=0)
+
+
+def _run_worker_batch(
+    kind: str,
+    chunk: List[Tuple[int, Any]],
+    flags: Tuple[bool, bool, bool]
+) -> List[Tuple[int, Optional[ProcessedLegalDocument], Optional[str]]]:
+    """Process a chunk in a worker process."""
+    return _worker_processor._process_batch(kind, chunk, flags)
+
+
 # Utility functions for data quality assessment
 class DataQualityAssessor:
     """Assess quality of processed legal data."""
@@ -890,6 +1125,8 @@ async def test_processor():
         print(f"Citations found: {len(doc.extracted_citations)}")
         print(f"Concepts identified: {len(doc.identified_concepts)}")
         print(f"Quality score: {doc.quality_metrics.get('overall_quality', 0):.2f}")
+    
+    processor.close()
 
 
 if __name__ == "__main__":
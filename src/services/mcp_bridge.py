@@ -8,23 +8,354 @@ managing subprocess communication using the MCP (Model Context Protocol).
 import asyncio
 import json
 import logging
-import subprocess
 import uuid
-import os
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional, List, Set
 from datetime import datetime
 from pathlib import Path
 
+from ..core.config import settings
+
 logger = logging.getLogger(__name__)
 
+# Largest JSON-RPC message line read from a server (tool results can be large)
+STREAM_LIMIT = 16 * 1024 * 1024
+
+
+class MCPServerConnection:
+    """One stdio MCP server process with a multiplexed JSON-RPC transport.
+    
+    Requests are written to stdin as they are made and a reader task matches
+    each response line on stdout to its request by JSON-RPC ``id``, so many
+    requests can be in flight on one process at a time.
+    """
+    
+    def __init__(self, server_type: str, server_path: Path, request_timeout: float = 30.0,
+                 on_exit: Optional[Callable[["MCPServerConnection"], None]] = None):
+        self.server_type = server_type
+        self.server_path = server_path
+        self.request_timeout = request_timeout
+        self.on_exit = on_exit  # Called when the process stops answering
+        
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._reader_task: Optional[asyncio.Task] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+        
+        self.requests_served = 0
+        self.consecutive_failures = 0
+    
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process else None
+    
+    @property
+    def in_flight(self) -> int:
+        """Requests waiting for a response."""
+        return len(self._pending)
+    
+    @property
+    def alive(self) -> bool:
+        return (self.process is not None and self.process.returncode is None
+                and self._reader_task is not None and not self._reader_task.done())
+    
+    async def start(self) -> None:
+        """Start the server process and perform the MCP initialize handshake."""
+        self.process = await asyncio.create_subprocess_exec(
+            "python", str(self.server_path),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self.server_path.parent,
+            limit=STREAM_LIMIT
+        )
+        self._reader_task = asyncio.create_task(self._read_responses())
+        self._stderr_task = asyncio.create_task(self._drain_stderr())
+        
+        response = await self.request("initialize", {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {
+                "roots": {"listChanged": True},
+                "sampling": {}
+            },
+            "clientInfo": {
+                "name": "legal-agentic-system",
+                "version": "1.0.0"
+            }
+        })
+        if "error" in response:
+            raise RuntimeError(f"initialize failed: {response['error']}")
+        await self.notify("notifications/initialized")
+    
+    async def request(self, method: str, params: Dict[str, Any],
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Send a JSON-RPC request and wait for its response.
+        
+        Raises:
+            asyncio.TimeoutError: If no response arrives in time
+            ConnectionError: If the server process exits
+        """
+        if not self.alive:
+            raise ConnectionError(f"{self.server_type} server is not running")
+        
+        request_id = str(uuid.uuid4())
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self._write({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+            response = await asyncio.wait_for(future, timeout=timeout or self.request_timeout)
+        except asyncio.TimeoutError:
+            self.consecutive_failures += 1
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+        
+        self.consecutive_failures = 0
+        self.requests_served += 1
+        return response
+    
+    async def notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """Send a JSON-RPC notification (no response)."""
+        await self._write({"jsonrpc": "2.0", "method": method, "params": params or {}})
+    
+    async def _write(self, message: Dict[str, Any]) -> None:
+        data = (json.dumps(message) + "\n").encode()
+        # Keep concurrent writers from interleaving lines when the pipe is full
+        async with self._write_lock:
+            self.process.stdin.write(data)
+            await self.process.stdin.drain()
+    
+    async def _read_responses(self) -> None:
+        """Resolve pending requests from response lines until stdout closes."""
+        try:
+            while True:
+                line = await self.process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.debug(f"Ignoring non-JSON output from {self.server_type}: {line[:200]!r}")
+                    continue
+                if not isinstance(message, dict):
+                    continue
+                
+                future = self._pending.get(str(message.get("id")))
+                if future is None:
+                    # Notification or server-initiated request
+                    continue
+                if not future.done():
+                    future.set_result(message)
+        except Exception as e:
+            logger.error(f"Error reading from {self.server_type} server: {e}")
+        finally:
+            error = ConnectionError(f"{self.server_type} server closed its output")
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            if self.on_exit is not None:
+                self.on_exit(self)
+    
+    async def _drain_stderr(self) -> None:
+        # An unread stderr pipe fills up and blocks the server
+        while True:
+            line = await self.process.stderr.readline()
+            if not line:
+                break
+            logger.debug(f"[{self.server_type}:{self.pid}] {line.decode(errors='replace').rstrip()}")
+    
+    async def close(self, timeout: float = 5.0) -> None:
+        """Close stdin and wait for the process to exit, killing it after ``timeout``."""
+        if self.process is None:
+            return
+        if self.process.returncode is None:
+            try:
+                self.process.stdin.close()
+                await asyncio.wait_for(self.process.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+                logger.warning(f"Force killed {self.server_type} server {self.pid}")
+            except Exception as e:
+                logger.error(f"Error closing {self.server_type} server {self.pid}: {e}")
+        for task in (self._reader_task, self._stderr_task):
+            if task is not None:
+                task.cancel()
+
+
+class MCPServerPool:
+    """Pool of processes for one MCP server type.
+    
+    Requests go to the live process with the fewest in-flight requests.
+    Requests with an affinity key (for example a session ID whose state lives
+    in one server process) always go to the process that served the key
+    first; the most recently used ``max_sessions`` keys are kept. Processes
+    that exit (even between requests) or keep timing out are replaced, and a
+    process is started on demand if none is alive.
+    """
+    
+    def __init__(self, server_type: str, server_path: Path, size: int = 2,
+                 request_timeout: float = 30.0, max_failures: int = 3,
+                 max_sessions: int = 10000):
+        self.server_type = server_type
+        self.server_path = server_path
+        self.size = max(1, size)
+        self.request_timeout = request_timeout
+        self.max_failures = max_failures
+        self.max_sessions = max_sessions
+        
+        self.connections: List[MCPServerConnection] = []
+        self._affinity: "OrderedDict[str, MCPServerConnection]" = OrderedDict()
+        self._recycling: Set[asyncio.Task] = set()
+        self._start_lock = asyncio.Lock()
+        self._closing = False
+        self.recycled = 0
+    
+    async def start(self) -> None:
+        """Start the pool's processes; raises if none of them start."""
+        results = await asyncio.gather(
+            *(self._start_connection() for _ in range(self.size - len(self.connections))),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Failed to start {self.server_type} server: {result}")
+        if not self.connections:
+            raise RuntimeError(f"No {self.server_type} server process could be started")
+    
+    async def _start_connection(self) -> MCPServerConnection:
+        connection = MCPServerConnection(self.server_type, self.server_path, self.request_timeout,
+                                         on_exit=self._recycle)
+        try:
+            await connection.start()
+        except BaseException:
+            connection.on_exit = None
+            await connection.close(timeout=1.0)
+            raise
+        self.connections.append(connection)
+        return connection
+    
+    def _select(self, affinity_key: Optional[str]) -> Optional[MCPServerConnection]:
+        if affinity_key is not None:
+            connection = self._affinity.get(affinity_key)
+            if connection is not None and connection.alive:
+                self._affinity.move_to_end(affinity_key)
+                return connection
+        
+        live = [c for c in self.connections if c.alive]
+        if not live:
+            return None
+        connection = min(live, key=lambda c: c.in_flight)
+        if affinity_key is not None:
+            self._affinity[affinity_key] = connection
+            self._affinity.move_to_end(affinity_key)
+            while len(self._affinity) > self.max_sessions:
+                self._affinity.popitem(last=False)
+        return connection
+    
+    async def _acquire(self, affinity_key: Optional[str]) -> MCPServerConnection:
+        """Select a process, starting one if none is alive."""
+        connection = self._select(affinity_key)
+        if connection is not None:
+            return connection
+        async with self._start_lock:
+            # A replacement may have come up while we waited
+            connection = self._select(affinity_key)
+            if connection is None:
+                logger.warning(f"No live {self.server_type} server process, starting one")
+                await self._start_connection()
+                connection = self._select(affinity_key)
+        if connection is None:
+            raise ConnectionError(f"No live {self.server_type} server process")
+        return connection
+    
+    async def request(self, method: str, params: Dict[str, Any],
+                      affinity_key: Optional[str] = None) -> Dict[str, Any]:
+        """Send a request to the least-loaded (or affine) process.
+
+        A request whose process exits before answering is retried once on
+        another process; the exited process lost its state anyway.
+        """
+        for attempt in range(2):
+            connection = await self._acquire(affinity_key)
+            try:
+                return await connection.request(method, params)
+            except ConnectionError:
+                if attempt:
+                    raise
+                logger.warning(f"{self.server_type} server {connection.pid} exited, retrying {method}")
+            finally:
+                if not connection.alive or connection.consecutive_failures >= self.max_failures:
+                    self._recycle(connection)
+    
+    def _recycle(self, connection: MCPServerConnection) -> None:
+        """Replace an unhealthy process in the background."""
+        if self._closing or connection not in self.connections:
+            return
+        self.connections.remove(connection)
+        for key in [k for k, c in self._affinity.items() if c is connection]:
+            del self._affinity[key]
+        self.recycled += 1
+        logger.warning(
+            f"Recycling {self.server_type} server {connection.pid} "
+            f"(alive={connection.alive}, failures={connection.consecutive_failures})"
+        )
+        
+        async def replace():
+            connection.on_exit = None
+            await connection.close(timeout=1.0)
+            try:
+                async with self._start_lock:
+                    if len(self.connections) < self.size:
+                        await self._start_connection()
+            except Exception as e:
+                logger.error(f"Failed to restart {self.server_type} server: {e}")
+        
+        task = asyncio.create_task(replace())
+        self._recycling.add(task)
+        task.add_done_callback(self._recycling.discard)
+    
+    def forget(self, affinity_key: str) -> None:
+        """Drop an affinity key (e.g. when its session ends)."""
+        self._affinity.pop(affinity_key, None)
+    
+    async def close(self) -> None:
+        self._closing = True
+        for task in list(self._recycling):
+            task.cancel()
+        await asyncio.gather(*(c.close() for c in self.connections), return_exceptions=True)
+        self.connections = []
+        self._affinity.clear()
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "processes": [
+                {
+                    "pid": c.pid,
+                    "alive": c.alive,
+                    "in_flight": c.in_flight,
+                    "requests_served": c.requests_served
+                }
+                for c in self.connections
+            ],
+            "in_flight": sum(c.in_flight for c in self.connections),
+            "sessions": len(self._affinity),
+            "recycled": self.recycled
+        }
+
 
 class MCPBridgeService:
     """Bridge service for communicating with stdio-based MCP servers."""
     
-    def __init__(self):
-        self.processes: Dict[str, subprocess.Popen] = {}
+    def __init__(self, pool_size: Optional[int] = None, request_timeout: Optional[float] = None):
+        self.pools: Dict[str, MCPServerPool] = {}
         self.sessions: Dict[str, Dict[str, Any]] = {}
         self.base_path = Path(__file__).parent.parent.parent  # Project root
+        self.pool_size = pool_size or settings.mcp_bridge_pool_size
+        self.request_timeout = request_timeout or settings.mcp_bridge_request_timeout
+        self._init_locks: Dict[str, asyncio.Lock] = {}
         
         # MCP server configurations
         self.server_configs = {
@@ -41,7 +372,7 @@ class MCPBridgeService:
         }
     
     async def initialize_server(self, server_type: str) -> bool:
-        """Initialize and start an MCP server process."""
+        """Initialize and start the process pool of an MCP server."""
         if server_type not in self.server_configs:
             logger.error(f"Unknown server type: {server_type}")
             return False
@@ -52,72 +383,47 @@ class MCPBridgeService:
         if not server_path.exists():
             logger.error(f"MCP server not found: {server_path}")
             return False
+        
+        lock = self._init_locks.setdefault(server_type, asyncio.Lock())
+        async with lock:
+            # Another caller may have started it while we waited
+            if server_type in self.pools:
+                return True
             
-        try:
-            # Start MCP server process with stdio pipes
-            process = subprocess.Popen(
-                ["python", str(server_path)],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                cwd=server_path.parent
+            pool = MCPServerPool(
+                server_type,
+                server_path,
+                size=self.pool_size,
+                request_timeout=self.request_timeout,
+                max_failures=settings.mcp_bridge_max_failures,
+                max_sessions=settings.mcp_bridge_max_sessions
             )
+            try:
+                await pool.start()
+            except Exception as e:
+                logger.error(f"Failed to initialize {server_type}: {str(e)}")
+                await pool.close()
+                return False
             
-            self.processes[server_type] = process
-            
-            # Send initialization request
-            init_request = {
-                "jsonrpc": "2.0",
-                "id": str(uuid.uuid4()),
-                "method": "initialize",
-                "params": {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {
-                        "roots": {"listChanged": True},
-                        "sampling": {}
-                    },
-                    "clientInfo": {
-                        "name": "legal-agentic-system",
-                        "version": "1.0.0"
-                    }
-                }
-            }
-            
-            await self._send_request(server_type, init_request)
-            logger.info(f"Successfully initialized {config['name']} server")
+            self.pools[server_type] = pool
+            logger.info(f"Successfully initialized {config['name']} server ({len(pool.connections)} processes)")
             return True
-            
-        except Exception as e:
-            logger.error(f"Failed to initialize {server_type}: {str(e)}")
-            return False
     
-    async def _send_request(self, server_type: str, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Send a JSON-RPC request to an MCP server."""
-        process = self.processes.get(server_type)
-        if not process:
+    async def _send_request(
+        self,
+        server_type: str,
+        method: str,
+        params: Dict[str, Any],
+        affinity_key: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Send a JSON-RPC request to an MCP server pool."""
+        pool = self.pools.get(server_type)
+        if not pool:
             logger.error(f"No process found for server type: {server_type}")
             return None
             
         try:
-            # Send request
-            request_json = json.dumps(request) + "\n"
-            process.stdin.write(request_json)
-            process.stdin.flush()
-            
-            # Read response with timeout
-            response_line = await asyncio.wait_for(
-                asyncio.get_event_loop().run_in_executor(
-                    None, process.stdout.readline
-                ),
-                timeout=30.0
-            )
-            
-            if not response_line:
-                logger.error(f"Empty response from {server_type}")
-                return None
-                
-            response = json.loads(response_line.strip())
+            response = await pool.request(method, params, affinity_key=affinity_key)
             
             if "error" in response:
                 logger.error(f"MCP Error from {server_type}: {response['error']}")
@@ -127,32 +433,36 @@ class MCPBridgeService:
         except asyncio.TimeoutError:
             logger.error(f"Timeout waiting for response from {server_type}")
             return None
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON response from {server_type}: {e}")
-            return None
         except Exception as e:
             logger.error(f"Error communicating with {server_type}: {e}")
             return None
     
-    async def call_tool(self, server_type: str, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        """Call a specific tool on an MCP server."""
+    async def call_tool(
+        self,
+        server_type: str,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        affinity_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Call a specific tool on an MCP server.
+        
+        Calls sharing an ``affinity_key`` are served by the same server process.
+        """
         # Ensure server is initialized
-        if server_type not in self.processes:
+        if server_type not in self.pools:
             success = await self.initialize_server(server_type)
             if not success:
                 return {"error": f"Failed to initialize {server_type} server"}
         
-        request = {
-            "jsonrpc": "2.0",
-            "id": str(uuid.uuid4()),
-            "method": "tools/call",
-            "params": {
+        response = await self._send_request(
+            server_type,
+            "tools/call",
+            {
                 "name": tool_name,
                 "arguments": arguments
-            }
-        }
-        
-        response = await self._send_request(server_type, request)
+            },
+            affinity_key=affinity_key
+        )
         
         if not response:
             return {"error": "No response from MCP server"}
@@ -164,19 +474,12 @@ class MCPBridgeService:
     
     async def list_tools(self, server_type: str) -> List[Dict[str, Any]]:
         """List available tools on an MCP server."""
-        if server_type not in self.processes:
+        if server_type not in self.pools:
             success = await self.initialize_server(server_type)
             if not success:
                 return []
         
-        request = {
-            "jsonrpc": "2.0", 
-            "id": str(uuid.uuid4()),
-            "method": "tools/list",
-            "params": {}
-        }
-        
-        response = await self._send_request(server_type, request)
+        response = await self._send_request(server_type, "tools/list", {})
         
         if not response or "error" in response:
             return []
@@ -192,7 +495,8 @@ class MCPBridgeService:
             result = await self.call_tool(
                 "case_extractor",
                 "start_chatbox_extraction",
-                {"session_id": session_id}
+                {"session_id": session_id},
+                affinity_key=session_id
             )
             
             if "error" not in result:
@@ -208,6 +512,12 @@ class MCPBridgeService:
             logger.error(f"Error starting chatbox extraction: {e}")
             return {"error": str(e)}
     
+    def end_session(self, session_id: str) -> None:
+        """Forget a chatbox session and its server process affinity."""
+        self.sessions.pop(session_id, None)
+        for pool in self.pools.values():
+            pool.forget(session_id)
+    
     async def chatbox_respond(self, session_id: str, user_input: str) -> Dict[str, Any]:
         """Send user input to chatbox extraction session."""
         try:
@@ -217,7 +527,8 @@ class MCPBridgeService:
                 {
                     "session_id": session_id,
                     "user_input": user_input
-                }
+                },
+                affinity_key=session_id
             )
             
             return result
@@ -268,14 +579,16 @@ class MCPBridgeService:
         status = {}
         
         for server_type, config in self.server_configs.items():
-            process = self.processes.get(server_type)
+            pool = self.pools.get(server_type)
             
-            if process and process.poll() is None:
-                # Process is running
+            if pool and any(c.alive for c in pool.connections):
+                # Processes are running
+                pool_status = pool.get_status()
                 status[server_type] = {
                     "name": config["name"],
                     "status": "running",
-                    "pid": process.pid
+                    "pid": pool_status["processes"][0]["pid"],
+                    **pool_status
                 }
             elif config["path"].exists():
                 # Server available but not running
@@ -296,46 +609,23 @@ class MCPBridgeService:
     
     async def shutdown_server(self, server_type: str) -> bool:
         """Shutdown a specific MCP server."""
-        process = self.processes.get(server_type)
-        if not process:
+        pool = self.pools.pop(server_type, None)
+        if not pool:
             return True
             
         try:
-            # Send shutdown request
-            shutdown_request = {
-                "jsonrpc": "2.0",
-                "id": str(uuid.uuid4()),
-                "method": "notifications/shutdown",
-                "params": {}
-            }
-            
-            await self._send_request(server_type, shutdown_request)
-            
-            # Wait for process to terminate
-            await asyncio.wait_for(
-                asyncio.get_event_loop().run_in_executor(None, process.wait),
-                timeout=5.0
-            )
-            
-            del self.processes[server_type]
+            await pool.close()
             logger.info(f"Successfully shutdown {server_type} server")
             return True
-            
-        except asyncio.TimeoutError:
-            # Force kill if timeout
-            process.kill()
-            del self.processes[server_type]
-            logger.warning(f"Force killed {server_type} server")
-            return True
         except Exception as e:
             logger.error(f"Error shutting down {server_type}: {e}")
             return False
     
     async def shutdown_all(self):
         """Shutdown all MCP servers."""
-        for server_type in list(self.processes.keys()):
+        for server_type in list(self.pools.keys()):
             await self.shutdown_server(server_type)
 
 
 # Global bridge service instance
-mcp_bridge = MCPBridgeService()
\ No newline at end of file
+mcp_bridge = MCPBridgeService()
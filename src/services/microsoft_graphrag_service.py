@@ -1,6 +1,5 @@
 """Microsoft GraphRAG integration service for legal document retrieval."""
 
-import os
 import asyncio
 from typing import List, Dict, Any, Optional
 import structlog
@@ -10,10 +9,6 @@ from datetime import datetime, timedelta
 import hashlib
 import random
 
-# Import GraphRAG components
-import subprocess
-import json
-
 from ..models.schemas import (
     ArgumentBundle,
     RetrievalRequest, 
@@ -25,6 +20,11 @@ from ..models.schemas import (
     Issue,
 )
 from .enhanced_mock_data import get_generator
+from .graphrag_query_engine import (
+    DEFAULT_GRAPHRAG_DATA_DIR,
+    GraphRAGSearchResult,
+    get_graphrag_query_engine,
+)
 
 logger = structlog.get_logger()
 
@@ -40,8 +40,7 @@ class MicrosoftGraphRAGService:
         """
         if graphrag_data_dir is None:
             # Default to graphrag_data directory in project root
-            project_root = Path(__file__).parent.parent.parent
-            graphrag_data_dir = os.path.join(project_root, "graphrag_data")
+            graphrag_data_dir = DEFAULT_GRAPHRAG_DATA_DIR
             
         self.graphrag_data_dir = Path(graphrag_data_dir)
         self.output_dir = self.graphrag_data_dir / "output"
@@ -50,6 +49,9 @@ class MicrosoftGraphRAGService:
         if not self.output_dir.exists():
             raise ValueError(f"GraphRAG output directory not found: {self.output_dir}")
         
+        # Resident engine: index artifacts are loaded once and shared across queries
+        self.query_engine = get_graphrag_query_engine(str(self.graphrag_data_dir))
+        
         logger.info(f"Initialized Microsoft GraphRAG service with data dir: {self.graphrag_data_dir}")
     
     async def retrieve_past_defenses(
@@ -70,8 +72,10 @@ class MicrosoftGraphRAGService:
             logger.info(f"GraphRAG query: {request.issue_text[:100]}...")
             
             # Use both local and global search for comprehensive results
-            local_results = await self._local_search(request.issue_text)
-            global_results = await self._global_search(request.issue_text)
+            local_results, global_results = await asyncio.gather(
+                self._local_search(request.issue_text),
+                self._global_search(request.issue_text),
+            )
             
             # Convert GraphRAG results to our data model
             bundles = self._convert_to_argument_bundles(
@@ -93,7 +97,8 @@ class MicrosoftGraphRAGService:
                 total_count=len(limited_bundles),
                 query_time_ms=query_time_ms,
                 graph_explanations=explanations,
-                metrics=None  # Could add GraphRAG-specific metrics here
+                metrics=None,  # Could add GraphRAG-specific metrics here
+                source="microsoft_graphrag" if local_results or global_results else "mock",
             )
             
         except Exception as e:
@@ -102,147 +107,71 @@ class MicrosoftGraphRAGService:
             # Fallback to mock data for demo purposes
             return await self._fallback_mock_response(request, start_time)
     
-    async def _local_search(self, query: str) -> str:
-        """Perform GraphRAG local search using CLI.
+    async def warm(self) -> bool:
+        """Load the GraphRAG index ahead of the first query.
+        
+        Returns:
+            True if the index is loaded
+        """
+        return await self.query_engine.warm()
+    
+    async def _local_search(self, query: str) -> Optional[GraphRAGSearchResult]:
+        """Perform GraphRAG local search in-process.
         
         Args:
             query: Search query
             
         Returns:
-            Search response text
+            Search result, or None if the search failed or returned nothing
         """
         try:
-            # Execute GraphRAG local search via CLI
-            # Note: Using python -m graphrag instead of just graphrag for better compatibility
-            cmd = ["/usr/local/bin/python", "-m", "graphrag", "query", "--method", "local", "--query", query]
-            
-            logger.info(f"Executing GraphRAG local search: {' '.join(cmd[:5])}...")
-            
-            result = subprocess.run(
-                cmd,
-                cwd=self.graphrag_data_dir,
-                capture_output=True,
-                text=True,
-                timeout=7,  # Quick timeout for fast fallback
-                env={**os.environ, "PYTHONWARNINGS": "ignore"}  # Suppress warnings
+            result = await self.query_engine.local_search(query)
+            if result is None or not result.response.strip():
+                logger.warning("GraphRAG local search returned empty response")
+                return None
+            logger.info(
+                f"GraphRAG local search successful, response length: {len(result.response)}, "
+                f"{result.duration_ms}ms"
             )
-            
-            if result.returncode == 0:
-                # Parse the output to extract the response text
-                output_lines = result.stdout.split('\n')
-                # Find the response after the log lines
-                response_started = False
-                response_lines = []
-                
-                for line in output_lines:
-                    # GraphRAG 2.5.0 outputs the response after this line
-                    if 'Local Search Response:' in line or 'graphrag.cli.query - Local Search Response:' in line:
-                        response_started = True
-                        continue
-                    if response_started:
-                        # Stop at the next log line (if any)
-                        if line.startswith('2025-') or line.startswith('2024-'):
-                            break
-                        response_lines.append(line)
-                
-                response = '\n'.join(response_lines).strip()
-                if response:
-                    logger.info(f"GraphRAG local search successful, response length: {len(response)}")
-                    return response
-                else:
-                    logger.warning("GraphRAG local search returned empty response")
-                    return ""
-            else:
-                logger.error(f"GraphRAG local search failed with code {result.returncode}")
-                logger.error(f"stderr: {result.stderr[:500]}")  # Log first 500 chars of error
-                return ""
-                
-        except subprocess.TimeoutExpired:
-            logger.warning("GraphRAG local search timed out after 7 seconds, will fallback to Neo4j/Mock")
-            return ""
-        except FileNotFoundError:
-            logger.error("GraphRAG command not found. Please ensure graphrag is installed: pip install graphrag")
-            return ""
+            return result
         except Exception as e:
             logger.error(f"Local search error: {type(e).__name__}: {e}")
-            return ""
+            return None
     
-    async def _global_search(self, query: str) -> str:
-        """Perform GraphRAG global search using CLI.
+    async def _global_search(self, query: str) -> Optional[GraphRAGSearchResult]:
+        """Perform GraphRAG global search in-process.
         
         Args:
             query: Search query
             
         Returns:
-            Search response text
+            Search result, or None if the search failed or returned nothing
         """
         try:
-            # Execute GraphRAG global search via CLI
-            # Note: Using python -m graphrag instead of just graphrag for better compatibility
-            cmd = ["/usr/local/bin/python", "-m", "graphrag", "query", "--method", "global", "--query", query]
-            
-            logger.info(f"Executing GraphRAG global search: {' '.join(cmd[:5])}...")
-            
-            result = subprocess.run(
-                cmd,
-                cwd=self.graphrag_data_dir,
-                capture_output=True,
-                text=True,
-                timeout=7,  # Quick timeout for fast fallback
-                env={**os.environ, "PYTHONWARNINGS": "ignore"}  # Suppress warnings
+            result = await self.query_engine.global_search(query)
+            if result is None or not result.response.strip():
+                logger.warning("GraphRAG global search returned empty response")
+                return None
+            logger.info(
+                f"GraphRAG global search successful, response length: {len(result.response)}, "
+                f"{result.duration_ms}ms"
             )
-            
-            if result.returncode == 0:
-                # Parse the output to extract the response text
-                output_lines = result.stdout.split('\n')
-                # Find the response after the log lines
-                response_started = False
-                response_lines = []
-                
-                for line in output_lines:
-                    # GraphRAG 2.5.0 outputs the response after this line
-                    if 'Global Search Response:' in line or 'graphrag.cli.query - Global Search Response:' in line:
-                        response_started = True
-                        continue
-                    if response_started:
-                        # Stop at the next log line (if any)
-                        if line.startswith('2025-') or line.startswith('2024-'):
-                            break
-                        response_lines.append(line)
-                
-                response = '\n'.join(response_lines).strip()
-                if response:
-                    logger.info(f"GraphRAG global search successful, response length: {len(response)}")
-                    return response
-                else:
-                    logger.warning("GraphRAG global search returned empty response")
-                    return ""
-            else:
-                logger.error(f"GraphRAG global search failed with code {result.returncode}")
-                logger.error(f"stderr: {result.stderr[:500]}")  # Log first 500 chars of error
-                return ""
-                
-        except subprocess.TimeoutExpired:
-            logger.warning("GraphRAG global search timed out after 7 seconds, will fallback to Neo4j/Mock")
-            return ""
-        except FileNotFoundError:
-            logger.error("GraphRAG command not found. Please ensure graphrag is installed: pip install graphrag")
-            return ""
+            return result
         except Exception as e:
             logger.error(f"Global search error: {type(e).__name__}: {e}")
-            return ""
+            return None
     
     def _convert_to_argument_bundles(
         self,
-        local_results: str,
-        global_results: str,
+        local_results: Optional[GraphRAGSearchResult],
+        global_results: Optional[GraphRAGSearchResult],
         request: RetrievalRequest
     ) -> List[ArgumentBundle]:
         """Convert GraphRAG search results to ArgumentBundle objects.
         
         Args:
-            local_results: Local search response text
-            global_results: Global search response text
+            local_results: Local search result
+            global_results: Global search result
             request: Original request
             
         Returns:
@@ -255,19 +184,21 @@ class MicrosoftGraphRAGService:
         
         if local_results:
             bundle = self._create_bundle_from_text(
-                local_results, 
+                local_results.response, 
                 "local_search",
                 request,
-                confidence=0.85
+                confidence=0.85,
+                context_records=local_results.context_count()
             )
             bundles.append(bundle)
         
-        if global_results and global_results != local_results:
+        if global_results and (not local_results or global_results.response != local_results.response):
             bundle = self._create_bundle_from_text(
-                global_results,
+                global_results.response,
                 "global_search", 
                 request,
-                confidence=0.80
+                confidence=0.80,
+                context_records=global_results.context_count()
             )
             bundles.append(bundle)
             
@@ -307,7 +238,8 @@ class MicrosoftGraphRAGService:
         text: str, 
         source_type: str,
         request: RetrievalRequest,
-        confidence: float
+        confidence: float,
+        context_records: int = 0
     ) -> ArgumentBundle:
         """Create an ArgumentBundle from GraphRAG response text.
         
@@ -316,6 +248,7 @@ class MicrosoftGraphRAGService:
             source_type: Type of search (local/global)
             request: Original request
             confidence: Confidence score
+            context_records: Number of graph records the answer was built from
             
         Returns:
             ArgumentBundle object
@@ -377,7 +310,8 @@ class MicrosoftGraphRAGService:
                 "graphrag_relevance": confidence,
                 "source_type": source_type,
                 "content_length": len(text),
-                "segments_count": len(segments)
+                "segments_count": len(segments),
+                "context_records": context_records
             }
         )
         
@@ -479,5 +413,6 @@ class MicrosoftGraphRAGService:
             total_count=len(mock_bundles),
             query_time_ms=query_time_ms,
             graph_explanations=[],
-            metrics=None
+            metrics=None,
+            source="mock",
         )
\ No newline at end of file
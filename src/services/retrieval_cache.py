@@ -0,0 +1,285 @@
+"""Cache of retrieval responses keyed by normalized request."""
+
+from typing import Dict, Any, Optional, Callable, Awaitable, Set
+from collections import OrderedDict
+from dataclasses import dataclass
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import structlog
+
+from ..models.schemas import RetrievalRequest, RetrievalResponse
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class _CacheEntry:
+    """Cached response with the tenant generation it was computed under."""
+    response: RetrievalResponse
+    tenant: str
+    generation: int
+    created_at: float
+
+
+class RetrievalCache:
+    """LRU cache of ``RetrievalResponse`` objects with stale-while-revalidate.
+
+    Entries younger than ``ttl_seconds`` are served as-is. Entries past the
+    TTL but within ``stale_seconds`` more are served immediately while one
+    background refresh recomputes them. Writes for a tenant bump its
+    generation, which invalidates every entry computed before the write.
+    Concurrent misses for the same request share one computation.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300,
+        stale_seconds: float = 60,
+        max_entries: int = 1024,
+    ):
+        """Initialize retrieval cache.
+
+        Args:
+            ttl_seconds: Age after which an entry is refreshed
+            stale_seconds: Extra age during which a stale entry is still served
+            max_entries: Maximum number of cached responses
+        """
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        # Invalidation is called from database worker threads
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._refresh_tasks: Set[asyncio.Task] = set()
+
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "invalidations": 0,
+            "evictions": 0,
+        }
+
+    @staticmethod
+    def fingerprint(request: RetrievalRequest) -> str:
+        """Build a cache key from the request fields that affect results.
+
+        Issue text is case-folded and whitespace-collapsed so trivially
+        different spellings of the same query share an entry.
+
+        Args:
+            request: Retrieval request
+
+        Returns:
+            Request fingerprint
+        """
+        issue_text = " ".join((request.issue_text or "").split()).casefold()
+        normalized = {
+            "tenant": request.tenant,
+            "issue_text": issue_text,
+            "lawyer_id": request.lawyer_id,
+            "current_issue_id": request.current_issue_id,
+            "jurisdiction": (request.jurisdiction or "").strip().casefold() or None,
+            "judge_id": request.judge_id,
+            "since": request.since.isoformat() if request.since else None,
+            "stage": getattr(request.stage, "value", request.stage),
+            "limit": request.limit,
+        }
+        payload = json.dumps(normalized, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def get_or_compute(
+        self,
+        request: RetrievalRequest,
+        compute: Callable[[RetrievalRequest], Awaitable[RetrievalResponse]],
+    ) -> RetrievalResponse:
+        """Return a cached response, computing it on a miss.
+
+        Args:
+            request: Retrieval request
+            compute: Coroutine function producing a fresh response
+
+        Returns:
+            Retrieval response
+        """
+        start_time = time.time()
+        key = self.fingerprint(request)
+        entry = self._lookup(key)
+
+        if entry is not None:
+            age = start_time - entry.created_at
+            if age < self.ttl_seconds:
+                self._stats["hits"] += 1
+                return self._served(entry.response, start_time)
+            if age < self.ttl_seconds + self.stale_seconds:
+                self._stats["stale_hits"] += 1
+                self._schedule_refresh(key, request, compute)
+                return self._served(entry.response, start_time)
+
+        self._stats["misses"] += 1
+        return await self._compute_once(key, request, compute)
+
+    @staticmethod
+    def _served(response: RetrievalResponse, start_time: float) -> RetrievalResponse:
+        """Copy a cached response, reporting the cache lookup time."""
+        elapsed_ms = int((time.time() - start_time) * 1000)
+        return response.model_copy(update={
+            "query_time_ms": elapsed_ms,
+            "stage_timings_ms": {"cache": elapsed_ms},
+        })
+
+    def invalidate_tenant(self, tenant: str) -> None:
+        """Invalidate every cached response for a tenant.
+
+        Args:
+            tenant: Tenant whose data changed
+        """
+        with self._lock:
+            self._generations[tenant] = self._generations.get(tenant, 0) + 1
+            stale_keys = [k for k, e in self._entries.items() if e.tenant == tenant]
+            for key in stale_keys:
+                del self._entries[key]
+        self._stats["invalidations"] += 1
+        if stale_keys:
+            logger.debug(f"Invalidated {len(stale_keys)} cached retrievals for tenant {tenant}")
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Hit/miss counters and entry count
+        """
+        return {**self._stats, "entries": len(self._entries)}
+
+    def _lookup(self, key: str) -> Optional[_CacheEntry]:
+        """Get a live entry, dropping it if its tenant has been written since."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.generation != self._generations.get(entry.tenant, 0):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key: str, response: RetrievalResponse, tenant: str, generation: int) -> None:
+        """Store a response unless its tenant was written while computing it."""
+        with self._lock:
+            if generation != self._generations.get(tenant, 0):
+                return
+            self._entries[key] = _CacheEntry(
+                response=response,
+                tenant=tenant,
+                generation=generation,
+                created_at=time.time(),
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    async def _compute_once(
+        self,
+        key: str,
+        request: RetrievalRequest,
+        compute: Callable[[RetrievalRequest], Awaitable[RetrievalResponse]],
+    ) -> RetrievalResponse:
+        """Compute and store a response, sharing the work between concurrent callers.
+
+        The computation runs in its own task, so a cancelled caller - including
+        the one that started it - does not cancel it for the others.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            with self._lock:
+                generation = self._generations.get(request.tenant, 0)
+            task = asyncio.create_task(self._compute_and_store(key, request, compute, generation))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._computed(key, t))
+        return await asyncio.shield(task)
+
+    async def _compute_and_store(
+        self,
+        key: str,
+        request: RetrievalRequest,
+        compute: Callable[[RetrievalRequest], Awaitable[RetrievalResponse]],
+        generation: int,
+    ) -> RetrievalResponse:
+        """Compute a response and cache it under the generation it was computed for."""
+        response = await compute(request)
+        # Mock responses stand in for missing data; don't pin them
+        if response.source != "mock":
+            self._store(key, response, request.tenant, generation)
+        return response
+
+    def _computed(self, key: str, task: asyncio.Task) -> None:
+        """Release a finished computation."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark retrieved so a failure nobody awaited is not reported
+        if not task.cancelled():
+            task.exception()
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        request: RetrievalRequest,
+        compute: Callable[[RetrievalRequest], Awaitable[RetrievalResponse]],
+    ) -> None:
+        """Refresh a stale entry in the background, once per key."""
+        if key in self._inflight:
+            return
+
+        async def refresh() -> None:
+            try:
+                await self._compute_once(key, request, compute)
+                self._stats["refreshes"] += 1
+            except Exception as e:
+                logger.warning(f"Background retrieval refresh failed: {e}")
+
+        task = asyncio.create_task(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+
+# Global cache instance
+_retrieval_cache = None
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    """Get singleton instance of the retrieval cache."""
+    global _retrieval_cache
+    if _retrieval_cache is None:
+        from ..core.config import settings
+
+        _retrieval_cache = RetrievalCache(
+            ttl_seconds=settings.retrieval_cache_ttl_seconds,
+            stale_seconds=settings.retrieval_cache_stale_seconds,
+            max_entries=settings.retrieval_cache_max_entries,
+        )
+    return _retrieval_cache
+
+
+def invalidate_tenant(tenant: str) -> None:
+    """Invalidate cached retrievals for a tenant after a write.
+
+    Called by the database layer; a no-op until the cache has been created.
+
+    Args:
+        tenant: Tenant whose data changed
+    """
+    if _retrieval_cache is not None:
+        _retrieval_cache.invalidate_tenant(tenant)